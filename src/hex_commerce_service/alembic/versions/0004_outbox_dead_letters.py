@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_outbox_dead_letters"
+down_revision = "0003_add_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # claim 用の索引を pending 行だけの部分索引に置き換える(sent / dead の行で肥大化しない)
+    op.drop_index("ix_outbox_state_available", table_name="outbox_messages")
+    op.create_index(
+        "ix_outbox_pending_available",
+        "outbox_messages",
+        ["available_at"],
+        postgresql_where=sa.text("state = 'pending'"),
+    )
+    op.create_index("ix_outbox_dead_id", "outbox_messages", ["id"], postgresql_where=sa.text("state = 'dead'"))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_dead_id", table_name="outbox_messages")
+    op.drop_index("ix_outbox_pending_available", table_name="outbox_messages")
+    op.create_index("ix_outbox_state_available", "outbox_messages", ["state", "available_at"])
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql as pg
+
+# revision identifiers, used by Alembic.
+revision = "0006_outbox_binary_body"
+down_revision = "0005_outbox_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # msgpack 形式のバイナリ封筒を JSONB の代わりに持てるようにする(どちらか一方は必須)
+    for table in ("outbox_messages", "outbox_messages_archive"):
+        op.add_column(table, sa.Column("body", sa.LargeBinary(), nullable=True))
+        op.alter_column(table, "payload", existing_type=pg.JSONB(astext_type=sa.Text()), nullable=True)
+    op.create_check_constraint("ck_outbox_payload_or_body", "outbox_messages", "payload IS NOT NULL OR body IS NOT NULL")
+
+
+def downgrade() -> None:
+    # バイナリだけで保存された行は JSONB に戻せないため、先に消化・削除しておくこと
+    op.drop_constraint("ck_outbox_payload_or_body", "outbox_messages", type_="check")
+    for table in ("outbox_messages_archive", "outbox_messages"):
+        op.alter_column(table, "payload", existing_type=pg.JSONB(astext_type=sa.Text()), nullable=False)
+        op.drop_column(table, "body")
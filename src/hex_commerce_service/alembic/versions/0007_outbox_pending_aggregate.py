@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_outbox_pending_aggregate"
+down_revision = "0006_outbox_binary_body"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # claim で同じ集約の先行 pending メッセージの有無を引く(集約ごとの配送順序)
+    op.create_index(
+        "ix_outbox_pending_aggregate",
+        "outbox_messages",
+        ["aggregate_id", "id"],
+        postgresql_where=sa.text("state = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_pending_aggregate", table_name="outbox_messages")
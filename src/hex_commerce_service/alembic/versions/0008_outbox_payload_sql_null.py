@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_outbox_payload_sql_null"
+down_revision = "0007_outbox_pending_aggregate"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # バイナリ封筒の行に JSON の 'null' として書かれていた payload を SQL NULL に直す
+    for table in ("outbox_messages", "outbox_messages_archive"):
+        op.execute(f"UPDATE {table} SET payload = NULL WHERE body IS NOT NULL AND payload = 'null'::jsonb")  # noqa: S608
+
+
+def downgrade() -> None:
+    # 'null' に戻す理由はないため何もしない
+    pass
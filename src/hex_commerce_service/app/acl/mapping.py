@@ -29,7 +29,7 @@ def map_external_order_to_command(payload: dict) -> PlaceOrderCommand:
     sku_errors: list[MappingIssue] = []
     for idx, it in enumerate(ext.orderItems):
         try:
-            items.append(NewOrderItem(sku=Sku(it.product_code), quantity=it.qty))
+            items.append(NewOrderItem(sku=Sku.of(it.product_code), quantity=it.qty))
         except ValueError as exc:
             sku_errors.append(
                 MappingIssue(
@@ -57,7 +57,7 @@ def map_external_inventory_to_domain(payload: dict) -> Inventory:
     sku_errors: list[MappingIssue] = []
     for idx, row in enumerate(ext.stock):
         try:
-            inv.set_on_hand(Sku(row.code), row.count)
+            inv.set_on_hand(Sku.of(row.code), row.count)
         except ValueError as exc:
             sku_errors.append(
                 MappingIssue(
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+from typing import TYPE_CHECKING
+
 import structlog
 from fastapi import FastAPI
 
@@ -7,28 +11,51 @@ from hex_commerce_service.app.adapters.inbound.api.auth.router import router as
 from hex_commerce_service.app.adapters.inbound.api.middleware.request_context import (
     RequestContextMiddleware,
 )
+from hex_commerce_service.app.adapters.inbound.api.routers import bus as bus_router
 from hex_commerce_service.app.adapters.inbound.api.routers import inventory, orders, products
+from hex_commerce_service.app.adapters.inmemory.store import InMemoryStore
 from hex_commerce_service.app.adapters.inmemory.system import (
     InMemoryIdGenerator,
     InMemoryUnitOfWork,
+    InMemoryUnitOfWorkFactory,
 )
-from hex_commerce_service.app.application.message_bus import MessageBus
+from hex_commerce_service.app.application.message_bus import MessageBus, QueuedMessageBus
 from hex_commerce_service.app.config.logging import configure_logging
-from hex_commerce_service.app.config.settings import get_settings
+from hex_commerce_service.app.config.settings import Settings, get_settings
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+
+def _create_bus(settings: Settings) -> MessageBus:
+    if settings.bus_mode == "queued":
+        return QueuedMessageBus(maxsize=settings.bus_queue_size, backpressure=settings.bus_backpressure)
+    return MessageBus()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
     configure_logging(settings)
 
-    app = FastAPI(title="Hex Commerce API", version="0.1.0")
+    bus = _create_bus(settings)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
+        try:
+            yield
+        finally:
+            # queued モードでは停止時に積まれたイベントを処理しきってからワーカーを止める
+            if isinstance(bus, QueuedMessageBus):
+                await asyncio.to_thread(bus.close, settings.bus_drain_timeout_seconds)
+
+    app = FastAPI(title="Hex Commerce API", version="0.1.0", lifespan=lifespan)
 
     # シンプルなサービスロケータ(in-memory)。本番はDI/Containerに差し替え前提。
-    app.state.uow = InMemoryUnitOfWork()
     app.state.id_gen = InMemoryIdGenerator()
-    app.state.bus = MessageBus()
-    # UoW にバスを接続(Day7準拠)
-    app.state.uow.message_bus = app.state.bus
+    app.state.bus = bus
+    # 共有ストア + リクエストごとの UoW。同期ルートはスレッドプールで並行実行されるため UoW は共有しない
+    app.state.store = InMemoryStore()
+    app.state.uow_factory = InMemoryUnitOfWorkFactory(store=app.state.store, message_bus=app.state.bus)
     app.state.settings = settings
 
     # Middleware: request context (IDs + start/finish logs)
@@ -36,21 +63,26 @@ def create_app() -> FastAPI:
 
     # DI dependencies
     def get_uow() -> InMemoryUnitOfWork:
-        return app.state.uow
+        return app.state.uow_factory()
 
     def get_id_gen() -> InMemoryIdGenerator:
         return app.state.id_gen
 
+    def get_bus() -> MessageBus:
+        return app.state.bus
+
     app.dependency_overrides[products.get_uow] = get_uow
     app.dependency_overrides[orders.get_uow] = get_uow
     app.dependency_overrides[orders.get_id_gen] = get_id_gen
     app.dependency_overrides[inventory.get_uow] = get_uow
+    app.dependency_overrides[bus_router.get_bus] = get_bus
 
     # Routers
     app.include_router(auth_router, prefix="/auth", tags=["auth"])
     app.include_router(products.router, prefix="/products", tags=["products"])
     app.include_router(orders.router, prefix="/orders", tags=["orders"])
     app.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
+    app.include_router(bus_router.router, prefix="/bus", tags=["bus"])
 
     def health() -> dict[str, str]:
         structlog.get_logger("health").info("health_checked")
@@ -66,3 +66,13 @@ class InventoryOut(BaseModel):
 
 class AllocateIn(BaseModel):
     location: str | None = "default"
+
+
+class HandlerLatencyOut(BaseModel):
+    event_type: str
+    handler: str
+    count: int
+    p50_ns: int
+    p99_ns: int
+    max_ns: int
+    total_ns: int
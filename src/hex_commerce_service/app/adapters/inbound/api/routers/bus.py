@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from hex_commerce_service.app.adapters.inbound.api.auth.security import require_role
+from hex_commerce_service.app.adapters.inbound.api.dtos import HandlerLatencyOut
+from hex_commerce_service.app.application.message_bus import MessageBus
+
+router = APIRouter()
+
+
+def get_bus() -> MessageBus:
+    raise RuntimeError("dependency not provided")
+
+
+require_admin = require_role("admin")
+
+
+@router.get("/stats", response_model=list[HandlerLatencyOut], dependencies=[Depends(require_admin)])
+def handler_latency(
+    bus: Annotated[MessageBus, Depends(get_bus)],
+    limit: Annotated[int, Query(ge=1, le=1_000)] = 100,
+) -> list[HandlerLatencyOut]:
+    # このプロセスの MessageBus が計測した (イベント型, ハンドラ) ごとの所要時間。p99 の大きい順
+    return [HandlerLatencyOut(**asdict(row)) for row in bus.latency_stats()[:limit]]
@@ -27,7 +27,7 @@ def upsert_inventory(location: str, body: InventoryUpsertIn, uow: Annotated[InMe
     try:
         inv = Inventory(location=location)
         for item in body.items:
-            inv.set_on_hand(Sku(item.sku), item.on_hand)
+            inv.set_on_hand(Sku.of(item.sku), item.on_hand)
         with uow:
             uow.inventories.upsert(inv)
             uow.commit()
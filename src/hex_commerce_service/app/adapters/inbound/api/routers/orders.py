@@ -54,7 +54,7 @@ def place_order(
 ) -> PlaceOrderOut:
     try:
         uc = PlaceOrderUseCase(uow=uow, id_gen=id_gen)
-        cmd = PlaceOrderCommand(items=[NewOrderItem(Sku(i.sku), i.quantity) for i in body.items])
+        cmd = PlaceOrderCommand(items=[NewOrderItem(Sku.of(i.sku), i.quantity) for i in body.items])
         res = uc.execute(cmd)
         return PlaceOrderOut(
             order_id=res.order_id,
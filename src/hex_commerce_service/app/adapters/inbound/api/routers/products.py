@@ -34,7 +34,7 @@ def create_product(
 ) -> ProductOut:
     try:
         product = Product(
-            sku=Sku(payload.sku),
+            sku=Sku.of(payload.sku),
             name=payload.name.strip(),
             unit_price=Money.from_major(Decimal(payload.price), payload.currency),
         )
@@ -56,7 +56,7 @@ def get_product(
     sku: str,
     uow: Annotated[InMemoryUnitOfWork, Depends(get_uow)],
 ) -> ProductOut:
-    prod = uow.products.get_by_sku(Sku(sku))
+    prod = uow.products.get_by_sku(Sku.of(sku))
     if not prod:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="product not found")
     return ProductOut(
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
-
 import typer
 
+from . import bus as bus_cmd
 from . import inventory as inventory_cmd
 from . import orders as orders_cmd
+from . import outbox as outbox_cmd
 from . import products as products_cmd
 
 app = typer.Typer(help="Hex Commerce CLI (in-memory)")
@@ -14,6 +14,8 @@ app = typer.Typer(help="Hex Commerce CLI (in-memory)")
 app.add_typer(products_cmd.app, name="products", help="Manage products")
 app.add_typer(inventory_cmd.app, name="inventory", help="Manage inventory")
 app.add_typer(orders_cmd.app, name="orders", help="Manage orders")
+app.add_typer(outbox_cmd.app, name="outbox", help="Inspect, requeue and purge outbox dead letters (database)")
+app.add_typer(bus_cmd.app, name="bus", help="Show in-process message bus handler latency")
 
 
 @app.callback()
@@ -25,12 +27,5 @@ def main(
     ctx.obj = {"json": bool(json_output)}
 
 
-def _echo(ctx: typer.Context, data: object) -> None:
-    if ctx.obj and ctx.obj.get("json"):
-        typer.echo(json.dumps(data, ensure_ascii=False))
-    else:
-        typer.echo(data)
-
-
 if __name__ == "__main__":
     app()
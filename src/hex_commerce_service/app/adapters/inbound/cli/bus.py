@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any
+
+import typer
+
+app = typer.Typer()
+
+# MessageBus は API プロセスの中にあるため、このサブコマンドは起動中の API(GET /bus/stats)に問い合わせる
+
+
+def _fetch_stats(url: str, token: str, limit: int) -> list[dict[str, Any]]:
+    endpoint = f"{url.rstrip('/')}/bus/stats?{urllib.parse.urlencode({'limit': limit})}"
+    if urllib.parse.urlsplit(endpoint).scheme not in {"http", "https"}:
+        msg = f"unsupported URL: {url}"
+        raise ValueError(msg)
+    req = urllib.request.Request(endpoint, headers={"Authorization": f"Bearer {token}"})  # noqa: S310
+    with urllib.request.urlopen(req, timeout=10) as resp:  # noqa: S310
+        rows: list[dict[str, Any]] = json.load(resp)
+    return rows
+
+
+def _format_rows(rows: list[dict[str, Any]]) -> list[str]:
+    lines = [f"{'event type':<24} {'handler':<48} {'count':>10} {'p50 us':>10} {'p99 us':>10} {'max us':>10}"]
+    lines.extend(
+        f"{row['event_type']:<24} {row['handler']:<48} {row['count']:>10} "
+        f"{row['p50_ns'] / 1_000:>10.1f} {row['p99_ns'] / 1_000:>10.1f} {row['max_ns'] / 1_000:>10.1f}"
+        for row in rows
+    )
+    return lines
+
+
+@app.command("stats")
+def stats(
+    ctx: typer.Context,
+    url: str = typer.Option("http://127.0.0.1:8000", "--url", envvar="HEX_API_URL", help="Base URL of the running API"),
+    token: str = typer.Option(..., "--token", envvar="HEX_API_TOKEN", help="Bearer token with the admin role"),
+    limit: int = typer.Option(20, "--limit", help="Max rows to show (slowest p99 first)"),
+) -> None:
+    try:
+        rows = _fetch_stats(url, token, limit)
+    except (urllib.error.URLError, ValueError) as exc:
+        typer.secho(f"cannot read bus stats from {url}: {exc}", err=True, fg=typer.colors.RED)
+        raise typer.Exit(1) from exc
+    if ctx.obj and ctx.obj.get("json"):
+        typer.echo(json.dumps(rows, ensure_ascii=False))
+    elif not rows:
+        typer.echo("no handler invocations recorded")
+    else:
+        for line in _format_rows(rows):
+            typer.echo(line)
@@ -17,7 +17,7 @@ def _parse_item(value: str) -> tuple[Sku, int]:
     sep = "=" if "=" in value else ":"
     try:
         sku_raw, qty_raw = value.split(sep, 1)
-        sku = Sku(sku_raw)
+        sku = Sku.of(sku_raw)
         qty = int(qty_raw)
     except Exception as exc:
         raise ValidationError(f"invalid item format: {value!r}; use SKU=QTY") from exc
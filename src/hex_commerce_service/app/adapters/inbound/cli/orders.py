@@ -13,7 +13,7 @@ from hex_commerce_service.app.application.use_cases.place_order import (
     PlaceOrderCommand,
     PlaceOrderUseCase,
 )
-from hex_commerce_service.app.domain.errors import DomainError, OutOfStock, ValidationError
+from hex_commerce_service.app.domain.errors import DomainError, OutOfStockError, ValidationError
 from hex_commerce_service.app.domain.value_objects import OrderId, Sku
 
 from .container import get_services
@@ -25,7 +25,7 @@ def _parse_order_item(value: str) -> NewOrderItem:
     sep = ":" if ":" in value else "="
     try:
         sku_raw, qty_raw = value.split(sep, 1)
-        sku = Sku(sku_raw)
+        sku = Sku.of(sku_raw)
         qty = int(qty_raw)
     except Exception as exc:
         raise ValidationError(f"invalid item format: {value!r}; use SKU:QTY") from exc
@@ -66,6 +66,6 @@ def allocate(ctx: typer.Context, order_id: str = typer.Option(..., "--order-id",
             typer.echo(json.dumps({"status": "allocated", "order_id": order_id}, ensure_ascii=False))
         else:
             typer.echo({"status": "allocated", "order_id": order_id})
-    except (OutOfStock, DomainError, ValidationError) as exc:
+    except (OutOfStockError, DomainError, ValidationError) as exc:
         typer.secho(str(exc), err=True, fg=typer.colors.RED)
         raise typer.Exit(1) from exc
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict
+from datetime import timedelta
+from typing import Annotated
+
+import typer
+
+from hex_commerce_service.app.infra.db.session import get_sessionmaker
+from hex_commerce_service.app.infra.outbox.repository import OutboxStore
+from hex_commerce_service.app.infra.outbox.retention import OutboxRetention, RetentionReport
+
+from .output import echo, echo_rows
+
+app = typer.Typer()
+
+# outbox は DB 上にあるため、このサブコマンドだけは DATABASE_URL の DB に接続する
+
+
+async def _list_dead(limit: int, event_type: str | None) -> list[dict[str, object]]:
+    async with get_sessionmaker()() as session:
+        rows = await OutboxStore(session).list_dead(limit=limit, event_type=event_type)
+        return [
+            {
+                "id": m.id,
+                "event_type": m.event_type,
+                "aggregate_id": m.aggregate_id,
+                "attempt_count": m.attempt_count,
+                "last_error": m.last_error,
+                "created_at": m.created_at.isoformat(),
+            }
+            for m in rows
+        ]
+
+
+async def _requeue(ids: list[int] | None, event_type: str | None) -> int:
+    async with get_sessionmaker()() as session:
+        n: int = await OutboxStore(session).requeue_dead(ids=ids, event_type=event_type)
+        await session.commit()
+    return n
+
+
+async def _purge(ids: list[int] | None, event_type: str | None) -> int:
+    async with get_sessionmaker()() as session:
+        n: int = await OutboxStore(session).purge_dead(ids=ids, event_type=event_type)
+        await session.commit()
+    return n
+
+
+async def _retention(keep_sent_days: float, keep_archive_days: float | None, chunk_size: int) -> RetentionReport:
+    retention = OutboxRetention(
+        sessionmaker=get_sessionmaker(),
+        keep_sent=timedelta(days=keep_sent_days),
+        keep_archive=None if keep_archive_days is None else timedelta(days=keep_archive_days),
+        chunk_size=chunk_size,
+    )
+    return await retention.run_once()
+
+
+def _selection(ids: list[int] | None, event_type: str | None, *, all_: bool) -> list[int] | None:
+    # 誤って全件を対象にしないよう、--id / --type / --all のいずれかを必須にする
+    if not ids and event_type is None and not all_:
+        typer.secho("specify --id, --type or --all", err=True, fg=typer.colors.RED)
+        raise typer.Exit(1)
+    return ids or None
+
+
+@app.command("dead")
+def list_dead(
+    ctx: typer.Context,
+    event_type: Annotated[str | None, typer.Option("--type", help="Only this event type")] = None,
+    limit: Annotated[int, typer.Option("--limit", help="Max rows to show")] = 50,
+) -> None:
+    echo_rows(ctx, asyncio.run(_list_dead(limit, event_type)))
+
+
+@app.command("requeue")
+def requeue(
+    ctx: typer.Context,
+    *,
+    ids: Annotated[list[int] | None, typer.Option("--id", help="Dead letter id, repeatable")] = None,
+    event_type: Annotated[str | None, typer.Option("--type", help="All dead letters of this event type")] = None,
+    all_: Annotated[bool, typer.Option("--all", help="All dead letters", is_flag=True)] = False,
+) -> None:
+    selected = _selection(ids, event_type, all_=all_)
+    n = asyncio.run(_requeue(selected, event_type))
+    echo(ctx, {"requeued": n})
+
+
+@app.command("purge")
+def purge(
+    ctx: typer.Context,
+    *,
+    ids: Annotated[list[int] | None, typer.Option("--id", help="Dead letter id, repeatable")] = None,
+    event_type: Annotated[str | None, typer.Option("--type", help="All dead letters of this event type")] = None,
+    all_: Annotated[bool, typer.Option("--all", help="All dead letters", is_flag=True)] = False,
+) -> None:
+    selected = _selection(ids, event_type, all_=all_)
+    n = asyncio.run(_purge(selected, event_type))
+    echo(ctx, {"purged": n})
+
+
+@app.command("retention")
+def retention(
+    ctx: typer.Context,
+    *,
+    keep_sent_days: Annotated[float, typer.Option("--keep-sent-days", help="Archive sent messages older than this")] = 7,
+    keep_archive_days: Annotated[float, typer.Option("--keep-archive-days", help="Delete archived messages older than this")] = 90,
+    no_prune: Annotated[bool, typer.Option("--no-prune", help="Keep archived messages forever", is_flag=True)] = False,
+    chunk_size: Annotated[int, typer.Option("--chunk-size", help="Rows per transaction")] = 5_000,
+) -> None:
+    report = asyncio.run(_retention(keep_sent_days, None if no_prune else keep_archive_days, chunk_size))
+    echo(ctx, asdict(report))
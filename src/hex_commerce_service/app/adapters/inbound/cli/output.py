@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import json
+
+import typer
+
+
+def echo(ctx: typer.Context, data: object) -> None:
+    # --json なら JSON、そうでなければそのまま出力する
+    if ctx.obj and ctx.obj.get("json"):
+        typer.echo(json.dumps(data, ensure_ascii=False))
+    else:
+        typer.echo(data)
+
+
+def echo_rows(ctx: typer.Context, rows: list[dict[str, object]]) -> None:
+    # --json なら JSON の配列1つ、そうでなければ1行に1件ずつ出力する
+    if ctx.obj and ctx.obj.get("json"):
+        typer.echo(json.dumps(rows, ensure_ascii=False))
+    else:
+        for row in rows:
+            typer.echo(row)
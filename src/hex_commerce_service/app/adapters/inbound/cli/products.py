@@ -24,7 +24,7 @@ def add_product(
 ) -> None:
     svc = get_services()
     try:
-        product = Product(sku=Sku(sku), name=name.strip(), unit_price=Money.from_major(Decimal(price), currency))
+        product = Product(sku=Sku.of(sku), name=name.strip(), unit_price=Money.from_major(Decimal(price), currency))
         with svc.uow:
             svc.uow.products.add(product)
             svc.uow.commit()
@@ -46,7 +46,7 @@ def add_product(
 @app.command("get")
 def get_product(ctx: typer.Context, sku: str = typer.Argument(..., help="SKU code")) -> None:
     svc = get_services()
-    prod = svc.uow.products.get_by_sku(Sku(sku))
+    prod = svc.uow.products.get_by_sku(Sku.of(sku))
     if not prod:
         typer.secho("product not found", err=True, fg=typer.colors.RED)
         raise typer.Exit(1)
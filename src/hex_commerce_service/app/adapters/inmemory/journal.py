@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Final, Protocol
+
+# 「キーが存在しなかった」ことを表す番兵
+_MISSING: Final = object()
+
+
+class ChangeTracked(Protocol):
+    """自身の変更セットを持ち、元に戻せる集約(例: Inventory)."""
+
+    def begin_changes(self) -> None: ...
+    def rollback_changes(self) -> None: ...
+    def discard_changes(self) -> None: ...
+
+
+@dataclass(slots=True)
+class UndoLog:
+    """
+    トランザクション中に書き換えられたキーの直前値だけを記録する undo ログ.
+
+    - begin() で記録を開始し、各リポジトリは書き込み直前に record(items, key) を呼ぶ
+    - 同一トランザクション内で同じキーは最初の1回だけ記録する(最古の値が復元対象)
+    - undo() で記録を逆順に適用して元に戻す。コストは触れたキー数に比例し、ストア全体のサイズに依存しない
+    - その場で書き換えられる集約は track() で登録し、集約側の変更セットで戻す(ディープコピーしない)
+    """
+
+    active: bool = False
+    _entries: list[tuple[dict[Any, Any], Any, object]] = field(default_factory=list)
+    _touched: set[tuple[int, Any]] = field(default_factory=set)
+    _aggregates: dict[int, ChangeTracked] = field(default_factory=dict)
+
+    def begin(self) -> None:
+        self.clear()
+        self.active = True
+
+    def end(self) -> None:
+        self.clear()
+        self.active = False
+
+    def record(self, items: dict[Any, Any], key: object) -> None:
+        if not self.active:
+            return
+        marker = (id(items), key)
+        if marker in self._touched:
+            return
+        self._touched.add(marker)
+        self._entries.append((items, key, items.get(key, _MISSING)))
+
+    def track(self, aggregate: ChangeTracked) -> None:
+        if not self.active or id(aggregate) in self._aggregates:
+            return
+        self._aggregates[id(aggregate)] = aggregate
+        aggregate.begin_changes()
+
+    def undo(self) -> None:
+        for aggregate in self._aggregates.values():
+            aggregate.rollback_changes()
+        self._aggregates.clear()
+        for items, key, previous in reversed(self._entries):
+            if previous is _MISSING:
+                items.pop(key, None)
+            else:
+                items[key] = previous
+        self.clear()
+
+    def clear(self) -> None:
+        for aggregate in self._aggregates.values():
+            aggregate.discard_changes()
+        self._aggregates.clear()
+        self._entries.clear()
+        self._touched.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
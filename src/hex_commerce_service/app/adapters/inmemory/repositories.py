@@ -14,26 +14,52 @@ from hex_commerce_service.app.application.ports import (
 from hex_commerce_service.app.domain.entities import Inventory, Order, Product
 from hex_commerce_service.app.domain.value_objects import OrderId, Sku
 
+from .journal import UndoLog
+from .store import LockScope, StripedLock
+
+
+def _guard(scope: LockScope | None, table: StripedLock | None, key: object) -> None:
+    # トランザクション中のみ、集約キーに対応するストライプを保持する
+    if scope is not None and table is not None:
+        scope.acquire(table, key)
+
 
 @dataclass(slots=True)
 class InMemoryProductRepository(ProductRepository):
     items: dict[Sku, Product] = field(default_factory=dict)
+    journal: UndoLog | None = None
+    locks: StripedLock | None = None
+    lock_scope: LockScope | None = None
 
     def get_by_sku(self, sku: Sku) -> Product | None:
         return self.items.get(sku)
 
+    def get_many_by_sku(self, skus: Iterable[Sku]) -> dict[Sku, Product]:
+        items = self.items
+        return {sku: p for sku in skus if (p := items.get(sku)) is not None}
+
     def add(self, product: Product) -> None:
+        _guard(self.lock_scope, self.locks, product.sku)
+        if self.journal is not None:
+            self.journal.record(self.items, product.sku)
         self.items[product.sku] = product
 
 
 @dataclass(slots=True)
 class InMemoryOrderRepository(OrderRepository):
     items: dict[OrderId, Order] = field(default_factory=dict)
+    journal: UndoLog | None = None
+    locks: StripedLock | None = None
+    lock_scope: LockScope | None = None
 
     def get(self, order_id: OrderId) -> Order | None:
+        _guard(self.lock_scope, self.locks, order_id)
         return self.items.get(order_id)
 
     def add(self, order: Order) -> None:
+        _guard(self.lock_scope, self.locks, order.id)
+        if self.journal is not None:
+            self.journal.record(self.items, order.id)
         self.items[order.id] = order
 
     def list(self) -> Iterable[Order]:
@@ -43,9 +69,21 @@ class InMemoryOrderRepository(OrderRepository):
 @dataclass(slots=True)
 class InMemoryInventoryRepository(InventoryRepository):
     items: dict[str, Inventory] = field(default_factory=dict)
+    journal: UndoLog | None = None
+    locks: StripedLock | None = None
+    lock_scope: LockScope | None = None
 
     def get(self, location: str = "default") -> Inventory | None:
-        return self.items.get(location)
+        _guard(self.lock_scope, self.locks, location)
+        inventory = self.items.get(location)
+        if inventory is not None and self.journal is not None:
+            # 集約はその場で変更されるため、初回アクセス時に変更セットの記録を開始する
+            self.journal.track(inventory)
+        return inventory
 
     def upsert(self, inventory: Inventory) -> None:
+        _guard(self.lock_scope, self.locks, inventory.location)
+        if self.journal is not None:
+            self.journal.record(self.items, inventory.location)
+            self.journal.track(inventory)
         self.items[inventory.location] = inventory
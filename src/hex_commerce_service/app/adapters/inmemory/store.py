@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from hex_commerce_service.app.domain.entities import Inventory, Order, Product
+    from hex_commerce_service.app.domain.value_objects import OrderId, Sku
+
+
+@dataclass(slots=True)
+class StripedLock:
+    """キーのハッシュで N 本のロックに振り分ける(ストライプロック)."""
+
+    stripes: int = 64
+    _locks: tuple[threading.RLock, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._locks = tuple(threading.RLock() for _ in range(self.stripes))
+
+    def for_key(self, key: object) -> threading.RLock:
+        return self._locks[hash(key) % self.stripes]
+
+
+@dataclass(slots=True)
+class LockScope:
+    """
+    UoW 1つ分が保持しているロックの集合(2相ロック).
+
+    - begin() から release() までの間、acquire() したストライプを保持し続ける
+    - 同じストライプは1回だけ取得する
+    - デッドロック回避のため、UoW内では orders → inventories の順に触れること
+    """
+
+    active: bool = False
+    _held: dict[int, threading.RLock] = field(default_factory=dict)
+
+    def begin(self) -> None:
+        self.release()
+        self.active = True
+
+    def end(self) -> None:
+        self.release()
+        self.active = False
+
+    def acquire(self, table: StripedLock, key: object) -> None:
+        if not self.active:
+            return
+        lock = table.for_key(key)
+        if id(lock) in self._held:
+            return
+        lock.acquire()
+        self._held[id(lock)] = lock
+
+    def release(self) -> None:
+        for lock in reversed(self._held.values()):
+            lock.release()
+        self._held.clear()
+
+
+@dataclass(slots=True)
+class InMemoryEventSink:
+    events: list[object] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class InMemoryStore:
+    """リクエストごとの UoW が共有するインメモリのデータと、集約種別ごとのロック表."""
+
+    products: dict[Sku, Product] = field(default_factory=dict)
+    orders: dict[OrderId, Order] = field(default_factory=dict)
+    inventories: dict[str, Inventory] = field(default_factory=dict)
+    event_sink: InMemoryEventSink = field(default_factory=InMemoryEventSink)
+
+    product_locks: StripedLock = field(default_factory=StripedLock)
+    order_locks: StripedLock = field(default_factory=StripedLock)
+    inventory_locks: StripedLock = field(default_factory=StripedLock)
@@ -1,14 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Self, cast
+from typing import TYPE_CHECKING, Self
 from uuid import uuid4
 
 from hex_commerce_service.app.application.message_bus import MessageBus
-from hex_commerce_service.app.domain.entities.inventory import Inventory
-from hex_commerce_service.app.domain.entities.order import Order
-from hex_commerce_service.app.domain.entities.product import Product
-from hex_commerce_service.app.domain.value_objects.sku import Sku
 
 if TYPE_CHECKING:
     from types import TracebackType
@@ -23,11 +19,13 @@ from hex_commerce_service.app.application.ports import (
 )
 from hex_commerce_service.app.domain.value_objects import OrderId
 
+from .journal import UndoLog
 from .repositories import (
     InMemoryInventoryRepository,
     InMemoryOrderRepository,
     InMemoryProductRepository,
 )
+from .store import InMemoryEventSink, InMemoryStore, LockScope
 
 
 @dataclass(slots=True)
@@ -38,11 +36,6 @@ class InMemoryIdGenerator(IdGenerator):
         return OrderId(uuid4())
 
 
-@dataclass(slots=True)
-class InMemoryEventSink:
-    events: list[object] = field(default_factory=list)
-
-
 @dataclass(slots=True)
 class TransactionalEventPublisher(EventPublisher):
     _uow: InMemoryUnitOfWork
@@ -71,21 +64,37 @@ class InMemoryUnitOfWork(UnitOfWork):
     _committed: bool = False
     _in_context: bool = False
 
-    # スナップショット
-    _products_snapshot: dict[Sku, Product] | None = None
-    _orders_snapshot: dict[OrderId, Order] | None = None
-    _inventories_snapshot: dict[Sku, Inventory] | None = None
+    # 触れたキーだけを記録する undo ログ(全件スナップショットは取らない)
+    _journal: UndoLog = field(default_factory=UndoLog)
+    # 共有ストア上で保持している集約ロック
+    _locks: LockScope = field(default_factory=LockScope)
 
     # ペンディングイベント
     _pending_events: list[object] = field(default_factory=list)
 
     def __post_init__(self) -> None:
         object.__setattr__(self, "events", TransactionalEventPublisher(self))
+        for repo in (self.products, self.orders, self.inventories):
+            if isinstance(repo, (InMemoryProductRepository, InMemoryOrderRepository, InMemoryInventoryRepository)):
+                repo.journal = self._journal
+                repo.lock_scope = self._locks
+
+    @classmethod
+    def from_store(cls, store: InMemoryStore, message_bus: MessageBus | None = None) -> InMemoryUnitOfWork:
+        # 共有ストアの上に、このトランザクション専用の UoW を作る
+        return cls(
+            products=InMemoryProductRepository(items=store.products, locks=store.product_locks),
+            orders=InMemoryOrderRepository(items=store.orders, locks=store.order_locks),
+            inventories=InMemoryInventoryRepository(items=store.inventories, locks=store.inventory_locks),
+            event_sink=store.event_sink,
+            message_bus=message_bus,
+        )
 
     def __enter__(self) -> Self:
         self._in_context = True
         self._committed = False
-        self._take_snapshots()
+        self._journal.begin()
+        self._locks.begin()
         self._pending_events.clear()
         return self
 
@@ -99,22 +108,25 @@ class InMemoryUnitOfWork(UnitOfWork):
             if exc_type:
                 self.rollback()
         finally:
+            self._journal.end()
+            self._locks.end()
             self._in_context = False
 
     def commit(self) -> None:
         committed_batch = list(self._pending_events)
         self.event_sink.events.extend(committed_batch)
         self._pending_events.clear()
-        self._clear_snapshots()
+        self._journal.clear()
+        self._locks.release()
         self._committed = True
 
-        # 同期ディスパッチ.失敗しても例外はバスが握りつぶす
+        # 同期ディスパッチ.失敗しても例外はバスが握りつぶす。バッチハンドラには commit 1回分をまとめて渡す
         if self.message_bus is not None:
-            for ev in committed_batch:
-                self.message_bus.publish(ev)
+            self.message_bus.publish_many(committed_batch)
 
     def rollback(self) -> None:
-        self._restore_snapshots()
+        self._journal.undo()
+        self._locks.release()
         self._pending_events.clear()
         self._committed = False
 
@@ -131,31 +143,13 @@ class InMemoryUnitOfWork(UnitOfWork):
             if self.message_bus is not None:
                 self.message_bus.publish(event)
 
-    def _take_snapshots(self) -> None:
-        # 具体型にキャストして内部Dictをスナップショット
-        prod_repo = cast("InMemoryProductRepository", self.products)
-        order_repo = cast("InMemoryOrderRepository", self.orders)
-        inv_repo = cast("InMemoryInventoryRepository", self.inventories)
-
-        self._products_snapshot = dict(prod_repo.items)
-        self._orders_snapshot = dict(order_repo.items)
-        self._inventories_snapshot = dict(inv_repo.items)
 
-    def _restore_snapshots(self) -> None:
-        if self._products_snapshot is None or self._orders_snapshot is None or self._inventories_snapshot is None:
-            return
-
-        prod_repo = cast("InMemoryProductRepository", self.products)
-        order_repo = cast("InMemoryOrderRepository", self.orders)
-        inv_repo = cast("InMemoryInventoryRepository", self.inventories)
-
-        prod_repo.items = dict(self._products_snapshot)
-        order_repo.items = dict(self._orders_snapshot)
-        inv_repo.items = dict(self._inventories_snapshot)
+@dataclass(slots=True)
+class InMemoryUnitOfWorkFactory:
+    """リクエスト(スレッド)ごとに新しい UoW を共有ストア上に生成する."""
 
-        self._clear_snapshots()
+    store: InMemoryStore = field(default_factory=InMemoryStore)
+    message_bus: MessageBus | None = None
 
-    def _clear_snapshots(self) -> None:
-        self._products_snapshot = None
-        self._orders_snapshot = None
-        self._inventories_snapshot = None
+    def __call__(self) -> InMemoryUnitOfWork:
+        return InMemoryUnitOfWork.from_store(self.store, self.message_bus)
@@ -2,22 +2,27 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
-from sqlalchemy import delete, select
+from sqlalchemy import Integer, String, column, delete, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Sequence
+    from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
 
+    from sqlalchemy import ColumnElement
     from sqlalchemy.ext.asyncio import AsyncSession
 
 from hex_commerce_service.app.application.ports import (
     AsyncInventoryRepository,
     AsyncOrderRepository,
     AsyncProductRepository,
+    OrderCursor,
+    OrderPage,
 )
 from hex_commerce_service.app.domain.entities import Inventory, Order, OrderLine, Product
+from hex_commerce_service.app.domain.errors import NegativeQuantityError, OutOfStockError, Shortfall
 from hex_commerce_service.app.domain.value_objects import Money, OrderId, Sku
 from hex_commerce_service.app.infra.db.models import (
     InventoryItemModel,
@@ -43,7 +48,7 @@ def _product_to_model(p: Product) -> ProductModel:
 
 def _model_to_product(m: ProductModel) -> Product:
     return Product(
-        sku=Sku(m.sku),
+        sku=Sku.of(m.sku),
         name=m.name,
         unit_price=Money.from_major(Decimal(m.unit_price_amount), m.currency),
     )
@@ -69,7 +74,7 @@ def _model_to_order(m: OrderModel) -> Order:
     for lm in m.lines:
         o.add_line(
             OrderLine(
-                sku=Sku(lm.sku),
+                sku=Sku.of(lm.sku),
                 quantity=lm.quantity,
                 unit_price=Money.from_major(Decimal(lm.unit_price_amount), lm.currency),
             )
@@ -77,22 +82,109 @@ def _model_to_order(m: OrderModel) -> Order:
     return o
 
 
-def _inventory_to_models(inv: Inventory) -> tuple[InventoryLocationModel, list[InventoryItemModel]]:
-    loc = InventoryLocationModel(location=inv.location, description=None)
-    items = [
-        InventoryItemModel(location=inv.location, sku=sku.value, on_hand=qty)
-        for sku, qty in inv._on_hand.items()  # noqa: SLF001 - adapter層で内部を使用
-    ]
-    return loc, items
+# --------------------------
+# Core read path (列を直接 SELECT し、行タプルからドメインを組み立てる)
+# --------------------------
+
+_PRODUCT_COLUMNS = (ProductModel.sku, ProductModel.name, ProductModel.unit_price_amount, ProductModel.currency)
+_ORDER_COLUMNS = (OrderModel.id, OrderModel.currency, OrderModel.created_at)
+_ORDER_LINE_COLUMNS = (
+    OrderLineModel.order_id,
+    OrderLineModel.sku,
+    OrderLineModel.quantity,
+    OrderLineModel.unit_price_amount,
+    OrderLineModel.currency,
+)
+
+
+def _row_to_product(row: Sequence[Any]) -> Product:
+    sku, name, amount, currency = row
+    return Product(sku=Sku.of(sku), name=name, unit_price=Money(amount, currency))
+
+
+def _rows_to_orders(order_rows: Iterable[Sequence[Any]], line_rows: Iterable[Sequence[Any]]) -> list[Order]:
+    # 注文を先に作り、明細は1パスで各注文に振り分ける
+    orders: dict[str, Order] = {}
+    for oid, currency, _created_at in order_rows:
+        orders[str(oid)] = Order(id=OrderId.parse(str(oid)), currency=currency)
+    for oid, sku, quantity, amount, currency in line_rows:
+        order = orders.get(str(oid))
+        if order is not None:
+            order.add_line(OrderLine(sku=Sku.of(sku), quantity=quantity, unit_price=Money(amount, currency)))
+    return list(orders.values())
+
+
+def _inventory_rows(inv: Inventory, skus: Iterable[Sku]) -> list[dict[str, object]]:
+    return [{"location": inv.location, "sku": sku.value, "on_hand": inv.available(sku)} for sku in skus]
 
 
 def _models_to_inventory(loc: InventoryLocationModel, items: Sequence[InventoryItemModel]) -> Inventory:
     inv = Inventory(location=loc.location)
     for row in items:
-        inv.set_on_hand(Sku(row.sku), int(row.on_hand))
+        inv.set_on_hand(Sku.of(row.sku), int(row.on_hand))
+    # DB から読み込んだ状態を差分書き込みの基準にする
+    inv.mark_clean()
     return inv
 
 
+# 1文あたりの行数。asyncpg のバインドパラメータ上限(32767)を超えないように分割する
+_ITEM_BATCH = 5_000
+
+
+def _chunks[T](seq: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for i in range(0, len(seq), size):
+        yield seq[i : i + size]
+
+
+async def _fetch_order_page(
+    session: AsyncSession, *, core: bool, cursor: OrderCursor | None, page_size: int
+) -> tuple[list[Order], OrderCursor | None]:
+    keyset = None
+    if cursor is not None:
+        keyset = tuple_(OrderModel.created_at, OrderModel.id) > tuple_(cursor.created_at, cursor.id)
+    order_by = (OrderModel.created_at.asc(), OrderModel.id.asc())
+
+    if core:
+        stmt = select(*_ORDER_COLUMNS).order_by(*order_by).limit(page_size)
+        if keyset is not None:
+            stmt = stmt.where(keyset)
+        order_rows = (await session.execute(stmt)).all()
+        if not order_rows:
+            return [], None
+        ids = [r[0] for r in order_rows]
+        line_stmt = select(*_ORDER_LINE_COLUMNS).where(OrderLineModel.order_id.in_(ids)).order_by(OrderLineModel.id.asc())
+        line_rows = (await session.execute(line_stmt)).all()
+        last_id, _, last_created_at = order_rows[-1]
+        return _rows_to_orders(order_rows, line_rows), OrderCursor(created_at=last_created_at, id=str(last_id))
+
+    orm_stmt = select(OrderModel).options(selectinload(OrderModel.lines)).order_by(*order_by).limit(page_size)
+    if keyset is not None:
+        orm_stmt = orm_stmt.where(keyset)
+    res = await session.execute(orm_stmt)
+    models = cast("list[OrderModel]", res.scalars().all())
+    if not models:
+        return [], None
+    # identity map は弱参照なので、戻った時点で ORM インスタンスはページごとに解放される
+    last = models[-1]
+    return [_model_to_order(m) for m in models], OrderCursor(created_at=last.created_at, id=str(last.id))
+
+
+async def _core_orders(
+    session: AsyncSession, order_filter: ColumnElement[bool] | None, line_filter: ColumnElement[bool] | None
+) -> list[Order]:
+    order_stmt = select(*_ORDER_COLUMNS).order_by(OrderModel.created_at.asc())
+    if order_filter is not None:
+        order_stmt = order_stmt.where(order_filter)
+    order_rows = (await session.execute(order_stmt)).all()
+    if not order_rows:
+        return []
+    line_stmt = select(*_ORDER_LINE_COLUMNS).order_by(OrderLineModel.id.asc())
+    if line_filter is not None:
+        line_stmt = line_stmt.where(line_filter)
+    line_rows = (await session.execute(line_stmt)).all()
+    return _rows_to_orders(order_rows, line_rows)
+
+
 # --------------------------
 # Repositories (async)
 # --------------------------
@@ -101,18 +193,39 @@ def _models_to_inventory(loc: InventoryLocationModel, items: Sequence[InventoryI
 @dataclass(slots=True)
 class SqlAlchemyProductRepository(AsyncProductRepository):
     session: AsyncSession
+    # True: 読み取りは ORM インスタンスを経由せず、列タプルから直接ドメインを組み立てる
+    core_reads: bool = False
 
     async def get_by_sku(self, sku: Sku) -> Product | None:
+        if self.core_reads:
+            found = (await self.session.execute(select(*_PRODUCT_COLUMNS).where(ProductModel.sku == sku.value))).first()
+            return _row_to_product(found) if found else None
         stmt = select(ProductModel).where(ProductModel.sku == sku.value)
         res = await self.session.execute(stmt)
         row = res.scalar_one_or_none()
         return _model_to_product(row) if row else None
 
+    async def get_many_by_sku(self, skus: Iterable[Sku]) -> dict[Sku, Product]:
+        # 1回の IN クエリでまとめて取得。見つからなかった SKU は結果に含めない
+        values = list({sku.value for sku in skus})
+        if not values:
+            return {}
+        if self.core_reads:
+            rows = (await self.session.execute(select(*_PRODUCT_COLUMNS).where(ProductModel.sku.in_(values)))).all()
+            return {p.sku: p for p in map(_row_to_product, rows)}
+        stmt = select(ProductModel).where(ProductModel.sku.in_(values))
+        res = await self.session.execute(stmt)
+        products = (_model_to_product(m) for m in res.scalars().all())
+        return {p.sku: p for p in products}
+
     async def add(self, product: Product) -> None:
         model = _product_to_model(product)
         self.session.add(model)
 
     async def list(self) -> Iterable[Product]:
+        if self.core_reads:
+            rows = (await self.session.execute(select(*_PRODUCT_COLUMNS).order_by(ProductModel.sku.asc()))).all()
+            return [_row_to_product(r) for r in rows]
         stmt = select(ProductModel).order_by(ProductModel.sku.asc())
         res = await self.session.execute(stmt)
         models = cast("list[ProductModel]", res.scalars().all())
@@ -122,8 +235,14 @@ class SqlAlchemyProductRepository(AsyncProductRepository):
 @dataclass(slots=True)
 class SqlAlchemyOrderRepository(AsyncOrderRepository):
     session: AsyncSession
+    # True: 読み取りは ORM インスタンスを経由せず、列タプルから直接ドメインを組み立てる
+    core_reads: bool = False
 
     async def get(self, order_id: OrderId) -> Order | None:
+        if self.core_reads:
+            oid = str(order_id.value)
+            orders = await _core_orders(self.session, OrderModel.id == oid, OrderLineModel.order_id == oid)
+            return orders[0] if orders else None
         stmt = select(OrderModel).options(selectinload(OrderModel.lines)).where(OrderModel.id == str(order_id.value))
         res = await self.session.execute(stmt)
         model = res.scalar_one_or_none()
@@ -135,11 +254,46 @@ class SqlAlchemyOrderRepository(AsyncOrderRepository):
         self.session.add(model)
 
     async def list(self) -> Iterable[Order]:
+        if self.core_reads:
+            # 全件読むので明細も絞り込まずに1クエリで取得する
+            return await _core_orders(self.session, None, None)
         stmt = select(OrderModel).options(selectinload(OrderModel.lines)).order_by(OrderModel.created_at.asc())
         res = await self.session.execute(stmt)
         models = cast("list[OrderModel]", res.scalars().all())
         return [_model_to_order(m) for m in models]
 
+    async def iter_order_pages(self, after: OrderCursor | None = None, page_size: int = 500) -> AsyncIterator[OrderPage]:
+        """
+        Stream orders in (created_at, id) order, one keyset page at a time.
+
+        Each page costs one query for the orders and one IN query for their lines;
+        only the current page is held in memory.
+
+        Yields:
+            Pages of at most page_size orders, each with the cursor to resume after it.
+
+        Raises:
+            ValueError: page_size is not positive.
+        """
+        if page_size <= 0:
+            msg = "page_size must be positive"
+            raise ValueError(msg)
+        cursor = after
+        while True:
+            orders, last = await _fetch_order_page(self.session, core=self.core_reads, cursor=cursor, page_size=page_size)
+            if not orders:
+                return
+            cursor = last
+            full = len(orders) == page_size
+            yield OrderPage(orders=orders, next_cursor=cursor if full else None)
+            if not full:
+                return
+
+    async def iter_orders(self, after: OrderCursor | None = None, page_size: int = 500) -> AsyncIterator[Order]:
+        async for page in self.iter_order_pages(after=after, page_size=page_size):
+            for order in page.orders:
+                yield order
+
 
 @dataclass(slots=True)
 class SqlAlchemyInventoryRepository(AsyncInventoryRepository):
@@ -149,24 +303,103 @@ class SqlAlchemyInventoryRepository(AsyncInventoryRepository):
         loc = await self.session.get(InventoryLocationModel, location)
         if not loc:
             return None
-        stmt = select(InventoryItemModel).where(InventoryItemModel.location == location)
+        # Core の UPDATE/INSERT で書き換えた行を読み直すため、identity map の値で上書きしない
+        stmt = select(InventoryItemModel).where(InventoryItemModel.location == location).execution_options(populate_existing=True)
         res = await self.session.execute(stmt)
         items = cast("list[InventoryItemModel]", res.scalars().all())
         return _models_to_inventory(loc, items)
 
+    async def exists(self, location: str) -> bool:
+        # 主キー参照だけで済ませ、在庫明細は読まない
+        return await self.session.get(InventoryLocationModel, location) is not None
+
     async def upsert(self, inventory: Inventory) -> None:
         # ロケーションを upsert
-        loc_model = await self.session.get(InventoryLocationModel, inventory.location)
-        if not loc_model:
-            loc_model = InventoryLocationModel(location=inventory.location, description=None)
-            self.session.add(loc_model)
-            await self.session.flush()  # PK確定
-
-        # 既存itemを削除してから入れ直し.シンプル実装
-        await self.session.execute(delete(InventoryItemModel).where(InventoryItemModel.location == inventory.location))
-        _, items = _inventory_to_models(inventory)
-        for im in items:
-            self.session.add(im)
+        await self.session.execute(
+            pg_insert(InventoryLocationModel)
+            .values(location=inventory.location, description=None)
+            .on_conflict_do_nothing(index_elements=[InventoryLocationModel.location])
+        )
+
+        dirty = inventory.dirty_skus
+        if dirty is None:
+            # DB から読み込んでいない集約: 内容全体で置き換える
+            await self.session.execute(delete(InventoryItemModel).where(InventoryItemModel.location == inventory.location))
+            await self._upsert_items(_inventory_rows(inventory, inventory.skus()))
+        else:
+            # 読み込み後に変更された SKU だけを書き込み、取り除かれた SKU は削除する
+            present = inventory.skus()
+            await self._upsert_items(_inventory_rows(inventory, dirty & present))
+            removed = [sku.value for sku in dirty - present]
+            for chunk in _chunks(removed, _ITEM_BATCH):
+                await self.session.execute(
+                    delete(InventoryItemModel).where(
+                        InventoryItemModel.location == inventory.location,
+                        InventoryItemModel.sku.in_(chunk),
+                    )
+                )
+        inventory.mark_clean()
+
+    async def _upsert_items(self, rows: Sequence[dict[str, object]]) -> None:
+        for chunk in _chunks(rows, _ITEM_BATCH):
+            stmt = pg_insert(InventoryItemModel).values(list(chunk))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[InventoryItemModel.location, InventoryItemModel.sku],
+                set_={"on_hand": stmt.excluded.on_hand},
+            )
+            await self.session.execute(stmt)
+
+    async def allocate(self, location: str, lines: Iterable[tuple[Sku, int]]) -> dict[Sku, int]:
+        """
+        Decrement stock for the given (sku, qty) lines directly in the database.
+
+        One conditional UPDATE (on_hand >= qty) covers every SKU of the batch inside a
+        SAVEPOINT; if any SKU is missing or short, the savepoint is rolled back and
+        OutOfStockError lists every shortfall.
+
+        Returns:
+            Remaining on_hand per allocated SKU.
+
+        Raises:
+            NegativeQuantityError: a line has a non-positive quantity.
+            OutOfStockError: at least one SKU cannot be fulfilled.
+        """
+        requested: dict[Sku, int] = {}
+        for sku, qty in lines:
+            if qty <= 0:
+                raise NegativeQuantityError("requested quantity must be positive")
+            requested[sku] = requested.get(sku, 0) + qty
+        if not requested:
+            return {}
+
+        req = values(column("sku", String), column("qty", Integer), name="req").data([(s.value, q) for s, q in requested.items()])
+        stmt = (
+            update(InventoryItemModel)
+            .where(
+                InventoryItemModel.location == location,
+                InventoryItemModel.sku == req.c.sku,
+                InventoryItemModel.on_hand >= req.c.qty,
+            )
+            .values(on_hand=InventoryItemModel.on_hand - req.c.qty)
+            .returning(InventoryItemModel.sku, InventoryItemModel.on_hand)
+            .execution_options(synchronize_session=False)
+        )
+        savepoint = await self.session.begin_nested()
+        res = await self.session.execute(stmt)
+        remaining = {Sku.of(sku): int(on_hand) for sku, on_hand in res.all()}
+        if len(remaining) == len(requested):
+            await savepoint.commit()
+            return remaining
+        await savepoint.rollback()
+
+        # 満たせなかった SKU の現在庫を読み直して不足分をまとめて報告する
+        short = [s for s in requested if s not in remaining]
+        cur_stmt = select(InventoryItemModel.sku, InventoryItemModel.on_hand).where(
+            InventoryItemModel.location == location,
+            InventoryItemModel.sku.in_([s.value for s in short]),
+        )
+        have = {Sku.of(sku): int(on_hand) for sku, on_hand in (await self.session.execute(cur_stmt)).all()}
+        raise OutOfStockError(shortfalls=[Shortfall(sku=s, requested=requested[s], available=have.get(s, 0)) for s in short])
 
     async def list(self) -> Iterable[Inventory]:
         stmt = select(InventoryLocationModel).order_by(InventoryLocationModel.location.asc())
@@ -179,7 +412,7 @@ class SqlAlchemyInventoryRepository(AsyncInventoryRepository):
 
         # まとめてitems取得
         locations = [loc.location for loc in locs]
-        items_stmt = select(InventoryItemModel).where(InventoryItemModel.location.in_(locations))
+        items_stmt = select(InventoryItemModel).where(InventoryItemModel.location.in_(locations)).execution_options(populate_existing=True)
         items_res = await self.session.execute(items_stmt)
         items = cast("list[InventoryItemModel]", items_res.scalars().all())
 
@@ -187,6 +420,5 @@ class SqlAlchemyInventoryRepository(AsyncInventoryRepository):
         for it in items:
             items_by_loc.setdefault(it.location, []).append(it)
 
-        for loc in locs:
-            inventories.extend(_models_to_inventory(loc, items_by_loc.get(loc.location, [])))
+        inventories.extend(_models_to_inventory(loc, items_by_loc.get(loc.location, [])) for loc in locs)
         return inventories
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Self
+
+from hex_commerce_service.app.adapters.outbound.sqlalchemy_repositories import (
+    SqlAlchemyInventoryRepository,
+    SqlAlchemyOrderRepository,
+    SqlAlchemyProductRepository,
+)
+from hex_commerce_service.app.application.ports import AsyncUnitOfWork, EventPublisher
+from hex_commerce_service.app.infra.db.session import get_sessionmaker
+from hex_commerce_service.app.infra.outbox.repository import OutboxStore
+from hex_commerce_service.app.infra.outbox.wakeup import OutboxWakeup
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+@dataclass(slots=True)
+class OutboxEventPublisher(EventPublisher):
+    """publish() はバッファするだけ。commit 時に業務データと同じトランザクションで outbox に書き込む."""
+
+    pending: list[object] = field(default_factory=list)
+
+    def publish(self, event: object) -> None:
+        self.pending.append(event)
+
+    def drain(self) -> list[object]:
+        events, self.pending = self.pending, []
+        return events
+
+
+@dataclass(slots=True)
+class AsyncSqlAlchemyUnitOfWork(AsyncUnitOfWork):
+    """
+    AsyncSession 1つ分のトランザクション.
+
+    - `async with uow:` でセッションを開き、リポジトリを同じセッションに結びつける
+    - commit() は保留イベントを OutboxStore に積んでからセッションをコミットする(トランザクショナル outbox)
+    - 例外で抜けた場合、または commit() せずに抜けた場合は何も残らない
+    - wakeup を渡すと、outbox に行を積んだ commit の直後に同一プロセスの Dispatcher を起こす
+    """
+
+    sessionmaker: async_sessionmaker[AsyncSession] = field(default_factory=get_sessionmaker)
+    core_reads: bool = False
+    wakeup: OutboxWakeup | None = None
+
+    session: AsyncSession = field(init=False)
+    products: SqlAlchemyProductRepository = field(init=False)
+    orders: SqlAlchemyOrderRepository = field(init=False)
+    inventories: SqlAlchemyInventoryRepository = field(init=False)
+    events: OutboxEventPublisher = field(init=False, default_factory=OutboxEventPublisher)
+
+    _committed: bool = False
+
+    async def __aenter__(self) -> Self:
+        self.session = self.sessionmaker()
+        self.products = SqlAlchemyProductRepository(self.session, core_reads=self.core_reads)
+        self.orders = SqlAlchemyOrderRepository(self.session, core_reads=self.core_reads)
+        self.inventories = SqlAlchemyInventoryRepository(self.session)
+        self.events.drain()
+        self._committed = False
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        try:
+            if exc_type is not None:
+                await self.rollback()
+        finally:
+            # 未コミットの変更は close() で破棄される
+            self.events.drain()
+            await self.session.close()
+
+    async def commit(self) -> None:
+        # 保留イベントは1回の INSERT ... ON CONFLICT DO NOTHING で書き込む(重複は黙って捨てる)
+        enqueued = await OutboxStore(self.session).enqueue_many(self.events.drain())
+        await self.session.commit()
+        self._committed = True
+        if enqueued and self.wakeup is not None:
+            self.wakeup.notify()
+
+    async def rollback(self) -> None:
+        self.events.drain()
+        await self.session.rollback()
+        self._committed = False
+
+    @property
+    def committed(self) -> bool:
+        return self._committed
+
+
+@dataclass(slots=True)
+class AsyncSqlAlchemyUnitOfWorkFactory:
+    """リクエストごとに新しい UoW(= 新しい AsyncSession)を生成する."""
+
+    sessionmaker: async_sessionmaker[AsyncSession] = field(default_factory=get_sessionmaker)
+    core_reads: bool = False
+    wakeup: OutboxWakeup | None = None
+
+    def __call__(self) -> AsyncSqlAlchemyUnitOfWork:
+        return AsyncSqlAlchemyUnitOfWork(sessionmaker=self.sessionmaker, core_reads=self.core_reads, wakeup=self.wakeup)
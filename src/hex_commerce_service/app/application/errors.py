@@ -19,3 +19,11 @@ class PermanentExternalError(ExternalServiceError):
 
 class CircuitOpenError(ExternalServiceError):
     """Circuit breaker is open; requests are short-circuited."""
+
+
+class MessageBusOverloadedError(ApplicationError):
+    """A handler queue is full and the bus is configured to raise instead of waiting or dropping."""
+
+
+class MessageBusClosedError(ApplicationError):
+    """The bus has been closed and no longer accepts events."""
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+# 対数-線形バケット(HdrHistogram と同じ考え方)
+# - 0..15ns は 1ns 刻み
+# - それ以上は 2 の冪ごとに 8 等分する(相対誤差 12.5% 以下)
+# 2**64ns までを 496 バケットで覆う。
+_SUB_BITS = 3
+_LINEAR = 2 << _SUB_BITS
+_BUCKETS = ((64 - _SUB_BITS) << _SUB_BITS) + (1 << _SUB_BITS)
+
+
+def bucket_index(ns: int) -> int:
+    if ns < _LINEAR:
+        return ns
+    shift = ns.bit_length() - _SUB_BITS - 1
+    return (shift << _SUB_BITS) + (ns >> shift)
+
+
+def bucket_upper(index: int) -> int:
+    # バケットに入る最大の値。単位は ns
+    if index < _LINEAR:
+        return index
+    shift = (index >> _SUB_BITS) - 1
+    mantissa = (index & ((1 << _SUB_BITS) - 1)) | (1 << _SUB_BITS)
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    ナノ秒単位の所要時間のヒストグラム.
+
+    record はホットパスで呼ぶため、整数演算とリストの加算だけで済ませる(ロックなし)。
+    複数スレッドから同時に record すると、まれにカウントが1つ失われることがある(統計用途なので許容する)。
+    """
+
+    __slots__ = ("counts", "max_ns", "total_ns")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        # bucket_index を展開している(関数呼び出しと分岐を1つずつ省く。shift <= 0 は ns < _LINEAR と同じ)
+        shift = ns.bit_length() - _SUB_BITS - 1
+        self.counts[(shift << _SUB_BITS) + (ns >> shift) if shift > 0 else ns] += 1
+        self.total_ns += ns
+        if ns > self.max_ns:  # noqa: PLR1730  # max() の呼び出しより速い
+            self.max_ns = ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> int:
+        # q 番目の値が入るバケットの上端(ただし max_ns を超えない)。空なら 0
+        counts = list(self.counts)
+        total = sum(counts)
+        if total == 0:
+            return 0
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if seen >= rank:
+                return min(bucket_upper(index), self.max_ns)
+        return self.max_ns
+
+    def reset(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerLatency:
+    """(イベント型, ハンドラ) ごとの所要時間の要約. 値はナノ秒、パーセンタイルはバケット精度(誤差 12.5% 以下)."""
+
+    event_type: str
+    handler: str
+    count: int
+    p50_ns: int
+    p99_ns: int
+    max_ns: int
+    total_ns: int
+
+    @classmethod
+    def of(cls, event_type: str, handler: str, hist: LatencyHistogram) -> HandlerLatency:
+        return cls(
+            event_type=event_type,
+            handler=handler,
+            count=hist.count,
+            p50_ns=hist.quantile(0.5),
+            p99_ns=hist.quantile(0.99),
+            max_ns=hist.max_ns,
+            total_ns=hist.total_ns,
+        )
@@ -1,30 +1,561 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import TYPE_CHECKING, Any
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Final, Literal
+
+from hex_commerce_service.app.application.errors import MessageBusClosedError, MessageBusOverloadedError
+from hex_commerce_service.app.application.latency import HandlerLatency, LatencyHistogram
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator
+
+# キューが満杯のときの publish の振る舞い
+Backpressure = Literal["block", "drop_oldest", "raise"]
+
+_STOP: Final = object()
+
+
+class _DispatchTable[T]:
+    """
+    イベント型 -> 購読のリスト.
+
+    具象型ごとに MRO をたどって(具象型の購読が先、基底クラスの購読が後)タプルに解決し、resolved にキャッシュする。
+    登録があるとキャッシュを捨てる。publish 側は resolved を引くだけで、リストのコピーを作らない。
+    """
+
+    __slots__ = ("_by_type", "resolved")
+
+    def __init__(self) -> None:
+        self._by_type: dict[type[Any], list[T]] = {}
+        self.resolved: dict[type[Any], tuple[T, ...]] = {}
+
+    def add(self, event_type: type[Any], item: T) -> None:
+        self._by_type.setdefault(event_type, []).append(item)
+        self.resolved = {}
+
+    def resolve(self, cls: type[Any]) -> tuple[T, ...]:
+        # 解決中に add されても、古い結果は差し替え前の辞書にしか入らない
+        resolved = self.resolved
+        items = tuple(item for base in cls.__mro__ for item in self._by_type.get(base, ()))
+        resolved[cls] = items
+        return items
+
+    def __iter__(self) -> Iterator[T]:
+        for items in list(self._by_type.values()):
+            yield from items
+
+
+@dataclass(slots=True)
+class _Batcher:
+    handler: Callable[[list[Any]], None]
+    max_batch: int
+    max_delay: float
+    items: list[object] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    timer: threading.Timer | None = None
+
+    def take(self) -> list[list[object]]:
+        # 呼び出し側で lock を取っていること
+        items, self.items = self.items, []
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        return [items[i : i + self.max_batch] for i in range(0, len(items), self.max_batch)]
+
+
+def handler_name(handler: Callable[..., object]) -> str:
+    # 統計のキー。関数・メソッドは module.qualname、呼び出し可能オブジェクトはクラス名
+    qualname = getattr(handler, "__qualname__", None) or type(handler).__qualname__
+    module = getattr(handler, "__module__", None)
+    return f"{module}.{qualname}" if module else qualname
+
+
+@dataclass(slots=True)
+class FailureStats:
+    """ハンドラごとの失敗の集計(呼び出し単位。バッチハンドラは1回の失敗で1件)."""
+
+    count: int = 0
+    last_error: str = ""
+    last_event_type: str = ""
+
+
+@dataclass(slots=True)
+class PublishResult:
+    """
+    1イベントの publish 結果.
+
+    failures は (ハンドラ名, 例外)。queued=True はキューに積んだだけで、ハンドラの成否はまだ分からない
+    (failures はキューに積めなかった購読だけ)。
+    skipped=True は publish_many(key=...) で同じキーの前のイベントが失敗したため、どのハンドラにも渡していない。
+    publish ごとに生成するため frozen にはしない(frozen の __init__ は object.__setattr__ 経由で数倍遅い)。
+    """
+
+    event: object
+    failures: tuple[tuple[str, BaseException], ...] = ()
+    queued: bool = False
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures and not self.skipped
+
+    @property
+    def failed_handlers(self) -> tuple[str, ...]:
+        return tuple(name for name, _ in self.failures)
+
+
+# バッチハンドラの失敗。渡したバッチと、ハンドラ名・例外の組
+_BatchFailure = tuple[list[object], tuple[str, BaseException]]
+
+
+@dataclass(slots=True)
+class _OrderGate:
+    """
+    publish_many(key=...) 用: キーごとに最初に失敗したイベントの位置を覚え、それより後ろの同じキーのイベントを止める.
+
+    key が None、またはキーが None のイベントは止めない。
+    """
+
+    key: Callable[[object], object] | None
+    order: dict[int, int] = field(default_factory=dict)
+    blocked: dict[object, int] = field(default_factory=dict)
+    skipped: set[int] = field(default_factory=set)
+
+    def add(self, event: object) -> None:
+        self.order[id(event)] = len(self.order)
+
+    def behind(self, event: object) -> bool:
+        if not self.blocked or self.key is None:
+            return False
+        k = self.key(event)
+        return k in self.blocked and self.order.get(id(event), -1) > self.blocked[k]
+
+    def fail(self, event: object) -> None:
+        k = self.key(event) if self.key is not None else None
+        pos = self.order.get(id(event))
+        if k is not None and pos is not None and pos < self.blocked.get(k, pos + 1):
+            self.blocked[k] = pos
 
 
 class MessageBus:
     """
     同期ディスパッチの最小実装.
 
-    - subscribe(type, handler) でイベント型に対するハンドラを登録
-    - publish(event) で同型のハンドラを順次呼び出す(例外は握りつぶしてerrorsへ記録)
+    - subscribe(type, handler) でイベント型に対するハンドラを登録。基底クラス(DomainEvent など)にも登録できる
+    - publish(event) で event の型と基底クラスのハンドラを順次呼び出し、PublishResult を返す。
+      例外は握りつぶして記録する: errors は直近 max_errors 件の (event, exc) のリングバッファ、
+      failure_stats はハンドラ名ごとの失敗回数
+    - subscribe_batch(type, handler, max_batch, max_delay) はイベントのリストを受け取るハンドラを登録する。
+      max_batch 件たまるか max_delay 秒経つと渡す(max_delay=0 なら publish ごと)。時間切れの flush はタイマースレッドで実行される
+    - publish_many(events) は1回の呼び出し分をまとめてバッチハンドラに渡す(commit や outbox のバッチ単位)。
+      key を渡すと、あるイベントが失敗した後の同じキーのイベントは渡さずに skipped として返す(集約ごとの順序を保つ)
+    - ハンドラの呼び出しごとに perf_counter_ns で所要時間を測り、(イベント型, ハンドラ) ごとのヒストグラムに積む。
+      latency_stats() で p50 / p99 / max と呼び出し回数を読める(バッチハンドラは1回の呼び出しで1件)
     """
 
-    def __init__(self) -> None:
-        self._handlers: defaultdict[type[Any], list[Callable[[Any], None]]] = defaultdict(list)
-        self.errors: list[tuple[object, BaseException]] = []
+    def __init__(self, max_errors: int = 1_000) -> None:
+        self._handlers: _DispatchTable[Callable[[Any], None]] = _DispatchTable()
+        self._batchers: _DispatchTable[_Batcher] = _DispatchTable()
+        self.errors: deque[tuple[object, BaseException]] = deque(maxlen=max_errors)
+        self.failure_stats: dict[str, FailureStats] = {}
+        self._stats_lock = threading.Lock()
+        # 具象型 -> (ハンドラ, ヒストグラム) のタプル。_handlers.resolved と同じく登録があると捨てる
+        self._timed: dict[type[Any], tuple[tuple[Callable[[Any], None], LatencyHistogram], ...]] = {}
+        # (イベント型, id(ハンドラ)) -> (ハンドラ, ヒストグラム)。ハンドラがハッシュ可能とは限らないので id で引く
+        self._latency: dict[tuple[type[Any], int], tuple[Callable[..., object], LatencyHistogram]] = {}
 
     def subscribe(self, event_type: type[Any], handler: Callable[[Any], None]) -> None:
-        self._handlers[event_type].append(handler)
+        self._handlers.add(event_type, handler)
+        self._timed = {}
+
+    def subscribe_batch(
+        self,
+        event_type: type[Any],
+        handler: Callable[[list[Any]], None],
+        max_batch: int = 100,
+        max_delay: float = 0.0,
+    ) -> None:
+        self._batchers.add(event_type, _Batcher(handler=handler, max_batch=max_batch, max_delay=max_delay))
 
-    def publish(self, event: object) -> None:
-        for handler in list(self._handlers.get(type(event), [])):
+    def publish(self, event: object) -> PublishResult:
+        # ホットパス: 解決済みタプルを引いて回すだけ(_dispatch を呼ばずに展開している)
+        cls = type(event)
+        handlers = self._timed.get(cls)
+        if handlers is None:
+            handlers = self._resolve_timed(cls)
+        failures: list[tuple[str, BaseException]] | None = None
+        for handler, hist in handlers:
+            start = perf_counter_ns()
             try:
                 handler(event)
             except BaseException as exc:  # ここでは例外を潰して記録(PlaceOrder成功を阻害しない)
-                self.errors.append((event, exc))
+                failures = failures or []
+                failures.append(self._record(handler, [event], exc))
+            hist.record(perf_counter_ns() - start)
+        batchers = self._batchers.resolved.get(cls)
+        if batchers is None:
+            batchers = self._batchers.resolve(cls)
+        for batcher in batchers:
+            for batch, failure in self._buffer(batcher, event):
+                if any(e is event for e in batch):
+                    failures = failures or []
+                    failures.append(failure)
+        if failures:
+            return PublishResult(event, tuple(failures))
+        return PublishResult(event)
+
+    def publish_many(self, events: Iterable[object], key: Callable[[object], object] | None = None) -> list[PublishResult]:
+        # 単発ハンドラは1件ずつ順に、バッチハンドラは最後にまとめて1回(max_batch ごと)呼ぶ
+        published: list[object] = []
+        failures: dict[int, list[tuple[str, BaseException]]] = {}
+        touched: dict[int, _Batcher] = {}
+        gate = _OrderGate(key)
+        for event in events:
+            gate.add(event)
+            published.append(event)
+            if gate.behind(event):
+                gate.skipped.add(id(event))
+                continue
+            failed = self._dispatch(event)
+            if failed:
+                failures[id(event)] = failed
+                gate.fail(event)
+            cls = type(event)
+            batchers = self._batchers.resolved.get(cls)
+            if batchers is None:
+                batchers = self._batchers.resolve(cls)
+            for batcher in batchers:
+                with batcher.lock:
+                    batcher.items.append(event)
+                touched[id(batcher)] = batcher
+        for batcher in touched.values():
+            with batcher.lock:
+                batches = batcher.take()
+            for batch in batches:
+                # 前のバッチで失敗したイベントより後ろにある同じキーのイベントは渡さない
+                kept = [event for event in batch if not gate.behind(event)]
+                gate.skipped.update(id(event) for event in batch if gate.behind(event))
+                for failed_batch, failure in self._run_batches(batcher.handler, [kept] if kept else []):
+                    for event in failed_batch:
+                        failures.setdefault(id(event), []).append(failure)
+                        gate.fail(event)
+        return [PublishResult(event, tuple(failures.get(id(event), ())), skipped=id(event) in gate.skipped) for event in published]
+
+    def flush(self) -> None:
+        # 時間待ちで溜まっているバッチを今すぐ渡す。停止前などに呼ぶ
+        for batcher in self._batchers:
+            self._flush(batcher)
+
+    def latency_stats(self) -> list[HandlerLatency]:
+        # 呼び出しのあった (イベント型, ハンドラ) の要約。p99 の大きい順
+        with self._stats_lock:
+            entries = [(cls, handler, hist) for (cls, _), (handler, hist) in self._latency.items()]
+        rows = [HandlerLatency.of(cls.__name__, handler_name(handler), hist) for cls, handler, hist in entries]
+        rows = [row for row in rows if row.count]
+        rows.sort(key=lambda row: (-row.p99_ns, row.event_type, row.handler))
+        return rows
+
+    def reset_latency(self) -> None:
+        with self._stats_lock:
+            for _, hist in self._latency.values():
+                hist.reset()
+
+    def _resolve_timed(self, cls: type[Any]) -> tuple[tuple[Callable[[Any], None], LatencyHistogram], ...]:
+        timed = self._timed
+        handlers = self._handlers.resolved.get(cls)
+        if handlers is None:
+            handlers = self._handlers.resolve(cls)
+        pairs = tuple((handler, self._histogram(cls, handler)) for handler in handlers)
+        timed[cls] = pairs
+        return pairs
+
+    def _histogram(self, cls: type[Any], handler: Callable[..., object]) -> LatencyHistogram:
+        entry = self._latency.get((cls, id(handler)))
+        if entry is None:
+            with self._stats_lock:
+                entry = self._latency.setdefault((cls, id(handler)), (handler, LatencyHistogram()))
+        return entry[1]
+
+    def _dispatch(self, event: object) -> list[tuple[str, BaseException]]:
+        cls = type(event)
+        handlers = self._timed.get(cls)
+        if handlers is None:
+            handlers = self._resolve_timed(cls)
+        failures = []
+        for handler, hist in handlers:
+            start = perf_counter_ns()
+            try:
+                handler(event)
+            except BaseException as exc:  # ここでは例外を潰して記録(PlaceOrder成功を阻害しない)
+                failures.append(self._record(handler, [event], exc))
+            hist.record(perf_counter_ns() - start)
+        return failures
+
+    def _record(self, handler: Callable[..., object], events: list[object], exc: BaseException) -> tuple[str, BaseException]:
+        # 失敗時だけ通る。errors(deque)の append はスレッド安全、集計はロックで守る
+        name = handler_name(handler)
+        self.errors.extend((event, exc) for event in events)
+        with self._stats_lock:
+            stats = self.failure_stats.get(name)
+            if stats is None:
+                stats = self.failure_stats[name] = FailureStats()
+            stats.count += 1
+            stats.last_error = f"{type(exc).__name__}: {exc}"
+            stats.last_event_type = type(events[0]).__name__ if events else ""
+        return name, exc
+
+    def _buffer(self, batcher: _Batcher, event: object) -> list[_BatchFailure]:
+        with batcher.lock:
+            batcher.items.append(event)
+            if len(batcher.items) < batcher.max_batch and batcher.max_delay > 0:
+                if batcher.timer is None:
+                    batcher.timer = threading.Timer(batcher.max_delay, self._flush, args=(batcher,))
+                    batcher.timer.daemon = True
+                    batcher.timer.start()
+                return []
+            batches = batcher.take()
+        return self._run_batches(batcher.handler, batches)
+
+    def _flush(self, batcher: _Batcher) -> list[_BatchFailure]:
+        with batcher.lock:
+            batches = batcher.take()
+        return self._run_batches(batcher.handler, batches)
+
+    def _run_batches(self, handler: Callable[[list[Any]], None], batches: list[list[object]]) -> list[_BatchFailure]:
+        failed: list[_BatchFailure] = []
+        for batch in batches:
+            hist = self._histogram(type(batch[0]), handler)
+            start = perf_counter_ns()
+            try:
+                handler(batch)
+            except BaseException as exc:  # バッチ内の全イベントを失敗として記録
+                failed.append((batch, self._record(handler, batch, exc)))
+            hist.record(perf_counter_ns() - start)
+        return failed
+
+
+@dataclass(slots=True)
+class _Subscription:
+    handler: Callable[[Any], None]
+    queue: queue.Queue[object]
+    workers: list[threading.Thread] = field(default_factory=list)
+    dropped: int = 0
+    # バッチ購読: handler にはリストを渡す
+    batch: bool = False
+    max_batch: int = 1
+    max_delay: float = 0.0
+
+
+class QueuedMessageBus(MessageBus):
+    """
+    非同期モードのバス: publish はキューに積むだけで戻り、ハンドラはワーカースレッドで実行する.
+
+    - 購読(イベント型 x ハンドラ)ごとに上限 maxsize のキューと concurrency 本のワーカーを持つ。
+      concurrency=1 なら同じハンドラへの配送順は publish 順
+    - キューが満杯のときは backpressure に従う
+      - "block": 空きが出るまで publish が待つ(ハンドラ内から同じキューへ publish すると詰まるので注意)
+      - "drop_oldest": 一番古い未処理イベントを捨てて積む(dropped に計上)
+      - "raise": MessageBusOverloadedError
+    - ハンドラの例外は同期モードと同じく errors / failure_stats に、所要時間は latency_stats() に記録する
+      (ワーカー内での実行時間。キュー待ちは含まない)。
+      publish の結果は queued=True で、ハンドラの失敗は含まない
+    - publish_many(UoW.commit が使う)は例外を出さない。積めなかった購読は errors / failure_stats に記録し、結果の failures に含める
+    - close() で受付を止め、積まれている分を処理しきってからワーカーを止める
+
+    FastAPI の同期ルートはスレッドプールから UoW.commit -> publish を呼ぶため、
+    スレッド安全な queue.Queue とワーカースレッドで実装している。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1_000,
+        backpressure: Backpressure = "block",
+        concurrency: int = 1,
+        max_errors: int = 1_000,
+    ) -> None:
+        super().__init__(max_errors=max_errors)
+        self.maxsize = maxsize
+        self.backpressure: Backpressure = backpressure
+        self.concurrency = concurrency
+        self._subscriptions: _DispatchTable[_Subscription] = _DispatchTable()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def subscribe(self, event_type: type[Any], handler: Callable[[Any], None], concurrency: int | None = None) -> None:
+        self._add(event_type, _Subscription(handler=handler, queue=queue.Queue(maxsize=self.maxsize)), concurrency)
+
+    def subscribe_batch(
+        self,
+        event_type: type[Any],
+        handler: Callable[[list[Any]], None],
+        max_batch: int = 100,
+        max_delay: float = 0.0,
+        concurrency: int | None = None,
+    ) -> None:
+        # ワーカーがキューから最大 max_batch 件を(最初の1件から max_delay 秒まで待って)取り出して渡す
+        sub = _Subscription(
+            handler=handler,
+            queue=queue.Queue(maxsize=self.maxsize),
+            batch=True,
+            max_batch=max_batch,
+            max_delay=max_delay,
+        )
+        self._add(event_type, sub, concurrency)
+
+    def _add(self, event_type: type[Any], sub: _Subscription, concurrency: int | None) -> None:
+        target = self._work_batch if sub.batch else self._work
+        with self._lock:
+            if self._closed:
+                raise MessageBusClosedError("message bus is closed")
+            for i in range(concurrency or self.concurrency):
+                name = f"bus-{event_type.__name__}-{getattr(sub.handler, '__name__', 'handler')}-{i}"
+                worker = threading.Thread(target=target, args=(sub,), name=name, daemon=True)
+                sub.workers.append(worker)
+                worker.start()
+            self._subscriptions.add(event_type, sub)
+
+    def publish(self, event: object) -> PublishResult:
+        if self._closed:
+            raise MessageBusClosedError("message bus is closed")
+        for sub in self._subscriptions_for(event):
+            self._offer(sub, event)
+        return PublishResult(event, queued=True)
+
+    def publish_many(self, events: Iterable[object], key: Callable[[object], object] | None = None) -> list[PublishResult]:  # noqa: ARG002
+        # UoW.commit や outbox の ack 判定から呼ばれ、データは確定済みなので例外は出さない。
+        # 満杯(backpressure="raise")・停止済みで積めなかった購読は、そのハンドラの失敗として記録して結果に含める。
+        # キューに積むだけでハンドラの成否は分からないため、key による打ち切りはしない
+        results = []
+        for event in events:
+            failures = []
+            for sub in self._subscriptions_for(event):
+                if self._closed:
+                    failures.append(self._record(sub.handler, [event], MessageBusClosedError("message bus is closed")))
+                    continue
+                try:
+                    self._offer(sub, event)
+                except MessageBusOverloadedError as exc:
+                    failures.append(self._record(sub.handler, [event], exc))
+            results.append(PublishResult(event, tuple(failures), queued=True))
+        return results
+
+    def _subscriptions_for(self, event: object) -> tuple[_Subscription, ...]:
+        cls = type(event)
+        subs = self._subscriptions.resolved.get(cls)
+        if subs is None:
+            subs = self._subscriptions.resolve(cls)
+        return subs
+
+    @property
+    def dropped(self) -> int:
+        return sum(sub.dropped for sub in self._subscriptions)
+
+    def pending(self) -> int:
+        return sum(sub.queue.qsize() for sub in self._subscriptions)
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """
+        Wait until every queued event has been handled.
+
+        Returns:
+            False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for sub in self._subscriptions:
+            q = sub.queue
+            with q.all_tasks_done:
+                while q.unfinished_tasks:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    q.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = None) -> bool:
+        """
+        Stop accepting events, drain the queues and stop the workers.
+
+        Returns:
+            False if the queues could not be drained within the timeout (workers are left running).
+        """
+        with self._lock:
+            self._closed = True
+        if not self.drain(timeout):
+            return False
+        for sub in self._subscriptions:
+            for _ in sub.workers:
+                sub.queue.put(_STOP)
+            for worker in sub.workers:
+                worker.join()
+        return True
+
+    def _offer(self, sub: _Subscription, event: object) -> None:
+        q = sub.queue
+        if self.backpressure == "block":
+            q.put(event)
+            return
+        while True:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                if self.backpressure == "raise":
+                    msg = f"queue for {getattr(sub.handler, '__name__', sub.handler)!s} is full ({self.maxsize})"
+                    raise MessageBusOverloadedError(msg) from None
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    continue
+                q.task_done()
+                with self._lock:
+                    sub.dropped += 1
+            else:
+                return
+
+    def _work(self, sub: _Subscription) -> None:
+        q = sub.queue
+        while True:
+            event = q.get()
+            try:
+                if event is _STOP:
+                    return
+                hist = self._histogram(type(event), sub.handler)
+                start = perf_counter_ns()
+                try:
+                    sub.handler(event)
+                except Exception as exc:  # 同期モードと同じく記録のみ(ワーカーは止めない)
+                    self._record(sub.handler, [event], exc)
+                hist.record(perf_counter_ns() - start)
+            finally:
+                q.task_done()
+
+    def _work_batch(self, sub: _Subscription) -> None:
+        q = sub.queue
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + sub.max_delay
+            while len(batch) < sub.max_batch and batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            events = batch[:-1] if stop else batch
+            start = perf_counter_ns()
+            try:
+                if events:
+                    sub.handler(events)
+            except Exception as exc:
+                self._record(sub.handler, events, exc)
+            finally:
+                if events:
+                    self._histogram(type(events[0]), sub.handler).record(perf_counter_ns() - start)
+                for _ in batch:
+                    q.task_done()
+            if stop:
+                return
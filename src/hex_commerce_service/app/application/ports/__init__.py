@@ -7,17 +7,23 @@ from .repositories_async import (
     AsyncInventoryRepository,
     AsyncOrderRepository,
     AsyncProductRepository,
+    OrderCursor,
+    OrderPage,
 )
 from .unit_of_work import UnitOfWork
+from .unit_of_work_async import AsyncUnitOfWork
 
 __all__ = [
     "AsyncInventoryRepository",
     "AsyncOrderRepository",
     "AsyncProductRepository",
+    "AsyncUnitOfWork",
     "EmailNotifier",
     "EventPublisher",
     "IdGenerator",
     "InventoryRepository",
+    "OrderCursor",
+    "OrderPage",
     "OrderRepository",
     "PaymentGateway",
     "PaymentResult",
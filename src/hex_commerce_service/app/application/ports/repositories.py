@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Mapping
 
 from hex_commerce_service.app.domain.entities import Inventory, Order, Product
 from hex_commerce_service.app.domain.value_objects import OrderId, Sku
@@ -12,6 +12,7 @@ from hex_commerce_service.app.domain.value_objects import OrderId, Sku
 @runtime_checkable
 class ProductRepository(Protocol):
     def get_by_sku(self, sku: Sku) -> Product | None: ...
+    def get_many_by_sku(self, skus: Iterable[Sku]) -> Mapping[Sku, Product]: ...
     def add(self, product: Product) -> None: ...
 
 
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import AsyncIterator, Iterable, Mapping
+    from datetime import datetime
 
 from hex_commerce_service.app.domain.entities import Inventory, Order, Product
 from hex_commerce_service.app.domain.value_objects import OrderId, Sku
@@ -12,19 +14,38 @@ from hex_commerce_service.app.domain.value_objects import OrderId, Sku
 @runtime_checkable
 class AsyncProductRepository(Protocol):
     async def get_by_sku(self, sku: Sku) -> Product | None: ...
+    async def get_many_by_sku(self, skus: Iterable[Sku]) -> Mapping[Sku, Product]: ...
     async def add(self, product: Product) -> None: ...
     async def list(self) -> Iterable[Product]: ...
 
 
+@dataclass(frozen=True, slots=True)
+class OrderCursor:
+    """Keyset position in the (created_at, id) order; resume strictly after it."""
+
+    created_at: datetime
+    id: str
+
+
+@dataclass(frozen=True, slots=True)
+class OrderPage:
+    orders: list[Order]
+    next_cursor: OrderCursor | None  # None when this is the last page
+
+
 @runtime_checkable
 class AsyncOrderRepository(Protocol):
     async def get(self, order_id: OrderId) -> Order | None: ...
     async def add(self, order: Order) -> None: ...
     async def list(self) -> Iterable[Order]: ...
+    def iter_order_pages(self, after: OrderCursor | None = None, page_size: int = 500) -> AsyncIterator[OrderPage]: ...
+    def iter_orders(self, after: OrderCursor | None = None, page_size: int = 500) -> AsyncIterator[Order]: ...
 
 
 @runtime_checkable
 class AsyncInventoryRepository(Protocol):
     async def get(self, location: str = "default") -> Inventory | None: ...
+    async def exists(self, location: str) -> bool: ...
     async def upsert(self, inventory: Inventory) -> None: ...
+    async def allocate(self, location: str, lines: Iterable[tuple[Sku, int]]) -> Mapping[Sku, int]: ...
     async def list(self) -> Iterable[Inventory]: ...
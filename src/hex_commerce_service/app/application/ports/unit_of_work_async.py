@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Protocol, Self, runtime_checkable
+
+from .events import EventPublisher
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from .repositories_async import AsyncInventoryRepository, AsyncOrderRepository, AsyncProductRepository
+
+
+@runtime_checkable
+class AsyncUnitOfWork(Protocol):
+    products: AsyncProductRepository
+    orders: AsyncOrderRepository
+    inventories: AsyncInventoryRepository
+    # publish() は同期のまま。イベントは commit と同じトランザクションで永続化される
+    events: EventPublisher
+
+    async def __aenter__(self) -> Self: ...
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None: ...
+    async def commit(self) -> None: ...
+    async def rollback(self) -> None: ...
@@ -1,10 +1,12 @@
-from .allocate_stock import AllocateStockCommand, AllocateStockResult, AllocateStockUseCase
-from .place_order import NewOrderItem, PlaceOrderCommand, PlaceOrderResult, PlaceOrderUseCase
+from .allocate_stock import AllocateStockCommand, AllocateStockResult, AllocateStockUseCase, AsyncAllocateStockUseCase
+from .place_order import AsyncPlaceOrderUseCase, NewOrderItem, PlaceOrderCommand, PlaceOrderResult, PlaceOrderUseCase
 
 __all__ = [
     "AllocateStockCommand",
     "AllocateStockResult",
     "AllocateStockUseCase",
+    "AsyncAllocateStockUseCase",
+    "AsyncPlaceOrderUseCase",
     "NewOrderItem",
     "PlaceOrderCommand",
     "PlaceOrderResult",
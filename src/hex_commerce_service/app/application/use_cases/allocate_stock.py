@@ -3,8 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from hex_commerce_service.app.application.messages.events import StockAllocated
-from hex_commerce_service.app.application.ports import UnitOfWork
-from hex_commerce_service.app.domain.errors import OutOfStockError, ValidationError
+from hex_commerce_service.app.application.ports import AsyncUnitOfWork, UnitOfWork
+from hex_commerce_service.app.domain.errors import ValidationError
 from hex_commerce_service.app.domain.value_objects import OrderId
 
 
@@ -25,25 +25,47 @@ class AllocateStockUseCase:
         self._uow = uow
 
     def execute(self, cmd: AllocateStockCommand) -> AllocateStockResult:
-        order = self._uow.orders.get(cmd.order_id)
-        if order is None:
-            raise ValidationError(f"order not found: {cmd.order_id}")
-
-        inventory = self._uow.inventories.get(cmd.location)
-        if inventory is None:
-            raise ValidationError(f"inventory not found: {cmd.location}")
+        # 読み込みもトランザクションに含め、在庫集約の変更をロールバック対象にする
+        with self._uow:
+            order = self._uow.orders.get(cmd.order_id)
+            if order is None:
+                raise ValidationError(f"order not found: {cmd.order_id}")
 
-        # 事前チェック。全行を満たせるか。
-        for line in order.lines:
-            if inventory.available(line.sku) < line.quantity:
-                raise OutOfStockError(f"insufficient stock for {line.sku}: need {line.quantity}, have {inventory.available(line.sku)}")
+            inventory = self._uow.inventories.get(cmd.location)
+            if inventory is None:
+                raise ValidationError(f"inventory not found: {cmd.location}")
 
-        # 実際の割当。原子的に近い挙動。
-        with self._uow:
-            for line in order.lines:
-                inventory.allocate(line.sku, line.quantity)
+            # SKU ごとに集計済みの数量で全行を一括検証し、満たせる場合のみまとめて割当てる
+            inventory.allocate_many(order.quantities().items())
             self._uow.inventories.upsert(inventory)
             self._uow.events.publish(StockAllocated(order_id=order.id, location=cmd.location))
             self._uow.commit()
 
         return AllocateStockResult(order_id=str(order.id), location=cmd.location)
+
+
+class AsyncAllocateStockUseCase:
+    """
+    AllocateStockUseCase の非同期版.
+
+    在庫集約は読み込まず(ロケーションの存在だけを確認する)、注文の SKU 行だけを DB 側の条件付き減算で割り当てる。
+    エラーは同期版と同じ(存在しないロケーションは ValidationError)。
+    """
+
+    def __init__(self, uow: AsyncUnitOfWork) -> None:
+        self._uow = uow
+
+    async def execute(self, cmd: AllocateStockCommand) -> AllocateStockResult:
+        async with self._uow:
+            order = await self._uow.orders.get(cmd.order_id)
+            if order is None:
+                raise ValidationError(f"order not found: {cmd.order_id}")
+
+            if not await self._uow.inventories.exists(cmd.location):
+                raise ValidationError(f"inventory not found: {cmd.location}")
+
+            await self._uow.inventories.allocate(cmd.location, order.quantities().items())
+            self._uow.events.publish(StockAllocated(order_id=order.id, location=cmd.location))
+            await self._uow.commit()
+
+        return AllocateStockResult(order_id=str(order.id), location=cmd.location)
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from hex_commerce_service.app.application.messages.events import OrderPlaced
 from hex_commerce_service.app.application.ports.ids import IdGenerator
 from hex_commerce_service.app.application.ports.unit_of_work import UnitOfWork
-from hex_commerce_service.app.domain.entities import Order, OrderLine
+from hex_commerce_service.app.application.ports.unit_of_work_async import AsyncUnitOfWork
+from hex_commerce_service.app.domain.entities import Order, OrderLine, Product
 from hex_commerce_service.app.domain.errors import CurrencyMismatchError, ValidationError
 from hex_commerce_service.app.domain.value_objects import Money, Sku
 
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
 
 @dataclass(frozen=True, slots=True)
 class NewOrderItem:
@@ -36,32 +41,9 @@ class PlaceOrderUseCase:
         if not cmd.items:
             raise ValidationError("order must contain at least one item")
 
-        # 1) すべてのSKUが存在し、通貨が一致していることを検証
-        products = []
-        for item in cmd.items:
-            product = self._uow.products.get_by_sku(item.sku)
-            if product is None:
-                raise ValidationError(f"unknown SKU: {item.sku}")
-            if item.quantity <= 0:
-                raise ValidationError("quantity must be positive")
-            products.append(product)
-
-        # 通貨整合性チェック。最初の商品の通貨に合わせる。
-        currency = str(products[0].unit_price.currency)
-        for p in products[1:]:
-            if str(p.unit_price.currency) != currency:
-                raise CurrencyMismatchError("all items must share the same currency")
-
-        # 2) Order を生成し、OrderLine を追加
-        order = Order(id=self._id_gen.new_order_id(), currency=currency)
-        for item, product in zip(cmd.items, products, strict=True):
-            order.add_line(
-                OrderLine(
-                    sku=item.sku,
-                    quantity=item.quantity,
-                    unit_price=product.unit_price,
-                )
-            )
+        # 1) 商品は1回でまとめて取得し、2) Order を組み立てる
+        found = self._uow.products.get_many_by_sku({item.sku for item in cmd.items})
+        order = _build_order(cmd, found, self._id_gen)
 
         # 3) 永続化 & イベント発行
         with self._uow:
@@ -70,3 +52,54 @@ class PlaceOrderUseCase:
             self._uow.commit()
 
         return PlaceOrderResult(order_id=str(order.id), total=order.total)
+
+
+class AsyncPlaceOrderUseCase:
+    """PlaceOrderUseCase の非同期版。読み込みから commit までを1トランザクションで行う."""
+
+    def __init__(self, uow: AsyncUnitOfWork, id_gen: IdGenerator) -> None:
+        self._uow = uow
+        self._id_gen = id_gen
+
+    async def execute(self, cmd: PlaceOrderCommand) -> PlaceOrderResult:
+        if not cmd.items:
+            raise ValidationError("order must contain at least one item")
+
+        async with self._uow:
+            found = await self._uow.products.get_many_by_sku({item.sku for item in cmd.items})
+            order = _build_order(cmd, found, self._id_gen)
+            await self._uow.orders.add(order)
+            self._uow.events.publish(OrderPlaced(order_id=order.id, total=order.total))
+            await self._uow.commit()
+
+        return PlaceOrderResult(order_id=str(order.id), total=order.total)
+
+
+def _build_order(cmd: PlaceOrderCommand, found: Mapping[Sku, Product], id_gen: IdGenerator) -> Order:
+    # すべてのSKUが存在し、通貨が一致していることを検証
+    products = []
+    for item in cmd.items:
+        product = found.get(item.sku)
+        if product is None:
+            raise ValidationError(f"unknown SKU: {item.sku}")
+        if item.quantity <= 0:
+            raise ValidationError("quantity must be positive")
+        products.append(product)
+
+    # 通貨整合性チェック。最初の商品の通貨に合わせる。
+    currency = str(products[0].unit_price.currency)
+    for p in products[1:]:
+        if str(p.unit_price.currency) != currency:
+            raise CurrencyMismatchError("all items must share the same currency")
+
+    # Order を生成し、OrderLine を追加
+    order = Order(id=id_gen.new_order_id(), currency=currency)
+    for item, product in zip(cmd.items, products, strict=True):
+        order.add_line(
+            OrderLine(
+                sku=item.sku,
+                quantity=item.quantity,
+                unit_price=product.unit_price,
+            )
+        )
+    return order
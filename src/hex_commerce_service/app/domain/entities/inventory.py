@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-from hex_commerce_service.app.domain.errors import NegativeQuantityError, OutOfStockError
+from hex_commerce_service.app.domain.errors import NegativeQuantityError, OutOfStockError, Shortfall
 from hex_commerce_service.app.domain.value_objects import Sku
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 
 @dataclass(slots=True)
 class Inventory:
@@ -12,6 +16,12 @@ class Inventory:
 
     location: str = "default"
     _on_hand: dict[Sku, int] = field(default_factory=dict)
+    # 変更セット: begin_changes() 以降に初めて書き換えたSKUの元の数量(未登録なら None)
+    _changes: dict[Sku, int | None] | None = field(default=None, repr=False)
+    _version: int = field(default=0, repr=False)
+    _base_version: int = field(default=0, repr=False)
+    # 永続化済みの状態から変更された SKU。None は「基準となる永続化状態がない」(全体を書き込む)
+    _dirty: set[Sku] | None = field(default=None, repr=False)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Inventory):
@@ -21,18 +31,35 @@ class Inventory:
     def __hash__(self) -> int:
         return hash(self.location)
 
+    @property
+    def version(self) -> int:
+        """Number of mutations applied to this aggregate."""
+        return self._version
+
+    @property
+    def dirty_skus(self) -> frozenset[Sku] | None:
+        """SKUs changed or removed since mark_clean(); None if never synced with storage."""
+        return None if self._dirty is None else frozenset(self._dirty)
+
+    def mark_clean(self) -> None:
+        """Declare the current quantities as the persisted baseline."""
+        self._dirty = set()
+
+    def skus(self) -> frozenset[Sku]:
+        return frozenset(self._on_hand)
+
     def available(self, sku: Sku) -> int:
         return self._on_hand.get(sku, 0)
 
     def set_on_hand(self, sku: Sku, qty: int) -> None:
         if qty < 0:
             raise NegativeQuantityError("on-hand cannot be negative")
-        self._on_hand[sku] = qty
+        self._write(sku, qty)
 
     def add(self, sku: Sku, qty: int) -> None:
         if qty <= 0:
             raise NegativeQuantityError("add quantity must be positive")
-        self._on_hand[sku] = self.available(sku) + qty
+        self._write(sku, self.available(sku) + qty)
 
     def remove(self, sku: Sku, qty: int) -> None:
         if qty <= 0:
@@ -40,7 +67,13 @@ class Inventory:
         cur = self.available(sku)
         if qty > cur:
             raise OutOfStockError(f"cannot remove {qty}; only {cur} available")
-        self._on_hand[sku] = cur - qty
+        self._write(sku, cur - qty)
+
+    def discard(self, sku: Sku) -> None:
+        """Stop stocking a SKU at this location (drops the entry, not just zero on-hand)."""
+        if sku in self._on_hand:
+            self._touch(sku)
+            del self._on_hand[sku]
 
     def can_fulfill(self, sku: Sku, qty: int) -> bool:
         if qty <= 0:
@@ -50,4 +83,73 @@ class Inventory:
     def allocate(self, sku: Sku, qty: int) -> None:
         if not self.can_fulfill(sku, qty):
             raise OutOfStockError(f"requested {qty} of {sku} exceeds availability {self.available(sku)}")
-        self._on_hand[sku] = self.available(sku) - qty
+        self._write(sku, self.available(sku) - qty)
+
+    def allocate_many(self, lines: Iterable[tuple[Sku, int]]) -> None:
+        """
+        Allocate several (sku, qty) lines atomically.
+
+        Quantities are summed per SKU and validated in one pass; nothing is written
+        unless every SKU can be fulfilled. All shortfalls are reported together.
+
+        Raises:
+            NegativeQuantityError: a line has a non-positive quantity.
+            OutOfStockError: at least one SKU cannot be fulfilled (see `shortfalls`).
+        """
+        requested: dict[Sku, int] = {}
+        for sku, qty in lines:
+            if qty <= 0:
+                raise NegativeQuantityError("requested quantity must be positive")
+            requested[sku] = requested.get(sku, 0) + qty
+
+        on_hand = self._on_hand
+        remaining: list[tuple[Sku, int]] = []
+        shortfalls: list[Shortfall] = []
+        for sku, qty in requested.items():
+            cur = on_hand.get(sku, 0)
+            if qty > cur:
+                shortfalls.append(Shortfall(sku=sku, requested=qty, available=cur))
+            else:
+                remaining.append((sku, cur - qty))
+        if shortfalls:
+            raise OutOfStockError(shortfalls=shortfalls)
+
+        for sku, qty in remaining:
+            self._write(sku, qty)
+
+    # change set (transactional undo)
+    def begin_changes(self) -> None:
+        """Start recording the original quantity of each SKU on its first mutation."""
+        if self._changes is None:
+            self._changes = {}
+            self._base_version = self._version
+
+    def rollback_changes(self) -> None:
+        """Restore every SKU touched since begin_changes() and stop recording."""
+        changes = self._changes
+        if changes is None:
+            return
+        for sku, previous in changes.items():
+            if previous is None:
+                self._on_hand.pop(sku, None)
+            else:
+                self._on_hand[sku] = previous
+        self._version = self._base_version
+        self._changes = None
+
+    def discard_changes(self) -> None:
+        """Keep current quantities and stop recording."""
+        self._changes = None
+
+    def _write(self, sku: Sku, qty: int) -> None:
+        self._touch(sku)
+        self._on_hand[sku] = qty
+
+    def _touch(self, sku: Sku) -> None:
+        # 書き込み直前に呼ぶ: 変更セットへの元の値の記録、ダーティ印、バージョン更新
+        changes = self._changes
+        if changes is not None and sku not in changes:
+            changes[sku] = self._on_hand.get(sku)
+        if self._dirty is not None:
+            self._dirty.add(sku)
+        self._version += 1
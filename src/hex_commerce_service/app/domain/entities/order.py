@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import TYPE_CHECKING, ClassVar
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Mapping
 
 from hex_commerce_service.app.domain.errors import (
     CurrencyMismatchError,
     NegativeQuantityError,
+    OrderStateError,
     ValidationError,
 )
 from hex_commerce_service.app.domain.value_objects import Money, OrderId, Sku
@@ -41,17 +43,29 @@ class Order:
 
     Invariants:
       - All lines must share the same currency as the order.
-      - Order total equals the sum of line totals (computed).
+      - Order total equals the sum of line totals (maintained incrementally by add_line/remove_line_at).
     """
 
     id: OrderId
     currency: str  # ISO4217-like (CurrencyCode). Keep as str to ease serialization boundary.
     lines: list[OrderLine] = field(default_factory=list)
 
+    # 集計キャッシュ。lines を直接書き換えると不整合になるため、必ず add_line/remove_line_at を通す。
+    _total: Money = field(init=False, repr=False)
+    _qty_by_sku: dict[Sku, int] = field(init=False, repr=False, default_factory=dict)
+
+    # テスト用: True の間はキャッシュを読むたびに全件再計算と突き合わせる
+    consistency_checks: ClassVar[bool] = False
+
     def __post_init__(self) -> None:
         cur = self.currency
         if len(cur) != 3 or not cur.isalpha() or not cur.isupper():
             raise ValidationError("order.currency must be 3 uppercase letters")
+        if any(str(ln.unit_price.currency) != cur for ln in self.lines):
+            raise CurrencyMismatchError("line currency must match order currency")
+        self._total = Money.sum((ln.line_total for ln in self.lines), cur)
+        for ln in self.lines:
+            self._qty_by_sku[ln.sku] = self._qty_by_sku.get(ln.sku, 0) + ln.quantity
 
     # identity-based equality/hash
     def __eq__(self, other: object) -> bool:
@@ -67,6 +81,8 @@ class Order:
         if str(line.unit_price.currency) != self.currency:
             raise CurrencyMismatchError("line currency must match order currency")
         self.lines.append(line)
+        self._total += line.line_total
+        self._qty_by_sku[line.sku] = self._qty_by_sku.get(line.sku, 0) + line.quantity
 
     def add_item(self, sku: Sku, quantity: int, unit_price: Money) -> None:
         if str(unit_price.currency) != self.currency:
@@ -75,17 +91,42 @@ class Order:
 
     def remove_line_at(self, index: int) -> OrderLine:
         try:
-            return self.lines.pop(index)
+            line = self.lines.pop(index)
         except IndexError as exc:
             raise ValidationError(f"no order line at index {index}") from exc
+        self._total -= line.line_total
+        remaining = self._qty_by_sku[line.sku] - line.quantity
+        if remaining:
+            self._qty_by_sku[line.sku] = remaining
+        else:
+            del self._qty_by_sku[line.sku]
+        return line
 
     @property
     def total(self) -> Money:
-        # sum via Money addition (same currency guaranteed)
-        total = Money.from_major(0, self.currency)
+        if Order.consistency_checks:
+            self.check_consistency()
+        return self._total
+
+    def quantity_of(self, sku: Sku) -> int:
+        if Order.consistency_checks:
+            self.check_consistency()
+        return self._qty_by_sku.get(sku, 0)
+
+    def quantities(self) -> Mapping[Sku, int]:
+        # SKU ごとの合計数量(読み取り専用ビュー)
+        if Order.consistency_checks:
+            self.check_consistency()
+        return MappingProxyType(self._qty_by_sku)
+
+    def check_consistency(self) -> None:
+        # キャッシュした合計・SKU別数量を全件再計算と突き合わせる。ずれていれば OrderStateError
+        expected_total = Money.sum((ln.line_total for ln in self.lines), self.currency)
+        expected_qty: dict[Sku, int] = {}
         for ln in self.lines:
-            total += ln.line_total
-        return total
+            expected_qty[ln.sku] = expected_qty.get(ln.sku, 0) + ln.quantity
+        if expected_total != self._total or expected_qty != self._qty_by_sku:
+            raise OrderStateError(f"order {self.id} aggregates out of sync: cached total {self._total}, recomputed {expected_total}")
 
     def iterate_skus(self) -> Iterable[Sku]:
         return (ln.sku for ln in self.lines)
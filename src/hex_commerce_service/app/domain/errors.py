@@ -1,5 +1,13 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from hex_commerce_service.app.domain.value_objects import Sku
+
 
 class DomainError(Exception):
     """Base class for domain-level errors."""
@@ -13,9 +21,23 @@ class CurrencyMismatchError(DomainError):
     """Tried to combine values with different currencies."""
 
 
+@dataclass(frozen=True, slots=True)
+class Shortfall:
+    sku: Sku
+    requested: int
+    available: int
+
+
 class OutOfStockError(DomainError):
     """Insufficient inventory to fulfill a request."""
 
+    def __init__(self, message: str | None = None, shortfalls: Iterable[Shortfall] = ()) -> None:
+        self.shortfalls = tuple(shortfalls)
+        if message is None:
+            detail = ", ".join(f"{s.sku} (need {s.requested}, have {s.available})" for s in self.shortfalls)
+            message = f"insufficient stock for {detail}"
+        super().__init__(message)
+
 
 class NegativeQuantityError(DomainError):
     """Quantity must be positive."""
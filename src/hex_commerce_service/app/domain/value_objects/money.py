@@ -1,18 +1,30 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
 from functools import total_ordering
-from typing import Any, ClassVar, NewType
+from typing import TYPE_CHECKING, Any, ClassVar, NewType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
 
 CurrencyCode = NewType("CurrencyCode", str)
 
+# 検証済み通貨コードのインターン表。同じ通貨は同一オブジェクトになり `is` で比較できる。
+_CURRENCIES: dict[str, CurrencyCode] = {}
+
 
 def _validate_currency(code: str) -> CurrencyCode:
+    cached = _CURRENCIES.get(code)
+    if cached is not None:
+        return cached
     if len(code) != 3 or not code.isalpha() or not code.isupper():
         msg = "currency must be 3 uppercase letters (ISO 4217-like)"
         raise ValueError(msg)
-    return CurrencyCode(code)
+    cur = CurrencyCode(sys.intern(code))
+    _CURRENCIES[cur] = cur
+    return cur
 
 
 def _coerce_decimal(value: Decimal | int | str) -> Decimal:
@@ -31,68 +43,106 @@ def _coerce_decimal(value: Decimal | int | str) -> Decimal:
 
 
 @total_ordering
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, init=False, repr=False)
 class Money:
-    """A value object representing a monetary amount in a specific currency."""
+    """
+    A value object representing a monetary amount in a specific currency.
+
+    The amount is stored as integer minor units (1/100). Arithmetic between Money
+    values is plain int arithmetic; Decimal is only used at the boundaries
+    (construction from major units, `amount`, multiplication/division by Decimal).
+    """
 
-    amount: Decimal
+    _minor: int
     currency: CurrencyCode
 
     _QUANT: ClassVar[Decimal] = Decimal("0.01")
     _ROUNDING: ClassVar[Any] = ROUND_HALF_EVEN  # typing-only: decimal.Rounding
 
-    def __post_init__(self) -> None:
-        cur = _validate_currency(str(self.currency))
+    def __init__(self, amount: Decimal | int | str, currency: str) -> None:
+        cur = _validate_currency(str(currency))
+        if type(amount) is int:
+            minor = amount * 100
+        else:
+            minor = int((_coerce_decimal(amount) * 100).to_integral_value(rounding=self._ROUNDING))
+        object.__setattr__(self, "_minor", minor)
         object.__setattr__(self, "currency", cur)
 
-        amt = _coerce_decimal(self.amount)
-        q = amt.quantize(self._QUANT, rounding=self._ROUNDING)
-        object.__setattr__(self, "amount", q)
+    @classmethod
+    def _of(cls, minor: int, currency: CurrencyCode) -> Money:
+        # 検証済みの値から直接生成する内部用の高速パス
+        m = object.__new__(cls)
+        object.__setattr__(m, "_minor", minor)  # noqa: PLC2801
+        object.__setattr__(m, "currency", currency)  # noqa: PLC2801
+        return m
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self._minor).scaleb(-2)
 
     @classmethod
     def from_major(cls, amount: Decimal | int | str, currency: str) -> Money:
-        return cls(amount=_coerce_decimal(amount), currency=_validate_currency(currency))
+        return cls(amount=amount, currency=currency)
 
     @classmethod
     def from_minor(cls, minor: int, currency: str) -> Money:
+        if type(minor) is int:
+            return cls._of(minor, _validate_currency(currency))
         major = Decimal(minor) / Decimal(100)
-        return cls(amount=major, currency=_validate_currency(currency))
+        return cls(amount=major, currency=currency)
+
+    @classmethod
+    def sum(cls, items: Iterable[Money], currency: str) -> Money:
+        cur = _validate_currency(currency)
+        total = 0
+        for m in items:
+            if m.currency is not cur and m.currency != cur:
+                msg = "currency mismatch"
+                raise ValueError(msg)
+            total += m._minor  # noqa: SLF001
+        return cls._of(total, cur)
 
     # Basic arithmetic (same-currency only)
     def _ensure_same_currency(self, other: Money) -> None:
-        if self.currency != other.currency:
+        if self.currency is not other.currency and self.currency != other.currency:
             msg = "currency mismatch"
             raise ValueError(msg)
 
-    def _new(self, amount: Decimal) -> Money:
-        return Money(amount=amount, currency=self.currency)
-
     def __add__(self, other: Money) -> Money:
         self._ensure_same_currency(other)
-        return self._new(self.amount + other.amount)
+        return Money._of(self._minor + other._minor, self.currency)
 
     def __sub__(self, other: Money) -> Money:
         self._ensure_same_currency(other)
-        return self._new(self.amount - other.amount)
+        return Money._of(self._minor - other._minor, self.currency)
 
     def __mul__(self, factor: int | Decimal) -> Money:
+        if type(factor) is int:
+            return Money._of(self._minor * factor, self.currency)
         d = _coerce_decimal(Decimal(factor))
-        return self._new(self.amount * d)
+        return Money._of(self._round(Decimal(self._minor) * d), self.currency)
 
     def __truediv__(self, divisor: int | Decimal) -> Money:
         d = _coerce_decimal(Decimal(divisor))
         if d == 0:
             raise ZeroDivisionError("division by zero")
-        return self._new(self.amount / d)
+        return Money._of(self._round(Decimal(self._minor) / d), self.currency)
+
+    @classmethod
+    def _round(cls, minor: Decimal) -> int:
+        return int(minor.to_integral_value(rounding=cls._ROUNDING))
 
     # Ordering (only meaningful within same currency)
     def __lt__(self, other: Money) -> bool:
         self._ensure_same_currency(other)
-        return self.amount < other.amount
+        return self._minor < other._minor
 
     # Useful conversions
     def to_minor(self) -> int:
-        return int((self.amount * 100).to_integral_value(rounding=self._ROUNDING))
+        return self._minor
 
     def __str__(self) -> str:
         return f"{self.currency} {self.amount:.2f}"
+
+    def __repr__(self) -> str:
+        return f"Money(amount={self.amount!r}, currency={self.currency!r})"
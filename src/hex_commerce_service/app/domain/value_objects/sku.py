@@ -2,12 +2,19 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from typing import Final
 
 # Uppercase letters, digits, hyphen and underscore. Length 1..64, must start with alnum.
 _SKU_RE = re.compile(r"^[A-Z0-9][A-Z0-9-_]{0,63}$")
 
+# Sku.of() のインターン表(入力文字列/正規化済み文字列 -> 正準インスタンス)。
+# 上限に達したら表ごと捨てて作り直す(ホットな値はすぐに再登録される)。
+# 捨てられた古いインスタンスも同値比較で等しいので正しさには影響しない。
+_INTERN_MAX: Final = 131_072
+_INTERNED: dict[str, Sku] = {}
 
-@dataclass(frozen=True, slots=True)
+
+@dataclass(frozen=True, slots=True, eq=False)
 class Sku:
     value: str
 
@@ -18,5 +25,36 @@ class Sku:
             raise ValueError(msg)
         object.__setattr__(self, "value", v)
 
+    @classmethod
+    def of(cls, value: str) -> Sku:
+        # 同じ値に対しては同じインスタンスを返す。2回目以降は正規化・検証を行わない
+        cached = _INTERNED.get(value)
+        if cached is not None:
+            return cached
+        sku = cls(value)
+        canonical = _INTERNED.get(sku.value)
+        if canonical is None:
+            canonical = sku
+            _intern(sku.value, canonical)
+        if value != sku.value:
+            _intern(value, canonical)
+        return canonical
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Sku):
+            return NotImplemented
+        return self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
     def __str__(self) -> str:
         return self.value
+
+
+def _intern(key: str, sku: Sku) -> None:
+    if len(_INTERNED) >= _INTERN_MAX:
+        _INTERNED.clear()
+    _INTERNED[key] = sku
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-
-if TYPE_CHECKING:
-    from datetime import datetime
+from datetime import datetime  # noqa: TC003
+from typing import Any
 
 from sqlalchemy import (
     CheckConstraint,
     DateTime,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -28,7 +27,10 @@ class OutboxMessageModel(Base):
     event_type: Mapped[str] = mapped_column(String(64), nullable=False)
     aggregate_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     idempotency_key: Mapped[str] = mapped_column(String(128), nullable=False)
-    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # JSON 封筒(payload)か msgpack 形式のバイナリ封筒(body)のどちらかを持つ。
+    # none_as_null: None を JSON の 'null' ではなく SQL NULL として書く(ck_outbox_payload_or_body が効くように)
+    payload: Mapped[dict[str, Any] | None] = mapped_column(JSONB(none_as_null=True), nullable=True)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
 
     state: Mapped[str] = mapped_column(String(16), nullable=False, server_default=text("'pending'"))
     occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -46,7 +48,32 @@ class OutboxMessageModel(Base):
     __table_args__ = (
         UniqueConstraint("event_type", "idempotency_key", name="uq_outbox_type_idempo"),
         CheckConstraint("attempt_count >= 0", name="ck_outbox_attempts_non_negative"),
-        Index("ix_outbox_state_available", "state", "available_at"),
+        CheckConstraint("payload IS NOT NULL OR body IS NOT NULL", name="ck_outbox_payload_or_body"),
+        # claim は pending だけを走査する。送信済み・dead の行は索引に含めない
+        Index("ix_outbox_pending_available", "available_at", postgresql_where=text("state = 'pending'")),
+        Index("ix_outbox_dead_id", "id", postgresql_where=text("state = 'dead'")),
+        # claim 時に同じ集約の先行 pending メッセージを探す
+        Index("ix_outbox_pending_aggregate", "aggregate_id", "id", postgresql_where=text("state = 'pending'")),
         Index("ix_outbox_lock_until", "lock_until"),
         Index("ix_outbox_created_at", "created_at"),
     )
+
+
+class OutboxArchiveModel(Base):
+    """保持期間を過ぎた送信済みメッセージの退避先。一意制約を持たず、archived_at で期限切れを削除する."""
+
+    __tablename__ = "outbox_messages_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    aggregate_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    idempotency_key: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload: Mapped[dict[str, Any] | None] = mapped_column(JSONB(none_as_null=True), nullable=True)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    dispatched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+
+    __table_args__ = (Index("ix_outbox_archive_archived_at", "archived_at"),)
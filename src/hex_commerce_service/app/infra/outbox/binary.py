@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+# MessagePack 互換のサブセット(nil / bool / int / float64 / str / bin / array / map)を標準ライブラリだけで実装する。
+# 出力は msgpack の仕様どおりなので、外部ツールの msgpack デコーダでも読める。
+
+_F64 = struct.Struct(">d")
+
+
+def packb(obj: object) -> bytes:
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def unpackb(data: bytes) -> Any:  # noqa: ANN401
+    obj, pos = _unpack(data, 0)
+    if pos != len(data):
+        msg = f"trailing data after msgpack object ({len(data) - pos} bytes)"
+        raise ValueError(msg)
+    return obj
+
+
+def _pack(obj: object, out: bytearray) -> None:  # noqa: C901, PLR0912, PLR0915
+    # よく出る型(str / int / dict)から順に判定する。bool は int のサブクラスなので int より先に見る
+    if isinstance(obj, str):
+        b = obj.encode()
+        n = len(b)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += bytes((0xD9, n))
+        elif n < 0x10000:
+            out.append(0xDA)
+            out += n.to_bytes(2, "big")
+        else:
+            out.append(0xDB)
+            out += n.to_bytes(4, "big")
+        out += b
+    elif isinstance(obj, bool):
+        out.append(0xC3 if obj else 0xC2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n < 0x10000:
+            out.append(0xDE)
+            out += n.to_bytes(2, "big")
+        else:
+            out.append(0xDF)
+            out += n.to_bytes(4, "big")
+        for k, v in obj.items():
+            _pack(k, out)
+            _pack(v, out)
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out.append(0xDC)
+            out += n.to_bytes(2, "big")
+        else:
+            out.append(0xDD)
+            out += n.to_bytes(4, "big")
+        for v in obj:
+            _pack(v, out)
+    elif obj is None:
+        out.append(0xC0)
+    elif isinstance(obj, float):
+        out.append(0xCB)
+        out += _F64.pack(obj)
+    elif isinstance(obj, bytes):
+        n = len(obj)
+        if n < 0x100:
+            out += bytes((0xC4, n))
+        elif n < 0x10000:
+            out.append(0xC5)
+            out += n.to_bytes(2, "big")
+        else:
+            out.append(0xC6)
+            out += n.to_bytes(4, "big")
+        out += obj
+    else:
+        msg = f"cannot pack {type(obj).__name__}"
+        raise TypeError(msg)
+
+
+def _pack_int(v: int, out: bytearray) -> None:
+    if 0 <= v < 0x80:
+        out.append(v)
+    elif -32 <= v < 0:
+        out.append(v & 0xFF)
+    elif v >= 0:
+        if v < 0x100:
+            out += bytes((0xCC, v))
+        elif v < 0x10000:
+            out.append(0xCD)
+            out += v.to_bytes(2, "big")
+        elif v < 0x1_0000_0000:
+            out.append(0xCE)
+            out += v.to_bytes(4, "big")
+        else:
+            out.append(0xCF)
+            out += v.to_bytes(8, "big")  # 2**64 以上は OverflowError
+    elif v >= -0x80:
+        out += bytes((0xD0, v & 0xFF))
+    elif v >= -0x8000:
+        out.append(0xD1)
+        out += v.to_bytes(2, "big", signed=True)
+    elif v >= -0x8000_0000:
+        out.append(0xD2)
+        out += v.to_bytes(4, "big", signed=True)
+    else:
+        out.append(0xD3)
+        out += v.to_bytes(8, "big", signed=True)
+
+
+def _unpack(data: bytes, pos: int) -> tuple[Any, int]:  # noqa: C901, PLR0911, PLR0912
+    b = data[pos]
+    pos += 1
+    if b < 0x80:
+        return b, pos
+    if 0xA0 <= b <= 0xBF:
+        end = pos + (b & 0x1F)
+        return data[pos:end].decode(), end
+    if 0x80 <= b <= 0x8F:
+        return _unpack_map(data, pos, b & 0x0F)
+    if 0x90 <= b <= 0x9F:
+        return _unpack_array(data, pos, b & 0x0F)
+    if b >= 0xE0:
+        return b - 0x100, pos
+    if b == 0xC0:
+        return None, pos
+    if b == 0xC2:
+        return False, pos
+    if b == 0xC3:
+        return True, pos
+    if b in _UINT:
+        size = _UINT[b]
+        return int.from_bytes(data[pos : pos + size], "big"), pos + size
+    if b in _SINT:
+        size = _SINT[b]
+        return int.from_bytes(data[pos : pos + size], "big", signed=True), pos + size
+    if b == 0xCB:
+        return _F64.unpack_from(data, pos)[0], pos + 8
+    if b in _STR:
+        n, pos = _length(data, pos, _STR[b])
+        return data[pos : pos + n].decode(), pos + n
+    if b in _BIN:
+        n, pos = _length(data, pos, _BIN[b])
+        return bytes(data[pos : pos + n]), pos + n
+    if b in _ARRAY:
+        n, pos = _length(data, pos, _ARRAY[b])
+        return _unpack_array(data, pos, n)
+    if b in _MAP:
+        n, pos = _length(data, pos, _MAP[b])
+        return _unpack_map(data, pos, n)
+    msg = f"unsupported msgpack type byte 0x{b:02x} at offset {pos - 1}"
+    raise ValueError(msg)
+
+
+def _length(data: bytes, pos: int, size: int) -> tuple[int, int]:
+    return int.from_bytes(data[pos : pos + size], "big"), pos + size
+
+
+def _unpack_array(data: bytes, pos: int, n: int) -> tuple[list[Any], int]:
+    items = []
+    for _ in range(n):
+        v, pos = _unpack(data, pos)
+        items.append(v)
+    return items, pos
+
+
+def _unpack_map(data: bytes, pos: int, n: int) -> tuple[dict[Any, Any], int]:
+    d = {}
+    for _ in range(n):
+        k, pos = _unpack(data, pos)
+        v, pos = _unpack(data, pos)
+        d[k] = v
+    return d, pos
+
+
+# 型バイト -> 後続の長さ/値のバイト数
+_UINT = {0xCC: 1, 0xCD: 2, 0xCE: 4, 0xCF: 8}
+_SINT = {0xD0: 1, 0xD1: 2, 0xD2: 4, 0xD3: 8}
+_STR = {0xD9: 1, 0xDA: 2, 0xDB: 4}
+_BIN = {0xC4: 1, 0xC5: 2, 0xC6: 4}
+_ARRAY = {0xDC: 2, 0xDD: 4}
+_MAP = {0xDE: 2, 0xDF: 4}
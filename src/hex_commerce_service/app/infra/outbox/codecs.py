@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, NotRequired, TypedDict
+
+from hex_commerce_service.app.infra.outbox.binary import packb, unpackb
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class EventEnvelope(TypedDict):
+    type: str
+    occurred_at: str
+    payload: dict[str, Any]
+    # payload のスキーマバージョン。キーがない(導入前の)行は 1 とみなす
+    v: NotRequired[int]
+
+
+@dataclass(frozen=True, slots=True)
+class EventCodec[E]:
+    """
+    1つのイベント型の payload 変換.
+
+    - encode / decode は payload(dict)だけを扱う。type / occurred_at / v はレジストリが付ける
+    - upcasters[k] はバージョン k の payload を k + 1 に変換する。古い payload は読み出し時にだけ変換する
+    """
+
+    type_name: str
+    event_cls: type[E]
+    encode: Callable[[E], dict[str, Any]]
+    decode: Callable[[dict[str, Any]], E]
+    version: int = 1
+    upcasters: Mapping[int, Callable[[dict[str, Any]], dict[str, Any]]] = field(default_factory=dict)
+
+    def upcast(self, payload: dict[str, Any], version: int) -> dict[str, Any]:
+        if version > self.version:
+            msg = f"{self.type_name} payload v{version} is newer than codec v{self.version}"
+            raise ValueError(msg)
+        while version < self.version:
+            try:
+                step = self.upcasters[version]
+            except KeyError:
+                msg = f"no upcaster for {self.type_name} v{version} -> v{version + 1}"
+                raise ValueError(msg) from None
+            payload = step(payload)
+            version += 1
+        return payload
+
+
+@dataclass(slots=True)
+class CodecRegistry:
+    """
+    イベントクラス / type 名 -> EventCodec の表.
+
+    JSON 用の EventEnvelope と、msgpack 形式のバイナリ封筒 ``[type, v, occurred_at(epoch からのマイクロ秒), payload]`` の両方を扱う。
+    """
+
+    _by_name: dict[str, EventCodec[Any]] = field(default_factory=dict)
+    _by_cls: dict[type, EventCodec[Any]] = field(default_factory=dict)
+
+    def register(self, codec: EventCodec[Any]) -> None:
+        if codec.type_name in self._by_name:
+            msg = f"codec already registered for event type: {codec.type_name}"
+            raise ValueError(msg)
+        if codec.event_cls in self._by_cls:
+            msg = f"codec already registered for event class: {codec.event_cls.__name__}"
+            raise ValueError(msg)
+        self._by_name[codec.type_name] = codec
+        self._by_cls[codec.event_cls] = codec
+
+    def for_event(self, evt: object) -> EventCodec[Any]:
+        cls = type(evt)
+        codec = self._by_cls.get(cls)
+        if codec is None:
+            # サブクラスは MRO 上で最初に登録のある基底クラスの codec を使い、結果を表に入れておく
+            codec = next((self._by_cls[base] for base in cls.__mro__[1:] if base in self._by_cls), None)
+            if codec is None:
+                msg = f"cannot serialize event type: {cls.__name__}"
+                raise TypeError(msg)
+            self._by_cls[cls] = codec
+        return codec
+
+    def for_type(self, type_name: str) -> EventCodec[Any]:
+        codec = self._by_name.get(type_name)
+        if codec is None:
+            msg = f"cannot deserialize event type: {type_name}"
+            raise TypeError(msg)
+        return codec
+
+    def serialize(self, evt: Any) -> EventEnvelope:  # noqa: ANN401
+        codec = self.for_event(evt)
+        return {
+            "type": codec.type_name,
+            "v": codec.version,
+            "occurred_at": evt.occurred_at.isoformat(),
+            "payload": codec.encode(evt),
+        }
+
+    def deserialize(self, env: EventEnvelope) -> object:
+        return self._decode(env["type"], env.get("v", 1), env["payload"], datetime.fromisoformat(env["occurred_at"]))
+
+    def dumps(self, evt: Any) -> bytes:  # noqa: ANN401
+        codec = self.for_event(evt)
+        data: bytes = packb([codec.type_name, codec.version, _epoch_us(evt.occurred_at), codec.encode(evt)])
+        return data
+
+    def loads(self, data: bytes) -> object:
+        type_name, version, occurred_us, payload = unpackb(data)
+        return self._decode(type_name, version, payload, _EPOCH + timedelta(microseconds=occurred_us))
+
+    def _decode(self, type_name: str, version: int, payload: dict[str, Any], occurred_at: datetime) -> object:
+        codec = self.for_type(type_name)
+        if version != codec.version:
+            payload = codec.upcast(payload, version)
+        evt = codec.decode(payload)
+        object.__setattr__(evt, "occurred_at", occurred_at)  # noqa: PLC2801  # frozen dataclass
+        return evt
+
+
+def envelope_to_binary(env: EventEnvelope, occurred_at: datetime | None = None) -> bytes:
+    # 既に JSON 封筒を作ってある場合の変換(occurred_at を解析済みなら渡すと再解析しない)
+    occurred = occurred_at or datetime.fromisoformat(env["occurred_at"])
+    data: bytes = packb([env["type"], env.get("v", 1), _epoch_us(occurred), env["payload"]])
+    return data
+
+
+def _epoch_us(dt: datetime) -> int:
+    # float を経由しないので マイクロ秒単位で往復が厳密
+    return (dt - _EPOCH) // timedelta(microseconds=1)
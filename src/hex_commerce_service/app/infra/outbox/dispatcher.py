@@ -1,25 +1,73 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import zlib
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
     from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+    from hex_commerce_service.app.infra.db.outbox_models import OutboxMessageModel
+    from hex_commerce_service.app.infra.outbox.wakeup import OutboxWakeup
+
 from hex_commerce_service.app.application.message_bus import MessageBus
 from hex_commerce_service.app.infra.outbox.repository import OutboxStore
-from hex_commerce_service.app.infra.outbox.serializer import deserialize_event
+from hex_commerce_service.app.infra.outbox.serializer import load_event
+
+
+@dataclass(slots=True)
+class _Acks:
+    # 配送結果の置き場。確定する側は take() で丸ごと持ち去るので、書き込み側は毎回属性から引くこと
+    sent: list[int] = field(default_factory=list)
+    failed: list[tuple[int, str]] = field(default_factory=list)
+    held: list[int] = field(default_factory=list)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def take(self) -> tuple[list[int], list[tuple[int, str]], list[int]]:
+        taken = (self.sent, self.failed, self.held)
+        self.sent, self.failed, self.held = [], [], []
+        self.ready.clear()
+        return taken
+
+
+def lane_for(aggregate_id: str | None, message_id: int, lanes: int) -> int:
+    # 同じ集約は常に同じレーンへ(プロセスをまたいでも安定な crc32)。集約なしは id で分散
+    if aggregate_id is None:
+        return message_id % lanes
+    return zlib.crc32(aggregate_id.encode()) % lanes
 
 
 @dataclass(slots=True)
 class OutboxDispatcher:
+    """
+    Outbox からクレームしたメッセージを配送する.
+
+    - deliver を渡すとそれで配送する(例外 = 失敗)。未指定なら同期 MessageBus に publish_many でバッチごと渡す
+    - deliver があるとき、run_forever は lanes 本のレーンを常駐させ、クレームしたメッセージを aggregate_id のハッシュで
+      各レーンのキューへ流す。レーン同士は並行に配送し、同じ集約のイベントは同じレーンで claim 順(id 昇順)に配送される。
+      配送が終わったものから確定し、遅いレーンが他のレーンや次のクレームを待たせない
+    - run_once は1バッチをクレームし、全レーンの配送を待ってから確定する(1回だけ流す用途向け)
+    - ある集約のメッセージが失敗したら、同じクレームにあるその集約の後続メッセージは配送せずにリースだけ解放する
+      (attempt_count は増やさない)。claim_batch は、先行メッセージがバックオフ中・リース中の集約の後続をクレームしない
+    - クレーム済み・未確定のメッセージ数(in-flight window)は batch_size で抑える
+    - max_attempts 回失敗したメッセージは dead 状態に移し、以後クレームしない
+    - wakeup があれば、空振り後は通知が来るまで(最長 idle_poll_seconds)待つ。なければ interval_seconds ごとにポーリング
+    """
+
     sessionmaker: async_sessionmaker[AsyncSession]
     owner: str
     bus: MessageBus
     batch_size: int = 50
     lease_seconds: int = 30
     max_attempts: int = 10
+    lanes: int = 1
+    deliver: Callable[[object], Awaitable[None]] | None = None
+    wakeup: OutboxWakeup | None = None
+    idle_poll_seconds: float = 30.0
 
     delivered: list[object] = field(default_factory=list)
 
@@ -30,29 +78,190 @@ class OutboxDispatcher:
             if not messages:
                 return 0
 
-            for msg in messages:
-                event = deserialize_event(msg.payload)
-                try:
-                    before_errors = len(self.bus.errors)
-                    self.bus.publish(event)
-                    after_errors = len(self.bus.errors)
-                    if after_errors > before_errors:
-                        # last error belongs to this publish; mark failed
-                        err = str(self.bus.errors[-1][1])
-                        await store.mark_failed(msg, err, backoff_seconds=min(60, 2 ** min(msg.attempt_count, 5)))
-                    else:
-                        await store.mark_sent(msg)
-                        self.delivered.append(event)
-                except Exception as exc:
-                    await store.mark_failed(msg, str(exc), backoff_seconds=min(60, 2 ** min(msg.attempt_count, 5)))
+            # 配送結果を集めて、最後に sent / failed / 保留をそれぞれ1回の UPDATE で確定する
+            await self._ack(store, *await self._deliver_batch(messages))
             await session.commit()
             return len(messages)
 
     async def run_forever(self, interval_seconds: float = 2.0, stop_event: asyncio.Event | None = None) -> None:
         stop = stop_event or asyncio.Event()
+        if self.deliver is not None:
+            await self._run_lanes(interval_seconds, stop)
+            return
         while not stop.is_set():
             try:
                 n = await self.run_once()
             except Exception:
                 n = 0
-            await asyncio.sleep(interval_seconds if n == 0 else 0)
+            if n > 0:
+                await asyncio.sleep(0)
+            elif self.wakeup is None:
+                await asyncio.sleep(interval_seconds)
+            else:
+                await self._wait_for_work(stop)
+
+    async def _run_lanes(self, interval_seconds: float, stop: asyncio.Event) -> None:
+        # レーンと確定処理を常駐させ、クレームループはセマフォの空き(未確定の上限 batch_size)の分だけクレームする
+        window = asyncio.Semaphore(self.batch_size)
+        acks = _Acks()
+        queues: list[asyncio.Queue[tuple[OutboxMessageModel, set[str]]]] = [asyncio.Queue() for _ in range(max(self.lanes, 1))]
+        async with asyncio.TaskGroup() as tg:
+            workers = [tg.create_task(self._run_lane(queue, acks)) for queue in queues]
+            workers.append(tg.create_task(self._ack_forever(acks, window)))
+            try:
+                while not stop.is_set():
+                    if await self._claim_into(queues, window) > 0:
+                        await asyncio.sleep(0)
+                    elif self.wakeup is None:
+                        await asyncio.sleep(interval_seconds)
+                    else:
+                        await self._wait_for_work(stop)
+                # 流し込んだメッセージをすべて確定してから止める(全スロットが戻れば未確定は 0)
+                for _ in range(self.batch_size):
+                    await window.acquire()
+            finally:
+                for task in workers:
+                    task.cancel()
+
+    async def _claim_into(self, queues: list[asyncio.Queue[tuple[OutboxMessageModel, set[str]]]], window: asyncio.Semaphore) -> int:
+        # 空きスロットを1つ以上待ち、そのとき空いている分だけまとめてクレームする
+        await window.acquire()
+        slots = 1
+        while slots < self.batch_size and not window.locked():
+            await window.acquire()
+            slots += 1
+        try:
+            messages = await self._claim(slots)
+        except Exception:
+            messages = []
+        for _ in range(slots - len(messages)):
+            window.release()
+        # 後続の保留はクレーム単位: 同じ集約の先行メッセージがリース中なら claim_batch は後続をクレームしない
+        blocked: set[str] = set()
+        for msg in messages:
+            queues[lane_for(msg.aggregate_id, msg.id, len(queues))].put_nowait((msg, blocked))
+        return len(messages)
+
+    async def _run_lane(self, queue: asyncio.Queue[tuple[OutboxMessageModel, set[str]]], acks: _Acks) -> None:
+        while True:
+            msg, blocked = await queue.get()
+            await self._deliver_one(msg, acks, blocked)
+            acks.ready.set()
+
+    async def _ack_forever(self, acks: _Acks, window: asyncio.Semaphore) -> None:
+        # 配送の終わった分をまとめて1トランザクションで確定し、そのぶんスロットを返す
+        while True:
+            await acks.ready.wait()
+            sent, failed, held = acks.take()
+            # 確定できなかった行はリース切れで再クレームされる。配送は at-least-once なので許容する
+            with contextlib.suppress(Exception):
+                await self._commit_acks(sent, failed, held)
+            for _ in range(len(sent) + len(failed) + len(held)):
+                window.release()
+
+    async def _claim(self, limit: int) -> list[OutboxMessageModel]:
+        # claim_batch は自分のトランザクションで commit する(リースを他のワーカーに見せる)
+        async with self.sessionmaker() as session:
+            messages: list[OutboxMessageModel] = await OutboxStore(session).claim_batch(
+                owner=self.owner, batch_size=limit, lease_seconds=self.lease_seconds
+            )
+        return messages
+
+    async def _ack(self, store: OutboxStore, sent: list[int], failed: list[tuple[int, str]], held: list[int]) -> None:
+        await store.ack_sent(sent)
+        await store.ack_failed(failed, max_attempts=self.max_attempts)
+        await store.release(held)
+
+    async def _commit_acks(self, sent: list[int], failed: list[tuple[int, str]], held: list[int]) -> None:
+        async with self.sessionmaker() as session:
+            await self._ack(OutboxStore(session), sent, failed, held)
+            await session.commit()
+
+    async def _wait_for_work(self, stop: asyncio.Event) -> None:
+        # 通知・停止要求・フォールバックのタイムアウトのいずれかで戻る
+        assert self.wakeup is not None
+        woken = asyncio.ensure_future(self.wakeup.wait())
+        stopped = asyncio.ensure_future(stop.wait())
+        try:
+            await asyncio.wait({woken, stopped}, timeout=self.idle_poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            woken.cancel()
+            stopped.cancel()
+
+    async def _deliver_batch(self, messages: Sequence[OutboxMessageModel]) -> tuple[list[int], list[tuple[int, str]], list[int]]:
+        acks = _Acks()
+        # 先行メッセージが失敗した集約の後続(配送しない)。同じ集約は同じレーンにしか現れない
+        blocked: set[str] = set()
+        if self.deliver is None:
+            self._publish_batch(messages, acks.sent, acks.failed, acks.held)
+            return acks.take()
+        if self.lanes <= 1:
+            for msg in messages:
+                await self._deliver_one(msg, acks, blocked)
+            return acks.take()
+
+        lanes: list[list[OutboxMessageModel]] = [[] for _ in range(self.lanes)]
+        for msg in messages:
+            lanes[lane_for(msg.aggregate_id, msg.id, self.lanes)].append(msg)
+
+        async def run_lane(lane: list[OutboxMessageModel]) -> None:
+            for msg in lane:
+                await self._deliver_one(msg, acks, blocked)
+
+        # 1回分のバッチなので、全レーンの終了を待つ(常駐レーンは run_forever 側)
+        async with asyncio.TaskGroup() as tg:
+            for lane in lanes:
+                if lane:
+                    tg.create_task(run_lane(lane))
+        return acks.take()
+
+    def _publish_batch(
+        self,
+        messages: Sequence[OutboxMessageModel],
+        sent: list[int],
+        failed: list[tuple[int, str]],
+        held: list[int],
+    ) -> None:
+        # 同期 MessageBus: クレームした1バッチを publish_many 1回で渡す(バッチハンドラは1回の呼び出しで受け取る)。
+        # 同期バスではレーンを分けても並行にならないので、claim 順のまま渡す
+        loaded: list[tuple[OutboxMessageModel, object]] = []
+        aggregates: dict[int, str | None] = {}
+        blocked: set[str] = set()
+        for msg in messages:
+            if msg.aggregate_id is not None and msg.aggregate_id in blocked:
+                held.append(msg.id)
+                continue
+            try:
+                event = load_event(msg.payload, msg.body)
+            except Exception as exc:
+                failed.append((msg.id, str(exc)))
+                if msg.aggregate_id is not None:
+                    blocked.add(msg.aggregate_id)
+                continue
+            loaded.append((msg, event))
+            aggregates[id(event)] = msg.aggregate_id
+        results = self.bus.publish_many([event for _, event in loaded], key=lambda event: aggregates.get(id(event)))
+        for (msg, event), result in zip(loaded, results, strict=True):
+            if result.failures:
+                failed.append((msg.id, str(result.failures[-1][1])))
+            elif result.skipped:
+                held.append(msg.id)
+            else:
+                sent.append(msg.id)
+                self.delivered.append(event)
+
+    async def _deliver_one(self, msg: OutboxMessageModel, acks: _Acks, blocked: set[str]) -> None:
+        assert self.deliver is not None
+        if msg.aggregate_id is not None and msg.aggregate_id in blocked:
+            acks.held.append(msg.id)
+            return
+        try:
+            event = load_event(msg.payload, msg.body)
+            await self.deliver(event)
+        except Exception as exc:
+            acks.failed.append((msg.id, str(exc)))
+            if msg.aggregate_id is not None:
+                blocked.add(msg.aggregate_id)
+            return
+        acks.sent.append(msg.id)
+        self.delivered.append(event)
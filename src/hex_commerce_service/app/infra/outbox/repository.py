@@ -1,33 +1,53 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Final
 
-from sqlalchemy import select
+from sqlalchemy import Integer, Text, any_, bindparam, case, column, delete, exists, func, literal_column, or_, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from sqlalchemy import ColumnElement
     from sqlalchemy.ext.asyncio import AsyncSession
 
 from hex_commerce_service.app.infra.db.outbox_models import OutboxMessageModel
-from hex_commerce_service.app.infra.outbox.serializer import (
-    EventEnvelope,
-    serialize_event,
-)
+from hex_commerce_service.app.infra.outbox.codecs import EventEnvelope, envelope_to_binary
+from hex_commerce_service.app.infra.outbox.serializer import serialize_event
+from hex_commerce_service.app.infra.outbox.wakeup import OUTBOX_CHANNEL
 
 
 def default_idempotency_key(event: object) -> str:
-    env = serialize_event(event)
-    t = env["type"]
-    p = env["payload"]
-    order_id = p.get("order_id", "")
+    return _idempotency_key(serialize_event(event))
+
+
+def _idempotency_key(env: EventEnvelope) -> str:
     # event type + aggregate id を基本キーに
-    return f"{t}:{order_id}"
+    return f"{env['type']}:{env['payload'].get('order_id', '')}"
+
+
+# max_attempts に達したメッセージの状態。claim の対象外になる
+DEAD: Final = "dead"
+
+# 失敗時のバックオフ: min(上限, 2 ** min(attempt_count, 5)) 秒
+_BACKOFF_EXP_CAP = 5
+_MAX_BACKOFF_SECONDS = 60
+
+# 1 INSERT あたりの行数(1行 9 パラメータ。asyncpg の上限 32767 に収まるように)
+_ENQUEUE_BATCH = 1_000
 
 
 @dataclass(slots=True)
 class OutboxStore:
     session: AsyncSession
+    # 新しい行を挿入したトランザクションで NOTIFY するチャネル(None で無効)
+    notify_channel: str | None = OUTBOX_CHANNEL
+    # True なら payload(JSONB)の代わりに msgpack 形式のバイナリ封筒を body に書く
+    binary_payloads: bool = False
 
     async def enqueue(
         self,
@@ -35,31 +55,64 @@ class OutboxStore:
         idempotency_key: str | None = None,
         aggregate_id: str | None = None,
         available_at: datetime | None = None,
-    ) -> None:
+    ) -> bool:
+        # (event_type, idempotency_key) が既に存在すれば False
         env: EventEnvelope = serialize_event(event)
-        msg = OutboxMessageModel(
-            event_type=env["type"],
-            aggregate_id=aggregate_id or env["payload"].get("order_id"),
-            idempotency_key=idempotency_key or default_idempotency_key(event),
-            payload=env,
-            state="pending",
-            occurred_at=datetime.fromisoformat(env["occurred_at"]),
-            available_at=available_at or datetime.now(tz=datetime.UTC),
-            attempt_count=0,
-        )
-        # Unique constraint (event_type, idempotency_key) により重複を拒否
-        self.session.add(msg)
-        try:
-            await self.session.flush()
-        except Exception:
-            # UniqueViolation等はここに飛ぶ。重複は黙って冪等に成功扱い。
-            await self.session.rollback()
-            # 再度実行に備え再開
-            await self.session.begin()
+        row = _outbox_row(env, idempotency_key, aggregate_id, available_at or datetime.now(tz=UTC), binary=self.binary_payloads)
+        return bool(await self._insert_new([row]))
+
+    async def enqueue_many(self, events: Iterable[object], available_at: datetime | None = None) -> list[object]:
+        """
+        Enqueue events with one multi-row INSERT ... ON CONFLICT DO NOTHING per batch.
+
+        Duplicates (already stored, or repeated within `events`) are skipped without
+        aborting the caller's transaction.
+
+        Returns:
+            The events that were actually inserted, in input order.
+        """
+        now = available_at or datetime.now(tz=UTC)
+        by_key: dict[tuple[str, str], object] = {}
+        rows: list[dict[str, Any]] = []
+        for event in events:
+            row = _outbox_row(serialize_event(event), None, None, now, binary=self.binary_payloads)
+            key = (row["event_type"], row["idempotency_key"])
+            if key not in by_key:  # 同じバッチ内の重複は先勝ち
+                by_key[key] = event
+                rows.append(row)
+
+        inserted = await self._insert_new(rows)
+        return [by_key[key] for key in inserted]
+
+    async def _insert_new(self, rows: list[dict[str, Any]]) -> list[tuple[str, str]]:
+        # 一意制約 (event_type, idempotency_key) に当たった行は DB 側で黙って捨てる。
+        # 例外にならないので呼び出し元のトランザクションはそのまま続行できる。
+        inserted: list[tuple[str, str]] = []
+        for i in range(0, len(rows), _ENQUEUE_BATCH):
+            stmt = (
+                pg_insert(OutboxMessageModel)
+                .values(rows[i : i + _ENQUEUE_BATCH])
+                .on_conflict_do_nothing(constraint="uq_outbox_type_idempo")
+                .returning(OutboxMessageModel.event_type, OutboxMessageModel.idempotency_key)
+            )
+            inserted.extend((t, k) for t, k in (await self.session.execute(stmt)).all())
+        if inserted and self.notify_channel is not None:
+            # NOTIFY はトランザクションに含まれ、commit されたときだけ LISTEN 側に届く
+            await self.session.execute(select(func.pg_notify(self.notify_channel, "")))
+        return inserted
 
     async def claim_batch(self, owner: str, batch_size: int = 50, lease_seconds: int = 30) -> list[OutboxMessageModel]:
-        now = datetime.now(tz=datetime.UTC)
+        now = datetime.now(tz=UTC)
         lease_until = now + timedelta(seconds=lease_seconds)
+        # 同じ集約の先行メッセージがバックオフ中・リース中なら、後続はクレームしない(集約ごとの順序を保つ)。
+        # 先行メッセージが今クレームできるなら、id 順で同じバッチに入る
+        earlier = aliased(OutboxMessageModel)
+        waiting_behind = exists().where(
+            earlier.aggregate_id == OutboxMessageModel.aggregate_id,
+            earlier.id < OutboxMessageModel.id,
+            earlier.state == "pending",
+            or_(earlier.available_at > now, earlier.lock_until >= now),
+        )
         async with self.session.begin():
             # ロックのかかっていない pending を取得
             stmt = (
@@ -68,6 +121,7 @@ class OutboxStore:
                     OutboxMessageModel.state == "pending",
                     OutboxMessageModel.available_at <= now,
                     (OutboxMessageModel.lock_until.is_(None)) | (OutboxMessageModel.lock_until < now),
+                    ~waiting_behind,
                 )
                 .order_by(OutboxMessageModel.id.asc())
                 .with_for_update(skip_locked=True)
@@ -84,18 +138,162 @@ class OutboxStore:
             await self.session.flush()
         return list(rows)
 
+    async def ack_sent(self, ids: Sequence[int]) -> int:
+        """
+        Mark messages as sent with a single ``UPDATE ... WHERE id = ANY(:ids)``.
+
+        Returns:
+            Number of rows updated.
+        """
+        if not ids:
+            return 0
+        stmt = (
+            update(OutboxMessageModel)
+            .where(OutboxMessageModel.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer))))
+            .values(state="sent", dispatched_at=func.now(), lock_owner=None, lock_until=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        return int((await self.session.execute(stmt)).rowcount)  # type: ignore[attr-defined]
+
+    async def release(self, ids: Sequence[int]) -> int:
+        """
+        Release the lease of messages that were claimed but not delivered.
+
+        attempt_count and available_at are left unchanged; the messages are claimed
+        again once the earlier message of the same aggregate is no longer pending
+        in backoff.
+
+        Returns:
+            Number of rows updated.
+        """
+        if not ids:
+            return 0
+        stmt = (
+            update(OutboxMessageModel)
+            .where(OutboxMessageModel.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer))))
+            .values(lock_owner=None, lock_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        return int((await self.session.execute(stmt)).rowcount)  # type: ignore[attr-defined]
+
+    async def ack_failed(
+        self,
+        failures: Sequence[tuple[int, str]],
+        max_backoff_seconds: int = _MAX_BACKOFF_SECONDS,
+        max_attempts: int | None = None,
+    ) -> int:
+        """
+        Record delivery failures for many messages with one UPDATE.
+
+        Each row gets its own error text and an exponential backoff computed in SQL
+        from its current attempt_count (same formula as the per-row path). Rows that
+        reach `max_attempts` move to the ``dead`` state and are no longer claimed.
+
+        Returns:
+            Number of rows updated.
+        """
+        if not failures:
+            return 0
+        f = values(column("id", Integer), column("error", Text), name="f").data([(i, err[:2000]) for i, err in failures])
+        m = OutboxMessageModel
+        backoff = func.least(max_backoff_seconds, func.power(2, func.least(m.attempt_count, _BACKOFF_EXP_CAP)))
+        stmt = (
+            update(m)
+            .where(m.id == f.c.id)
+            .values(
+                # SET 句の attempt_count は更新前の値を参照する
+                attempt_count=m.attempt_count + 1,
+                state=_state_after_failure(m.attempt_count + 1, max_attempts),
+                last_error=f.c.error,
+                lock_owner=None,
+                lock_until=None,
+                available_at=func.now() + func.greatest(1, backoff) * literal_column("interval '1 second'"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return int((await self.session.execute(stmt)).rowcount)  # type: ignore[attr-defined]
+
     async def mark_sent(self, msg: OutboxMessageModel) -> None:
         msg.state = "sent"
-        msg.dispatched_at = datetime.now(tz=datetime.UTC)
+        msg.dispatched_at = datetime.now(tz=UTC)
         msg.lock_owner = None
         msg.lock_until = None
         msg.last_error = None
         await self.session.flush()
 
-    async def mark_failed(self, msg: OutboxMessageModel, error: str, backoff_seconds: int = 5) -> None:
+    async def mark_failed(self, msg: OutboxMessageModel, error: str, backoff_seconds: int = 5, max_attempts: int | None = None) -> None:
         msg.attempt_count += 1
+        if max_attempts is not None and msg.attempt_count >= max_attempts:
+            msg.state = DEAD
         msg.last_error = error[:2000]
         msg.lock_owner = None
         msg.lock_until = None
-        msg.available_at = datetime.now(tz=datetime.UTC) + timedelta(seconds=max(1, backoff_seconds))
+        msg.available_at = datetime.now(tz=UTC) + timedelta(seconds=max(1, backoff_seconds))
         await self.session.flush()
+
+    # dead letters
+    async def list_dead(self, limit: int = 50, event_type: str | None = None) -> list[OutboxMessageModel]:
+        stmt = select(OutboxMessageModel).where(*_dead_filter(None, event_type)).order_by(OutboxMessageModel.id.asc()).limit(limit)
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    async def requeue_dead(self, ids: Sequence[int] | None = None, event_type: str | None = None) -> int:
+        """
+        Move dead letters back to ``pending`` with a fresh attempt budget.
+
+        Returns:
+            Number of messages requeued.
+        """
+        stmt = (
+            update(OutboxMessageModel)
+            .where(*_dead_filter(ids, event_type))
+            .values(state="pending", attempt_count=0, available_at=func.now(), lock_owner=None, lock_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        return int((await self.session.execute(stmt)).rowcount)  # type: ignore[attr-defined]
+
+    async def purge_dead(self, ids: Sequence[int] | None = None, event_type: str | None = None) -> int:
+        """
+        Delete dead letters.
+
+        Returns:
+            Number of messages deleted.
+        """
+        stmt = delete(OutboxMessageModel).where(*_dead_filter(ids, event_type)).execution_options(synchronize_session=False)
+        return int((await self.session.execute(stmt)).rowcount)  # type: ignore[attr-defined]
+
+
+def _outbox_row(
+    env: EventEnvelope,
+    idempotency_key: str | None,
+    aggregate_id: str | None,
+    available_at: datetime,
+    *,
+    binary: bool = False,
+) -> dict[str, Any]:
+    occurred_at = datetime.fromisoformat(env["occurred_at"])
+    return {
+        "event_type": env["type"],
+        "aggregate_id": aggregate_id or env["payload"].get("order_id"),
+        "idempotency_key": idempotency_key or _idempotency_key(env),
+        "payload": None if binary else env,
+        "body": envelope_to_binary(env, occurred_at) if binary else None,
+        "state": "pending",
+        "occurred_at": occurred_at,
+        "available_at": available_at,
+        "attempt_count": 0,
+    }
+
+
+def _state_after_failure(attempts: ColumnElement[int], max_attempts: int | None) -> ColumnElement[str] | str:
+    if max_attempts is None:
+        return "pending"
+    return case((attempts >= max_attempts, DEAD), else_="pending")
+
+
+def _dead_filter(ids: Sequence[int] | None, event_type: str | None) -> list[ColumnElement[bool]]:
+    clauses = [OutboxMessageModel.state == DEAD]
+    if ids is not None:
+        clauses.append(OutboxMessageModel.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer))))
+    if event_type is not None:
+        clauses.append(OutboxMessageModel.event_type == event_type)
+    return clauses
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy import TextClause
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# 送信済みの古い行を1チャンクずつ outbox_messages_archive へ移す。
+# 行ロックは SKIP LOCKED で取り、同時に動くクレームやアーカイバと競合しない。
+# 同じ id がすでにアーカイブにある行(RESTART IDENTITY で id が再利用された等)は移さず outbox_messages に残す。
+# 削除するのはアーカイブへの INSERT が返した id だけなので、行が消えるのは書き写せた場合に限る。
+_ARCHIVE_SENT = text(
+    """
+    WITH doomed AS (
+        SELECT m.id FROM outbox_messages m
+        WHERE m.state = 'sent' AND m.created_at < :cutoff
+          AND NOT EXISTS (SELECT 1 FROM outbox_messages_archive a WHERE a.id = m.id)
+        ORDER BY m.created_at
+        LIMIT :chunk
+        FOR UPDATE OF m SKIP LOCKED
+    ), archived AS (
+        INSERT INTO outbox_messages_archive
+            (id, event_type, aggregate_id, idempotency_key, payload, body, occurred_at, dispatched_at, attempt_count, created_at)
+        SELECT m.id, m.event_type, m.aggregate_id, m.idempotency_key, m.payload, m.body,
+               m.occurred_at, m.dispatched_at, m.attempt_count, m.created_at
+        FROM outbox_messages m JOIN doomed ON m.id = doomed.id
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id
+    ), moved AS (
+        DELETE FROM outbox_messages m USING archived WHERE m.id = archived.id
+        RETURNING m.id, pg_column_size(m) AS bytes
+    )
+    SELECT (SELECT count(*) FROM doomed), count(*), coalesce(sum(moved.bytes), 0)
+    FROM archived LEFT JOIN moved ON moved.id = archived.id
+    """
+)
+
+# 保持期限を過ぎたアーカイブ行を1チャンクずつ削除する
+_PRUNE_ARCHIVE = text(
+    """
+    WITH doomed AS (
+        SELECT id FROM outbox_messages_archive
+        WHERE archived_at < :cutoff
+        ORDER BY archived_at
+        LIMIT :chunk
+        FOR UPDATE SKIP LOCKED
+    ), gone AS (
+        DELETE FROM outbox_messages_archive a USING doomed WHERE a.id = doomed.id
+        RETURNING pg_column_size(a) AS bytes
+    )
+    SELECT (SELECT count(*) FROM doomed), count(*), coalesce(sum(bytes), 0) FROM gone
+    """
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionReport:
+    """1回の保持処理で移動・削除した行数とバイト数(行データの論理サイズ)."""
+
+    archived_rows: int = 0
+    archived_bytes: int = 0
+    pruned_rows: int = 0
+    pruned_bytes: int = 0
+
+
+@dataclass(slots=True)
+class OutboxRetention:
+    """
+    送信済み outbox メッセージの保持処理.
+
+    - keep_sent より古い sent 行を chunk_size 件ずつ outbox_messages_archive に移す(チャンクごとに commit)
+    - keep_archive より古いアーカイブ行を削除する(None なら削除しない)
+    - pending / dead の行には触れない
+
+    同じ id の行がすでにアーカイブにある sent 行は移さずに残す(数にも含めない)。
+    アーカイブ済みの行は (event_type, idempotency_key) の重複判定から外れるため、
+    keep_sent は同じイベントが再投入されうる期間より長く取ること。
+    削除した領域は VACUUM 後に再利用される。報告するバイト数は削除した行の pg_column_size の合計。
+    """
+
+    sessionmaker: async_sessionmaker[AsyncSession]
+    keep_sent: timedelta = timedelta(days=7)
+    keep_archive: timedelta | None = timedelta(days=90)
+    chunk_size: int = 5_000
+
+    async def run_once(self, now: datetime | None = None) -> RetentionReport:
+        now = now or datetime.now(tz=UTC)
+        archived_rows, archived_bytes = await self._drain(_ARCHIVE_SENT, now - self.keep_sent)
+        pruned_rows, pruned_bytes = (0, 0)
+        if self.keep_archive is not None:
+            pruned_rows, pruned_bytes = await self._drain(_PRUNE_ARCHIVE, now - self.keep_archive)
+        return RetentionReport(
+            archived_rows=archived_rows,
+            archived_bytes=archived_bytes,
+            pruned_rows=pruned_rows,
+            pruned_bytes=pruned_bytes,
+        )
+
+    async def run_forever(
+        self,
+        interval_seconds: float = 3600.0,
+        stop_event: asyncio.Event | None = None,
+        on_report: Callable[[RetentionReport], None] | None = None,
+    ) -> None:
+        stop = stop_event or asyncio.Event()
+        while not stop.is_set():
+            try:
+                report = await self.run_once()
+            except Exception:
+                report = None
+            if report is not None and on_report is not None:
+                on_report(report)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=interval_seconds)
+
+    async def _drain(self, stmt: TextClause, cutoff: datetime) -> tuple[int, int]:
+        # チャンクごとに短いトランザクションで処理し、ロック保持時間と WAL の塊を小さく保つ
+        # 文は (選んだ行数, 処理した行数, バイト数) を返す。選んだ行がチャンクに満たなければ終わり
+        rows = size = 0
+        while True:
+            async with self.sessionmaker() as session:
+                picked, n, b = (await session.execute(stmt, {"cutoff": cutoff, "chunk": self.chunk_size})).one()
+                await session.commit()
+            rows += int(n)
+            size += int(b)
+            if picked < self.chunk_size:
+                return rows, size
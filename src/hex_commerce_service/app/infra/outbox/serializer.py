@@ -1,54 +1,75 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, TypedDict
+from typing import TYPE_CHECKING, Any, cast
 
 from hex_commerce_service.app.application.messages.events import OrderPlaced, StockAllocated
 from hex_commerce_service.app.domain.value_objects import Money, OrderId
+from hex_commerce_service.app.infra.outbox.codecs import CodecRegistry, EventCodec, EventEnvelope
 
+if TYPE_CHECKING:
+    from collections.abc import Mapping
 
-class EventEnvelope(TypedDict):
-    type: str
-    occurred_at: str
-    payload: dict[str, Any]
+
+# OrderPlaced
+# v1: total = {"amount": "12.50", "currency": "USD"}(Decimal の文字列)
+# v2: total = {"minor": 1250, "currency": "USD"}(最小単位の整数。Decimal の整形・解析が不要)
+def _encode_order_placed(evt: OrderPlaced) -> dict[str, Any]:
+    return {"order_id": str(evt.order_id), "total": {"minor": evt.total.to_minor(), "currency": str(evt.total.currency)}}
+
+
+def _decode_order_placed(payload: dict[str, Any]) -> OrderPlaced:
+    total = payload["total"]
+    return OrderPlaced(order_id=OrderId.parse(payload["order_id"]), total=Money.from_minor(total["minor"], total["currency"]))
+
+
+def _order_placed_v1_to_v2(payload: dict[str, Any]) -> dict[str, Any]:
+    total = payload["total"]
+    minor = Money.from_major(total["amount"], total["currency"]).to_minor()
+    return {**payload, "total": {"minor": minor, "currency": total["currency"]}}
+
+
+def _encode_stock_allocated(evt: StockAllocated) -> dict[str, Any]:
+    return {"order_id": str(evt.order_id), "location": evt.location}
+
+
+def _decode_stock_allocated(payload: dict[str, Any]) -> StockAllocated:
+    return StockAllocated(order_id=OrderId.parse(payload["order_id"]), location=payload["location"])
+
+
+default_registry = CodecRegistry()
+default_registry.register(
+    EventCodec(
+        type_name="OrderPlaced",
+        event_cls=OrderPlaced,
+        encode=_encode_order_placed,
+        decode=_decode_order_placed,
+        version=2,
+        upcasters={1: _order_placed_v1_to_v2},
+    )
+)
+default_registry.register(
+    EventCodec(
+        type_name="StockAllocated",
+        event_cls=StockAllocated,
+        encode=_encode_stock_allocated,
+        decode=_decode_stock_allocated,
+    )
+)
 
 
 def serialize_event(evt: object) -> EventEnvelope:
-    if isinstance(evt, OrderPlaced):
-        return {
-            "type": "OrderPlaced",
-            "occurred_at": evt.occurred_at.isoformat(),
-            "payload": {
-                "order_id": str(evt.order_id),
-                "total": {"amount": f"{evt.total.amount:.2f}", "currency": str(evt.total.currency)},
-            },
-        }
-    if isinstance(evt, StockAllocated):
-        return {
-            "type": "StockAllocated",
-            "occurred_at": evt.occurred_at.isoformat(),
-            "payload": {"order_id": str(evt.order_id), "location": evt.location},
-        }
-    raise TypeError(f"cannot serialize event type: {type(evt).__name__}")
+    return default_registry.serialize(evt)
 
 
 def deserialize_event(env: EventEnvelope) -> object:
-    t = env["type"]
-    occurred = datetime.fromisoformat(env["occurred_at"])
-    if t == "OrderPlaced":
-        payload = env["payload"]
-        evt = OrderPlaced(
-            order_id=OrderId.parse(payload["order_id"]),
-            total=Money.from_major(payload["total"]["amount"], payload["total"]["currency"]),
-        )
-        evt.occurred_at = occurred
-        return evt
-    if t == "StockAllocated":
-        payload = env["payload"]
-        evt = StockAllocated(
-            order_id=OrderId.parse(payload["order_id"]),
-            location=payload["location"],
-        )
-        evt.occurred_at = occurred
-        return evt
-    raise TypeError(f"cannot deserialize event type: {t}")
+    return default_registry.deserialize(env)
+
+
+def load_event(payload: Mapping[str, Any] | None, body: bytes | None) -> object:
+    # outbox の行から復元する。バイナリ封筒(body)があればそちらを使う。payload は JSONB 列の値(形は封筒と同じ)
+    if body is not None:
+        return default_registry.loads(body)
+    if payload is None:
+        msg = "outbox message has neither payload nor body"
+        raise ValueError(msg)
+    return default_registry.deserialize(cast("EventEnvelope", payload))
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Final, Protocol, Self
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# enqueue したトランザクションが commit されたときに NOTIFY されるチャネル
+OUTBOX_CHANNEL: Final = "outbox_messages"
+
+
+class OutboxWakeup(Protocol):
+    """Dispatcher を空ポーリングの待機から起こすための通知路."""
+
+    def notify(self) -> None: ...
+
+    async def wait(self) -> None: ...
+
+
+@dataclass(slots=True)
+class LocalWakeup(OutboxWakeup):
+    """同一プロセス内の通知(asyncio.Event)。in-memory 構成やテスト向け."""
+
+    _event: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def notify(self) -> None:
+        self._event.set()
+
+    async def wait(self) -> None:
+        # 待機前に届いた通知も取りこぼさない(set のまま残っていれば即座に戻る)
+        await self._event.wait()
+        self._event.clear()
+
+
+@dataclass(slots=True)
+class PgListenWakeup(OutboxWakeup):
+    """
+    Postgres の LISTEN で待つ通知路.
+
+    OutboxStore は行を挿入したトランザクション内で pg_notify(OUTBOX_CHANNEL) を発行するため、
+    通知は commit 時にだけ届く。接続が切れた場合は Dispatcher のフォールバックポーリングで拾う。
+    LISTEN 用の接続はプールから切り離して専有し、close でリスナーを外してから閉じる。
+    """
+
+    engine: AsyncEngine
+    channel: str = OUTBOX_CHANNEL
+    _local: LocalWakeup = field(default_factory=LocalWakeup)
+    _conn: AsyncConnection | None = None
+
+    async def start(self) -> None:
+        conn = await self.engine.connect()
+        raw = await conn.get_raw_connection()
+        # LISTEN した接続はプールから切り離す(返すと次の利用者にリスナーが残る)。close で実際に閉じる
+        raw.detach()
+        await raw.driver_connection.add_listener(self.channel, self._on_notify)  # type: ignore[union-attr]
+        self._conn = conn
+
+    async def close(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        try:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.remove_listener(self.channel, self._on_notify)  # type: ignore[union-attr]
+        finally:
+            await conn.close()
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    def notify(self) -> None:
+        self._local.notify()
+
+    async def wait(self) -> None:
+        await self._local.wait()
+
+    def _on_notify(self, *_args: object) -> None:
+        # asyncpg のリスナーはイベントループ上で呼ばれる: (connection, pid, channel, payload)
+        self._local.notify()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import timeit
+from collections import defaultdict
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from hex_commerce_service.app.application.message_bus import MessageBus, PublishResult
+from hex_commerce_service.app.application.messages.events import StockAllocated
+from hex_commerce_service.app.domain.value_objects import OrderId
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# 例: BUS_BENCH_NUMBER=200000 python src/scripts/bench/bus_publish.py
+NUMBER = int(os.getenv("BUS_BENCH_NUMBER", "200000"))
+
+
+class LegacyMessageBus:
+    """比較用: 型の完全一致で引き、publish ごとにハンドラのリストをコピーしていた旧実装."""
+
+    def __init__(self) -> None:
+        self._handlers: defaultdict[type[Any], list[Callable[[Any], None]]] = defaultdict(list)
+        self.errors: list[tuple[object, BaseException]] = []
+
+    def subscribe(self, event_type: type[Any], handler: Callable[[Any], None]) -> None:
+        self._handlers[event_type].append(handler)
+
+    def publish(self, event: object) -> None:
+        for handler in list(self._handlers.get(type(event), [])):
+            try:
+                handler(event)
+            except BaseException as exc:
+                self.errors.append((event, exc))
+
+
+class UntimedMessageBus(MessageBus):
+    """比較用: ハンドラごとの計測(perf_counter_ns とヒストグラム)を入れる前の publish."""
+
+    def publish(self, event: object) -> PublishResult:
+        cls = type(event)
+        handlers = self._handlers.resolved.get(cls)
+        if handlers is None:
+            handlers = self._handlers.resolve(cls)
+        failures: list[tuple[str, BaseException]] | None = None
+        for handler in handlers:
+            try:
+                handler(event)
+            except BaseException as exc:
+                failures = failures or []
+                failures.append(self._record(handler, [event], exc))
+        batchers = self._batchers.resolved.get(cls)
+        if batchers is None:
+            batchers = self._batchers.resolve(cls)
+        for batcher in batchers:
+            self._buffer(batcher, event)
+        if failures:
+            return PublishResult(event, tuple(failures))
+        return PublishResult(event)
+
+
+def _noop(_event: object) -> None:
+    return None
+
+
+def _distinct_noop() -> Callable[[object], None]:
+    # 同じ関数を何度も購読するとヒストグラムを共有するので、ハンドラごとに別の関数オブジェクトを作る
+    def handler(_event: object) -> None:
+        return None
+
+    return handler
+
+
+def main() -> None:
+    evt = StockAllocated(order_id=OrderId.new(), location="WH-1")
+    print(f"MessageBus.publish (best of 5, up to {NUMBER} publishes, no-op handlers)")
+    for n in (1, 10, 100):
+        number = max(NUMBER // n, 1_000)
+        for name, bus in (("legacy", LegacyMessageBus()), ("dispatch table", MessageBus())):
+            for _ in range(n):
+                bus.subscribe(StockAllocated, _noop)
+            t = min(timeit.repeat(partial(bus.publish, evt), number=number, repeat=5)) / number * 1e9
+            print(f"  {n:>3} handlers  {name:<15} {t:8.0f} ns/publish")
+    # 旧実装では届かない基底クラスへの購読も測る
+    bus = MessageBus()
+    bus.subscribe(object, _noop)
+    t = min(timeit.repeat(lambda: bus.publish(evt), number=NUMBER, repeat=5)) / NUMBER * 1e9
+    print(f"    1 handler on object (via MRO)  {t:8.0f} ns/publish")
+
+    print("Per-handler timing overhead (best of 5, distinct no-op handlers)")
+    for n in (1, 10):
+        number = max(NUMBER // n, 1_000)
+        times: dict[str, float] = {}
+        for name, bus in (("untimed", UntimedMessageBus()), ("timed", MessageBus())):
+            for _ in range(n):
+                bus.subscribe(StockAllocated, _distinct_noop())
+            times[name] = min(timeit.repeat(partial(bus.publish, evt), number=number, repeat=5)) / number * 1e9
+        overhead = (times["timed"] - times["untimed"]) / n
+        print(f"  {n:>3} handlers  untimed {times['untimed']:8.0f}  timed {times['timed']:8.0f} ns/publish  -> {overhead:5.0f} ns/dispatch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from hex_commerce_service.app.application.messages.events import OrderPlaced, StockAllocated
+from hex_commerce_service.app.domain.value_objects import Money, OrderId
+from hex_commerce_service.app.infra.outbox.serializer import default_registry
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# 例: CODEC_BENCH_EVENTS=1000000 python src/scripts/bench/event_codec.py
+EVENTS = int(os.getenv("CODEC_BENCH_EVENTS", "1000000"))
+# 同じイベントを使い回して全件をメモリに持たない
+POOL = 10_000
+
+
+def _legacy_serialize(evt: object) -> dict[str, Any]:
+    # 比較用: if/else で Decimal を文字列に整形していた旧実装
+    if isinstance(evt, OrderPlaced):
+        return {
+            "type": "OrderPlaced",
+            "occurred_at": evt.occurred_at.isoformat(),
+            "payload": {
+                "order_id": str(evt.order_id),
+                "total": {"amount": f"{evt.total.amount:.2f}", "currency": str(evt.total.currency)},
+            },
+        }
+    if isinstance(evt, StockAllocated):
+        return {
+            "type": "StockAllocated",
+            "occurred_at": evt.occurred_at.isoformat(),
+            "payload": {"order_id": str(evt.order_id), "location": evt.location},
+        }
+    raise TypeError(type(evt).__name__)
+
+
+def _legacy_deserialize(env: dict[str, Any]) -> object:
+    t = env["type"]
+    occurred = datetime.fromisoformat(env["occurred_at"])
+    payload = env["payload"]
+    if t == "OrderPlaced":
+        evt: object = OrderPlaced(
+            order_id=OrderId.parse(payload["order_id"]),
+            total=Money.from_major(payload["total"]["amount"], payload["total"]["currency"]),
+        )
+    elif t == "StockAllocated":
+        evt = StockAllocated(order_id=OrderId.parse(payload["order_id"]), location=payload["location"])
+    else:
+        raise TypeError(t)
+    object.__setattr__(evt, "occurred_at", occurred)  # noqa: PLC2801
+    return evt
+
+
+def _legacy_dumps(evt: object) -> bytes:
+    return json.dumps(_legacy_serialize(evt)).encode()
+
+
+def _legacy_loads(data: bytes) -> object:
+    return _legacy_deserialize(json.loads(data))
+
+
+def _registry_dumps(evt: object) -> bytes:
+    return json.dumps(default_registry.serialize(evt)).encode()
+
+
+def _registry_loads(data: bytes) -> object:
+    return default_registry.deserialize(json.loads(data))
+
+
+def _events() -> list[object]:
+    pool: list[object] = []
+    for i in range(POOL):
+        oid = OrderId.new()
+        if i % 2:
+            pool.append(StockAllocated(order_id=oid, location=f"WH-{i % 8}"))
+        else:
+            pool.append(OrderPlaced(order_id=oid, total=Money.from_minor(1_000 + i, "USD")))
+    return pool
+
+
+def _run(label: str, dumps: Callable[[object], bytes], loads: Callable[[bytes], object], pool: list[object]) -> None:
+    encoded = [dumps(e) for e in pool]
+    size = sum(map(len, encoded)) / len(encoded)
+    rounds, rest = divmod(EVENTS, len(pool))
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for e in pool:
+            dumps(e)
+    for e in pool[:rest]:
+        dumps(e)
+    t_enc = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for b in encoded:
+            loads(b)
+    for b in encoded[:rest]:
+        loads(b)
+    t_dec = time.perf_counter() - t0
+
+    print(f"  {label:<24} encode {t_enc / EVENTS * 1e9:7.0f} ns/evt  decode {t_dec / EVENTS * 1e9:7.0f} ns/evt  {size:6.1f} B/evt")
+
+
+def main() -> None:
+    pool = _events()
+    for e in pool[:100]:
+        assert default_registry.loads(default_registry.dumps(e)) == e
+        assert _registry_loads(_registry_dumps(e)) == e
+    print(f"Event codec ({EVENTS} events, OrderPlaced/StockAllocated 50/50)")
+    _run("legacy if/else + json", _legacy_dumps, _legacy_loads, pool)
+    _run("registry + json", _registry_dumps, _registry_loads, pool)
+    _run("registry + msgpack body", default_registry.dumps, default_registry.loads, pool)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from sqlalchemy import delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from hex_commerce_service.app.adapters.outbound.sqlalchemy_repositories import SqlAlchemyInventoryRepository
+from hex_commerce_service.app.domain.entities import Inventory
+from hex_commerce_service.app.domain.value_objects import Sku
+from hex_commerce_service.app.infra.db.models import InventoryItemModel, InventoryLocationModel, ProductModel
+
+# 例: INVENTORY_BENCH_SIZES=10000,100000 python src/scripts/bench/inventory_upsert.py
+# テーブルを TRUNCATE するため、接続先はベンチ専用 DB を BENCH_DATABASE_URL で明示する(既定値なし。DATABASE_URL と同じなら拒否)
+DB_URL = os.getenv("BENCH_DATABASE_URL")
+SIZES = [int(x) for x in os.getenv("INVENTORY_BENCH_SIZES", "10000,100000").split(",")]
+CHANGED = int(os.getenv("INVENTORY_BENCH_CHANGED", "2"))
+ROUNDS = int(os.getenv("INVENTORY_BENCH_ROUNDS", "5"))
+LOCATION = "bench"
+
+
+async def legacy_upsert(session: AsyncSession, inv: Inventory) -> None:
+    # 比較用: ロケーションの全行を削除して入れ直す旧実装
+    if await session.get(InventoryLocationModel, inv.location) is None:
+        session.add(InventoryLocationModel(location=inv.location, description=None))
+        await session.flush()
+    await session.execute(delete(InventoryItemModel).where(InventoryItemModel.location == inv.location))
+    for sku in inv.skus():
+        session.add(InventoryItemModel(location=inv.location, sku=sku.value, on_hand=inv.available(sku)))
+    await session.flush()
+
+
+async def _seed(session: AsyncSession, skus: list[Sku]) -> None:
+    await session.execute(
+        text("TRUNCATE TABLE order_lines, orders, inventory_items, inventory_locations, products RESTART IDENTITY CASCADE")
+    )
+    rows = [{"sku": s.value, "name": s.value, "unit_price_amount": 1, "currency": "USD"} for s in skus]
+    for i in range(0, len(rows), 5_000):
+        await session.execute(pg_insert(ProductModel).values(rows[i : i + 5_000]))
+    inv = Inventory(location=LOCATION)
+    for s in skus:
+        inv.set_on_hand(s, 1_000)
+    await SqlAlchemyInventoryRepository(session).upsert(inv)
+    await session.commit()
+
+
+async def run(sm: async_sessionmaker[AsyncSession], size: int) -> None:
+    skus = [Sku.of(f"INV-{i:07d}") for i in range(size)]
+    async with sm() as session:
+        await _seed(session, skus)
+        repo = SqlAlchemyInventoryRepository(session)
+        inv = await repo.get(LOCATION)
+        assert inv is not None
+
+        legacy: list[float] = []
+        delta: list[float] = []
+        for r in range(ROUNDS):
+            for s in skus[r * CHANGED : (r + 1) * CHANGED]:
+                inv.allocate(s, 1)
+            t0 = time.perf_counter()
+            await legacy_upsert(session, inv)
+            await session.commit()
+            legacy.append(time.perf_counter() - t0)
+            session.expunge_all()  # 次回の再挿入で同じ主キーのインスタンスと衝突しないように
+
+            for s in skus[r * CHANGED : (r + 1) * CHANGED]:
+                inv.allocate(s, 1)
+            t0 = time.perf_counter()
+            await repo.upsert(inv)
+            await session.commit()
+            delta.append(time.perf_counter() - t0)
+
+    print(f"  {size:>7} SKUs, {CHANGED} changed: delete+reinsert {min(legacy) * 1000:9.1f} ms   delta upsert {min(delta) * 1000:7.1f} ms")
+
+
+async def main() -> None:
+    if not DB_URL or os.getenv("DATABASE_URL") == DB_URL:
+        msg = "set BENCH_DATABASE_URL to a scratch database (not DATABASE_URL): this benchmark truncates tables"
+        raise SystemExit(msg)
+    engine = create_async_engine(DB_URL)
+    sm: async_sessionmaker[AsyncSession] = async_sessionmaker(bind=engine, expire_on_commit=False)
+    print(f"Inventory upsert, best of {ROUNDS}")
+    for size in SIZES:
+        await run(sm, size)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
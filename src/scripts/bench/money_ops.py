@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import timeit
+from dataclasses import dataclass
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from hex_commerce_service.app.domain.value_objects import Money
+from hex_commerce_service.app.domain.value_objects.money import _coerce_decimal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+NUMBER = int(os.getenv("MONEY_BENCH_NUMBER", "200000"))
+LINES = 40
+
+
+def _legacy_validate_currency(code: str) -> str:
+    if len(code) != 3 or not code.isalpha() or not code.isupper():
+        msg = "currency must be 3 uppercase letters (ISO 4217-like)"
+        raise ValueError(msg)
+    return code
+
+
+@dataclass(frozen=True, slots=True)
+class LegacyMoney:
+    """比較用: Decimal を保持し毎回 quantize していた旧実装."""
+
+    amount: Decimal
+    currency: str
+
+    _QUANT: ClassVar[Decimal] = Decimal("0.01")
+    _ROUNDING: ClassVar[Any] = ROUND_HALF_EVEN
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "currency", _legacy_validate_currency(str(self.currency)))
+        amt = _coerce_decimal(self.amount)
+        object.__setattr__(self, "amount", amt.quantize(self._QUANT, rounding=self._ROUNDING))
+
+    @classmethod
+    def from_major(cls, amount: Decimal | int | str, currency: str) -> LegacyMoney:
+        return cls(amount=_coerce_decimal(amount), currency=_legacy_validate_currency(currency))
+
+    def __add__(self, other: LegacyMoney) -> LegacyMoney:
+        if self.currency != other.currency:
+            raise ValueError("currency mismatch")
+        return LegacyMoney(amount=self.amount + other.amount, currency=self.currency)
+
+    def __mul__(self, factor: int | Decimal) -> LegacyMoney:
+        d = _coerce_decimal(Decimal(factor))
+        return LegacyMoney(amount=self.amount * d, currency=self.currency)
+
+
+def _bench(label: str, stmt: Callable[[], object], number: int) -> float:
+    t = min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e9
+    print(f"  {label:<28} {t:8.0f} ns/op")
+    return t
+
+
+def _bench_legacy() -> None:
+    a = LegacyMoney.from_major("12.34", "USD")
+    b = LegacyMoney.from_major("0.66", "USD")
+    lines = [LegacyMoney.from_major(f"{i}.25", "USD") for i in range(LINES)]
+    zero = LegacyMoney.from_major(0, "USD")
+
+    def fold() -> LegacyMoney:
+        total = zero
+        for m in lines:
+            total += m
+        return total
+
+    _bench("from_major(str)", lambda: LegacyMoney.from_major("12.34", "USD"), NUMBER)
+    _bench("a + b", lambda: a + b, NUMBER)
+    _bench("a * 3", lambda: a * 3, NUMBER)
+    _bench(f"fold + ({LINES} lines)", fold, NUMBER // LINES)
+
+
+def _bench_money() -> None:
+    a = Money.from_major("12.34", "USD")
+    b = Money.from_major("0.66", "USD")
+    lines = [Money.from_major(f"{i}.25", "USD") for i in range(LINES)]
+    _bench("from_major(str)", lambda: Money.from_major("12.34", "USD"), NUMBER)
+    _bench("a + b", lambda: a + b, NUMBER)
+    _bench("a * 3", lambda: a * 3, NUMBER)
+    _bench(f"Money.sum({LINES} lines)", lambda: Money.sum(lines, "USD"), NUMBER // LINES)
+
+
+def main() -> None:
+    print(f"Money microbenchmarks (best of 3, {NUMBER} ops)")
+    print("legacy Decimal")
+    _bench_legacy()
+    print("int minor units")
+    _bench_money()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from hex_commerce_service.app.application.message_bus import MessageBus
+from hex_commerce_service.app.application.messages.events import OrderPlaced
+from hex_commerce_service.app.domain.value_objects import Money, OrderId
+from hex_commerce_service.app.infra.outbox.dispatcher import OutboxDispatcher
+from hex_commerce_service.app.infra.outbox.repository import OutboxStore
+from hex_commerce_service.app.infra.outbox.serializer import load_event
+
+# 例: OUTBOX_BENCH_BATCHES=50,500,5000 OUTBOX_BENCH_MESSAGES=20000 python src/scripts/bench/outbox_ack.py
+# テーブルを TRUNCATE するため、接続先はベンチ専用 DB を BENCH_DATABASE_URL で明示する(既定値なし。DATABASE_URL と同じなら拒否)
+DB_URL = os.getenv("BENCH_DATABASE_URL")
+BATCHES = [int(x) for x in os.getenv("OUTBOX_BENCH_BATCHES", "50,500,5000").split(",")]
+MESSAGES = int(os.getenv("OUTBOX_BENCH_MESSAGES", "20000"))
+
+
+async def legacy_run_once(sm: async_sessionmaker[AsyncSession], bus: MessageBus, batch_size: int) -> int:
+    # 比較用: メッセージごとに mark_sent() (= 1行ずつ UPDATE) する旧実装
+    async with sm() as session:
+        store = OutboxStore(session)
+        messages = await store.claim_batch(owner="bench", batch_size=batch_size)
+        for msg in messages:
+            bus.publish(load_event(msg.payload, msg.body))
+            await store.mark_sent(msg)
+        await session.commit()
+        return len(messages)
+
+
+async def _seed(sm: async_sessionmaker[AsyncSession]) -> None:
+    async with sm() as session:
+        await session.execute(text("TRUNCATE TABLE outbox_messages RESTART IDENTITY"))
+        total = Money.from_major(1, "USD")
+        await OutboxStore(session).enqueue_many(OrderPlaced(order_id=OrderId.new(), total=total) for _ in range(MESSAGES))
+        await session.commit()
+
+
+async def _drain(sm: async_sessionmaker[AsyncSession], batch_size: int, *, legacy: bool) -> float:
+    await _seed(sm)
+    bus = MessageBus()
+    bus.subscribe(OrderPlaced, lambda _evt: None)
+    dispatcher = OutboxDispatcher(sessionmaker=sm, owner="bench", bus=bus, batch_size=batch_size)
+    n = 0
+    t0 = time.perf_counter()
+    while True:
+        got = await legacy_run_once(sm, bus, batch_size) if legacy else await dispatcher.run_once()
+        if got == 0:
+            break
+        n += got
+        dispatcher.delivered.clear()
+    return n / (time.perf_counter() - t0)
+
+
+async def main() -> None:
+    if not DB_URL or os.getenv("DATABASE_URL") == DB_URL:
+        msg = "set BENCH_DATABASE_URL to a scratch database (not DATABASE_URL): this benchmark truncates tables"
+        raise SystemExit(msg)
+    engine = create_async_engine(DB_URL)
+    sm: async_sessionmaker[AsyncSession] = async_sessionmaker(bind=engine, expire_on_commit=False)
+    print(f"Outbox dispatch of {MESSAGES} messages (msg/s)")
+    for batch in BATCHES:
+        per_row = await _drain(sm, batch, legacy=True)
+        bulk = await _drain(sm, batch, legacy=False)
+        print(f"  batch {batch:>5}: per-row ack {per_row:9.0f}   set-based ack {bulk:9.0f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from hex_commerce_service.app.application.message_bus import MessageBus
+from hex_commerce_service.app.application.messages.events import OrderPlaced
+from hex_commerce_service.app.domain.value_objects import Money, OrderId
+from hex_commerce_service.app.infra.outbox.dispatcher import OutboxDispatcher
+from hex_commerce_service.app.infra.outbox.repository import OutboxStore
+from hex_commerce_service.app.infra.outbox.wakeup import PgListenWakeup
+
+# 例: OUTBOX_LATENCY_EVENTS=50 python src/scripts/bench/outbox_latency.py
+# テーブルを TRUNCATE するため、接続先はベンチ専用 DB を BENCH_DATABASE_URL で明示する(既定値なし。DATABASE_URL と同じなら拒否)
+DB_URL = os.getenv("BENCH_DATABASE_URL")
+EVENTS = int(os.getenv("OUTBOX_LATENCY_EVENTS", "50"))
+POLL_SECONDS = float(os.getenv("OUTBOX_LATENCY_POLL", "2.0"))
+
+
+async def _measure(engine: AsyncEngine, sm: async_sessionmaker[AsyncSession], *, listen: bool) -> list[float]:
+    async with sm() as session:
+        await session.execute(text("TRUNCATE TABLE outbox_messages RESTART IDENTITY"))
+        await session.commit()
+
+    committed: dict[OrderId, float] = {}
+    latencies: list[float] = []
+    delivered = asyncio.Event()
+
+    async def deliver(evt: object) -> None:
+        assert isinstance(evt, OrderPlaced)
+        latencies.append(time.perf_counter() - committed[evt.order_id])
+        delivered.set()
+        await asyncio.sleep(0)
+
+    wakeup = PgListenWakeup(engine) if listen else None
+    if wakeup is not None:
+        await wakeup.start()
+    dispatcher = OutboxDispatcher(sessionmaker=sm, owner="bench", bus=MessageBus(), deliver=deliver, wakeup=wakeup)
+    stop = asyncio.Event()
+    task = asyncio.create_task(dispatcher.run_forever(interval_seconds=POLL_SECONDS, stop_event=stop))
+
+    for _ in range(EVENTS):
+        # Dispatcher が空振りして待機に入ってから次を積む
+        await asyncio.sleep(0.05)
+        evt = OrderPlaced(order_id=OrderId.new(), total=Money.from_major(1, "USD"))
+        delivered.clear()
+        async with sm() as session:
+            await OutboxStore(session).enqueue_many([evt])
+            committed[evt.order_id] = time.perf_counter()
+            await session.commit()
+        await delivered.wait()
+
+    stop.set()
+    await task
+    if wakeup is not None:
+        await wakeup.close()
+    return latencies
+
+
+def _report(label: str, xs: list[float]) -> None:
+    ms = sorted(x * 1000 for x in xs)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"  {label:<18} p50 {statistics.median(ms):8.1f} ms   p95 {p95:8.1f} ms   max {ms[-1]:8.1f} ms")
+
+
+async def main() -> None:
+    if not DB_URL or os.getenv("DATABASE_URL") == DB_URL:
+        msg = "set BENCH_DATABASE_URL to a scratch database (not DATABASE_URL): this benchmark truncates tables"
+        raise SystemExit(msg)
+    engine = create_async_engine(DB_URL)
+    sm: async_sessionmaker[AsyncSession] = async_sessionmaker(bind=engine, expire_on_commit=False)
+    print(f"Outbox enqueue-commit -> delivery latency, {EVENTS} events")
+    _report(f"poll {POLL_SECONDS:g}s", await _measure(engine, sm, listen=False))
+    _report("LISTEN/NOTIFY", await _measure(engine, sm, listen=True))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+import timeit
+from typing import TYPE_CHECKING
+
+from hex_commerce_service.app.domain.value_objects import Sku
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# 例: SKU_BENCH_HOT=50000 SKU_BENCH_NUMBER=300000 python src/scripts/bench/sku_intern.py
+HOT = int(os.getenv("SKU_BENCH_HOT", "50000"))
+NUMBER = int(os.getenv("SKU_BENCH_NUMBER", "300000"))
+
+
+def _construct(ctor: Callable[[str], Sku], raw: list[str]) -> Callable[[], Sku]:
+    # 呼ぶたびに次の生の値から SKU を作る(repeat の回数分まで)
+    n = len(raw)
+    it = iter(range(NUMBER * 3 + 3))
+
+    def stmt() -> Sku:
+        return ctor(raw[next(it) % n])
+
+    return stmt
+
+
+def main() -> None:
+    raw = [f"sku-{i:06d}" for i in range(HOT)]
+    for r in raw:  # 暖機: ホットな SKU はすでにインターン済みという想定
+        Sku.of(r)
+
+    print(f"Sku construction, {HOT} hot values (best of 3, {NUMBER} ops)")
+    ctors: tuple[tuple[str, Callable[[str], Sku]], ...] = (("Sku(value)", Sku), ("Sku.of(value)", Sku.of))
+    for label, ctor in ctors:
+        t = min(timeit.repeat(_construct(ctor, raw), number=NUMBER, repeat=3)) / NUMBER * 1e9
+        print(f"  {label:<16} {t:8.0f} ns/op")
+
+    a, b = Sku.of(raw[0]), Sku.of(raw[0])
+    c, d = Sku(raw[0]), Sku(raw[0])
+    t_id = min(timeit.repeat(lambda: a == b, number=NUMBER, repeat=3)) / NUMBER * 1e9
+    t_val = min(timeit.repeat(lambda: c == d, number=NUMBER, repeat=3)) / NUMBER * 1e9
+    print(f"  {'eq (interned)':<16} {t_id:8.0f} ns/op")
+    print(f"  {'eq (distinct)':<16} {t_val:8.0f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+import time
+
+from hex_commerce_service.app.adapters.inmemory.system import InMemoryIdGenerator, InMemoryUnitOfWork
+from hex_commerce_service.app.application.use_cases.place_order import (
+    NewOrderItem,
+    PlaceOrderCommand,
+    PlaceOrderUseCase,
+)
+from hex_commerce_service.app.domain.entities import Order, Product
+from hex_commerce_service.app.domain.value_objects import Money, Sku
+
+# 例: UOW_BENCH_SIZES=1000,10000 python src/scripts/bench/uow_commit.py
+SIZES = [int(x) for x in os.getenv("UOW_BENCH_SIZES", "1000,10000,100000,1000000").split(",")]
+ITERATIONS = int(os.getenv("UOW_BENCH_ITERATIONS", "2000"))
+
+
+def _seed(uow: InMemoryUnitOfWork, n_orders: int) -> None:
+    id_gen = InMemoryIdGenerator()
+    uow.products.add(Product(sku=Sku("ABC-1"), name="Widget", unit_price=Money.from_major(10, "USD")))
+    for _ in range(n_orders):
+        uow.orders.add(Order(id=id_gen.new_order_id(), currency="USD"))
+
+
+def bench(n_orders: int) -> float:
+    uow = InMemoryUnitOfWork()
+    _seed(uow, n_orders)
+    uc = PlaceOrderUseCase(uow=uow, id_gen=InMemoryIdGenerator())
+    cmd = PlaceOrderCommand(items=[NewOrderItem(Sku("ABC-1"), 1)])
+
+    t0 = time.perf_counter()
+    for _ in range(ITERATIONS):
+        uc.execute(cmd)
+    t1 = time.perf_counter()
+    return (t1 - t0) / ITERATIONS * 1_000_000
+
+
+def main() -> None:
+    print(f"PlaceOrderUseCase.execute x {ITERATIONS} (undo log)")
+    for n in SIZES:
+        print(f"  stored orders={n:>9,d}: {bench(n):8.1f} us/commit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hex_commerce_service.app.adapters.inmemory.system import InMemoryIdGenerator, InMemoryUnitOfWorkFactory
+from hex_commerce_service.app.application.messages.events import OrderPlaced, StockAllocated
+from hex_commerce_service.app.application.use_cases.allocate_stock import AllocateStockCommand, AllocateStockUseCase
+from hex_commerce_service.app.application.use_cases.place_order import (
+    NewOrderItem,
+    PlaceOrderCommand,
+    PlaceOrderUseCase,
+)
+from hex_commerce_service.app.domain.entities import Inventory, Product
+from hex_commerce_service.app.domain.errors import OutOfStockError
+from hex_commerce_service.app.domain.value_objects import Money, OrderId, Sku
+
+# 例: UOW_BENCH_THREADS=1,4,16 UOW_BENCH_REQUESTS=20000 python src/scripts/bench/uow_concurrency.py
+THREADS = [int(x) for x in os.getenv("UOW_BENCH_THREADS", "1,4,16").split(",")]
+REQUESTS = int(os.getenv("UOW_BENCH_REQUESTS", "20000"))
+LOCATIONS = int(os.getenv("UOW_BENCH_LOCATIONS", "8"))
+STOCK_PER_LOCATION = REQUESTS // LOCATIONS * 3 // 4  # 1/4 は在庫切れになる
+
+
+def _seed(factory: InMemoryUnitOfWorkFactory) -> list[str]:
+    uow = factory()
+    uow.products.add(Product(sku=Sku("ABC-1"), name="Widget", unit_price=Money.from_major(10, "USD")))
+    locations = [f"loc-{i}" for i in range(LOCATIONS)]
+    for loc in locations:
+        inv = Inventory(location=loc)
+        inv.set_on_hand(Sku("ABC-1"), STOCK_PER_LOCATION)
+        uow.inventories.upsert(inv)
+    return locations
+
+
+def run(threads: int) -> None:
+    factory = InMemoryUnitOfWorkFactory()
+    locations = _seed(factory)
+    id_gen = InMemoryIdGenerator()
+    cmd = PlaceOrderCommand(items=[NewOrderItem(Sku("ABC-1"), 1)])
+
+    def request(i: int) -> bool:
+        res = PlaceOrderUseCase(uow=factory(), id_gen=id_gen).execute(cmd)
+        try:
+            AllocateStockUseCase(uow=factory()).execute(
+                AllocateStockCommand(order_id=OrderId.parse(res.order_id), location=locations[i % LOCATIONS])
+            )
+        except OutOfStockError:
+            return False
+        return True
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(request, range(REQUESTS)))
+    elapsed = time.perf_counter() - t0
+
+    # 正しさの検証: 売り越しなし・割当数と在庫減少・イベント数が一致する
+    store = factory.store
+    allocated = results.count(True)
+    remaining = sum(inv.available(Sku("ABC-1")) for inv in store.inventories.values())
+    placed_events = sum(isinstance(e, OrderPlaced) for e in store.event_sink.events)
+    allocated_events = sum(isinstance(e, StockAllocated) for e in store.event_sink.events)
+    ok = (
+        len(store.orders) == REQUESTS
+        and placed_events == REQUESTS
+        and allocated_events == allocated
+        and remaining == STOCK_PER_LOCATION * LOCATIONS - allocated
+        and all(inv.available(Sku("ABC-1")) == 0 for inv in store.inventories.values())
+    )
+    print(f"  threads={threads:>3}: {REQUESTS / elapsed:9.0f} req/s  allocated={allocated} remaining={remaining} consistent={ok}")
+
+
+def main() -> None:
+    print(f"place+allocate x {REQUESTS} over {LOCATIONS} locations (UoW per request, striped locks)")
+    for n in THREADS:
+        run(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from hex_commerce_service.app.adapters.inbound.api.app import create_app
+from hex_commerce_service.app.application.messages.events import OrderPlaced
+
+if os.getenv("GITHUB_ACTIONS") == "true":
+    pytest.skip("Skip API test on GitHub Actions CI", allow_module_level=True)
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_bus_stats_exposes_handler_latency_of_running_app() -> None:
+    app = create_app()
+    seen: list[object] = []
+    app.state.bus.subscribe(OrderPlaced, seen.append)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://127.0.0.1:8000") as ac:
+        admin = (await ac.post("/auth/token/test", json={"sub": "ops", "roles": ["admin", "user"]})).json()["access_token"]
+        user = (await ac.post("/auth/token/test", json={"sub": "u", "roles": ["user"]})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {admin}"}
+        await ac.post("/products", json={"sku": "ABC-1", "name": "Widget", "price": "10.00", "currency": "USD"}, headers=headers)
+        await ac.put("/inventory/default", json={"location": "default", "items": [{"sku": "ABC-1", "on_hand": 5}]}, headers=headers)
+        r = await ac.post("/orders", json={"items": [{"sku": "ABC-1", "quantity": 1}]}, headers=headers)
+        assert r.status_code == 201, r.text
+
+        r = await ac.get("/bus/stats", headers=headers)
+        assert r.status_code == 200, r.text
+        rows = r.json()
+        assert [(row["event_type"], row["count"]) for row in rows] == [("OrderPlaced", 1)]
+        assert rows[0]["p50_ns"] <= rows[0]["p99_ns"] <= rows[0]["max_ns"]
+
+        # 管理者のみ
+        r = await ac.get("/bus/stats", headers={"Authorization": f"Bearer {user}"})
+        assert r.status_code == 403
+    assert len(seen) == 1
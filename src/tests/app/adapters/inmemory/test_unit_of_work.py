@@ -1,12 +1,26 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from hex_commerce_service.app.adapters.inmemory.system import InMemoryIdGenerator, InMemoryUnitOfWork
+from hex_commerce_service.app.adapters.inmemory.system import (
+    InMemoryIdGenerator,
+    InMemoryUnitOfWork,
+    InMemoryUnitOfWorkFactory,
+)
 from hex_commerce_service.app.application.message_bus import MessageBus
-from hex_commerce_service.app.application.messages.events import OrderPlaced
-from hex_commerce_service.app.domain.entities import Order
-from hex_commerce_service.app.domain.value_objects import Money, OrderId
+from hex_commerce_service.app.application.messages.events import OrderPlaced, StockAllocated
+from hex_commerce_service.app.application.use_cases import (
+    AllocateStockCommand,
+    AllocateStockUseCase,
+    NewOrderItem,
+    PlaceOrderCommand,
+    PlaceOrderUseCase,
+)
+from hex_commerce_service.app.domain.errors import OutOfStockError
+from hex_commerce_service.app.domain.entities import Inventory, Order, Product
+from hex_commerce_service.app.domain.value_objects import Money, OrderId, Sku
 
 
 def test_uow_commit_persists_and_flushes_events() -> None:
@@ -50,16 +64,84 @@ def test_uow_rollback_on_exception_restores_state_and_discards_events() -> None:
     assert uow.committed is False
 
 
-def test_restore_snapshots_returns_if_snapshots_none() -> None:
+def test_rollback_without_changes_is_noop() -> None:
+    uow = InMemoryUnitOfWork()
+    # 何も記録されていない状態で rollback しても例外にならない
+    uow.rollback()
+
+    assert len(uow._journal) == 0
+    assert list(uow.orders.list()) == []
+
+
+def test_rollback_restores_only_touched_keys() -> None:
+    uow = InMemoryUnitOfWork()
+    existing = [Order(id=InMemoryIdGenerator().new_order_id(), currency="USD") for _ in range(100)]
+    for o in existing:
+        uow.orders.add(o)
+
+    replaced = Order(id=existing[0].id, currency="EUR")
+    added = Order(id=InMemoryIdGenerator().new_order_id(), currency="USD")
+    with pytest.raises(RuntimeError):
+        with uow:
+            uow.orders.add(replaced)
+            uow.orders.add(replaced)
+            uow.orders.add(added)
+            # 既存100件ではなく、触れた2キーだけが記録される
+            assert len(uow._journal) == 2
+            raise RuntimeError("boom")
+
+    assert uow.orders.get(existing[0].id) is existing[0]
+    assert uow.orders.get(added.id) is None
+    assert len(list(uow.orders.list())) == 100
+    assert len(uow._journal) == 0
+
+
+def test_commit_discards_undo_log() -> None:
+    uow = InMemoryUnitOfWork()
+    order = Order(id=InMemoryIdGenerator().new_order_id(), currency="USD")
+    with uow:
+        uow.orders.add(order)
+        uow.commit()
+        uow.rollback()  # commit後のrollbackは何も戻さない
+
+    assert uow.orders.get(order.id) is order
+
+def test_rollback_restores_inventory_mutated_in_place() -> None:
+    uow = InMemoryUnitOfWork()
+    inv = Inventory(location="default")
+    inv.set_on_hand(Sku("ABC-1"), 5)
+    inv.set_on_hand(Sku("ABC-2"), 7)
+    uow.inventories.upsert(inv)
+
+    with pytest.raises(RuntimeError):
+        with uow:
+            loaded = uow.inventories.get("default")
+            assert loaded is not None
+            loaded.allocate(Sku("ABC-1"), 2)
+            loaded.allocate(Sku("ABC-2"), 7)
+            raise RuntimeError("boom")
+
+    got = uow.inventories.get("default")
+    assert got is inv
+    assert got.available(Sku("ABC-1")) == 5
+    assert got.available(Sku("ABC-2")) == 7
+
+
+def test_commit_keeps_inventory_mutations_and_stops_tracking() -> None:
     uow = InMemoryUnitOfWork()
-    # デフォルトで _products_snapshot, _orders_snapshot, _inventories_snapshot は None
-    # 何もせず _restore_snapshots を呼ぶと if文がTrueになりreturnする
-    uow._restore_snapshots()  # ここで何も起きなければOK（例外が出ない）
+    inv = Inventory(location="default")
+    inv.set_on_hand(Sku("ABC-1"), 5)
+    uow.inventories.upsert(inv)
+
+    with uow:
+        loaded = uow.inventories.get("default")
+        assert loaded is not None
+        loaded.allocate(Sku("ABC-1"), 2)
+        uow.commit()
+
+    assert inv.available(Sku("ABC-1")) == 3
+    assert inv._changes is None
 
-    # 明示的なアサート（副作用がないことを確認）
-    assert uow._products_snapshot is None
-    assert uow._orders_snapshot is None
-    assert uow._inventories_snapshot is None
 
 def test_buffer_or_sink_outside_context_dispatches_immediately() -> None:
     uow = InMemoryUnitOfWork()
@@ -97,3 +179,48 @@ def test_buffer_or_sink_calls_message_bus_publish_outside_context() -> None:
 
     # event_sinkにも追加されている
     assert event in uow.event_sink.events
+
+
+def test_factory_uows_share_store_but_not_transaction_state() -> None:
+    factory = InMemoryUnitOfWorkFactory()
+    a, b = factory(), factory()
+    order = Order(id=InMemoryIdGenerator().new_order_id(), currency="USD")
+
+    with a:
+        a.orders.add(order)
+        a.events.publish(OrderPlaced(order_id=order.id, total=Money.from_major(0, "USD")))
+        # b は a のペンディングイベントを見ない
+        assert b._pending_events == []
+        a.commit()
+
+    assert b.orders.get(order.id) is order
+    assert len(factory.store.event_sink.events) == 1
+
+
+def test_factory_concurrent_allocations_never_oversell() -> None:
+    factory = InMemoryUnitOfWorkFactory()
+    seed = factory()
+    seed.products.add(Product(sku=Sku("ABC-1"), name="Widget", unit_price=Money.from_major(1, "USD")))
+    inv = Inventory(location="default")
+    inv.set_on_hand(Sku("ABC-1"), 150)
+    seed.inventories.upsert(inv)
+
+    def place_and_allocate(_: int) -> bool:
+        res = PlaceOrderUseCase(uow=factory(), id_gen=InMemoryIdGenerator()).execute(
+            PlaceOrderCommand(items=[NewOrderItem(Sku("ABC-1"), 1)])
+        )
+        try:
+            AllocateStockUseCase(uow=factory()).execute(AllocateStockCommand(order_id=OrderId.parse(res.order_id)))
+        except OutOfStockError:
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(place_and_allocate, range(200)))
+
+    assert results.count(True) == 150
+    assert inv.available(Sku("ABC-1")) == 0
+    assert len(factory.store.orders) == 200
+    allocated = [e for e in factory.store.event_sink.events if isinstance(e, StockAllocated)]
+    assert len(allocated) == 150
+
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import pytest
+
+from hex_commerce_service.app.application.latency import HandlerLatency, LatencyHistogram, bucket_index, bucket_upper
+
+
+@pytest.mark.parametrize("ns", [0, 1, 15, 16, 17, 31, 32, 999, 1_000, 123_456, 10**9, 2**63])
+def test_bucket_bounds_contain_value_within_relative_error(ns: int) -> None:
+    index = bucket_index(ns)
+    lower = bucket_upper(index - 1) + 1 if index else 0
+    assert lower <= ns <= bucket_upper(index)
+    assert bucket_upper(index) - lower <= max(ns // 8, 1)
+
+
+def test_quantiles_and_max() -> None:
+    hist = LatencyHistogram()
+    for ns in range(1, 1_001):
+        hist.record(ns * 1_000)
+
+    summary = HandlerLatency.of("StockAllocated", "h", hist)
+
+    assert summary.count == 1_000
+    assert summary.max_ns == 1_000_000
+    assert summary.total_ns == sum(ns * 1_000 for ns in range(1, 1_001))
+    assert 500_000 <= summary.p50_ns <= 500_000 * 1.125
+    assert 990_000 <= summary.p99_ns <= 1_000_000
+
+
+def test_empty_histogram() -> None:
+    hist = LatencyHistogram()
+    assert (hist.count, hist.quantile(0.99), hist.max_ns) == (0, 0, 0)
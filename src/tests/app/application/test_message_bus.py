@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from hex_commerce_service.app.adapters.inmemory.system import InMemoryUnitOfWork
+from hex_commerce_service.app.application.errors import MessageBusClosedError, MessageBusOverloadedError
+from hex_commerce_service.app.application.message_bus import MessageBus, QueuedMessageBus, handler_name
+from hex_commerce_service.app.application.messages.events import OrderPlaced, StockAllocated
+from hex_commerce_service.app.domain.events import DomainEvent
+from hex_commerce_service.app.domain.value_objects import Money, OrderId
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _evt(location: str = "WH-1") -> StockAllocated:
+    return StockAllocated(order_id=OrderId.new(), location=location)
+
+
+def test_publish_returns_before_handler_runs_and_close_drains() -> None:
+    gate = threading.Event()
+    seen: list[str] = []
+
+    def slow(ev: StockAllocated) -> None:
+        gate.wait()
+        seen.append(ev.location)
+
+    bus = QueuedMessageBus()
+    bus.subscribe(StockAllocated, slow)
+    uow = InMemoryUnitOfWork()
+    uow.message_bus = bus
+    with uow:
+        uow.events.publish(_evt("A"))
+        uow.events.publish(_evt("B"))
+        uow.commit()
+
+    # commit は遅いハンドラを待たずに戻る
+    assert seen == []
+    gate.set()
+    assert bus.close(timeout=5)
+    assert seen == ["A", "B"]
+    with pytest.raises(MessageBusClosedError):
+        bus.publish(_evt())
+
+
+def test_handler_errors_are_recorded_and_worker_keeps_running() -> None:
+    seen: list[str] = []
+
+    def flaky(ev: StockAllocated) -> None:
+        if ev.location == "bad":
+            raise RuntimeError("boom")
+        seen.append(ev.location)
+
+    bus = QueuedMessageBus()
+    bus.subscribe(StockAllocated, flaky)
+    bus.publish(_evt("bad"))
+    bus.publish(_evt("ok"))
+
+    assert bus.drain(timeout=5)
+    assert seen == ["ok"]
+    assert [str(exc) for _, exc in bus.errors] == ["boom"]
+    bus.close()
+
+
+def test_drop_oldest_and_raise_policies() -> None:
+    gate = threading.Event()
+    seen: list[str] = []
+
+    def blocked_handler(started: threading.Event) -> Callable[[StockAllocated], None]:
+        def handler(ev: StockAllocated) -> None:
+            started.set()
+            gate.wait()
+            seen.append(ev.location)
+
+        return handler
+
+    started = threading.Event()
+    dropping = QueuedMessageBus(maxsize=1, backpressure="drop_oldest")
+    dropping.subscribe(StockAllocated, blocked_handler(started))
+    dropping.publish(_evt("running"))
+    assert started.wait(5)
+    for loc in ("1", "2", "3"):
+        dropping.publish(_evt(loc))
+    assert dropping.dropped == 2
+
+    started = threading.Event()
+    raising = QueuedMessageBus(maxsize=1, backpressure="raise")
+    raising.subscribe(StockAllocated, blocked_handler(started))
+    raising.publish(_evt("x"))
+    assert started.wait(5)
+    raising.publish(_evt("y"))
+    with pytest.raises(MessageBusOverloadedError):
+        raising.publish(_evt("z"))
+
+    gate.set()
+    assert dropping.close(timeout=5)
+    assert raising.close(timeout=5)
+    assert sorted(seen) == ["3", "running", "x", "y"]
+
+
+def test_concurrency_runs_handler_in_parallel() -> None:
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_peers(_ev: StockAllocated) -> None:
+        barrier.wait()
+
+    bus = QueuedMessageBus()
+    bus.subscribe(StockAllocated, wait_for_peers, concurrency=3)
+    for _ in range(3):
+        bus.publish(_evt())
+
+    # 3本のワーカーが同時に入らなければ Barrier がタイムアウトして errors に残る
+    assert bus.close(timeout=5)
+    assert not bus.errors
+
+
+def test_commit_hands_batch_handler_one_list() -> None:
+    batches: list[list[str]] = []
+    single: list[str] = []
+    bus = MessageBus()
+    bus.subscribe_batch(StockAllocated, lambda evs: batches.append([e.location for e in evs]), max_batch=2)
+    bus.subscribe(StockAllocated, lambda ev: single.append(ev.location))
+    uow = InMemoryUnitOfWork()
+    uow.message_bus = bus
+
+    with uow:
+        for loc in ("A", "B", "C"):
+            uow.events.publish(_evt(loc))
+        uow.commit()
+
+    assert single == ["A", "B", "C"]
+    assert batches == [["A", "B"], ["C"]]
+
+
+def test_publish_buffers_until_size_or_delay() -> None:
+    batches: list[list[str]] = []
+    flushed = threading.Event()
+
+    def handler(evs: list[StockAllocated]) -> None:
+        batches.append([e.location for e in evs])
+        flushed.set()
+
+    bus = MessageBus()
+    bus.subscribe_batch(StockAllocated, handler, max_batch=3, max_delay=0.05)
+    for loc in ("A", "B", "C", "D"):
+        bus.publish(_evt(loc))
+    assert batches == [["A", "B", "C"]]
+
+    flushed.clear()
+    assert flushed.wait(5)  # D は max_delay 経過後にタイマーで渡される
+    assert batches == [["A", "B", "C"], ["D"]]
+
+
+def test_failed_batch_records_every_event() -> None:
+    def handler(_evs: list[StockAllocated]) -> None:
+        raise RuntimeError("db down")
+
+    bus = MessageBus()
+    bus.subscribe_batch(StockAllocated, handler)
+    events = [_evt(), _evt()]
+    bus.publish_many(events)
+
+    assert [(ev, str(exc)) for ev, exc in bus.errors] == [(events[0], "db down"), (events[1], "db down")]
+
+
+def test_queued_batch_worker_collects_queued_events() -> None:
+    gate = threading.Event()
+    batches: list[list[str]] = []
+
+    def handler(evs: list[StockAllocated]) -> None:
+        gate.wait()
+        batches.append([e.location for e in evs])
+
+    bus = QueuedMessageBus()
+    bus.subscribe_batch(StockAllocated, handler, max_batch=10)
+    bus.publish(_evt("first"))
+    bus.publish_many([_evt(str(i)) for i in range(12)])
+    gate.set()
+
+    assert bus.close(timeout=5)
+    assert [loc for batch in batches for loc in batch] == ["first", *[str(i) for i in range(12)]]
+    assert all(len(batch) <= 10 for batch in batches)
+    assert len(batches) < 13
+
+
+def test_base_class_handlers_receive_subclass_events_after_specific_ones() -> None:
+    seen: list[str] = []
+    bus = MessageBus()
+    bus.subscribe(DomainEvent, lambda ev: seen.append(f"base:{type(ev).__name__}"))
+    bus.subscribe(StockAllocated, lambda _ev: seen.append("specific"))
+
+    bus.publish(_evt())
+    bus.publish(OrderPlaced(order_id=OrderId.new(), total=Money.from_major(1, "USD")))
+    # 購読を足すとキャッシュが作り直される
+    bus.subscribe(object, lambda _ev: seen.append("object"))
+    bus.publish(_evt())
+
+    assert seen == ["specific", "base:StockAllocated", "base:OrderPlaced", "specific", "base:StockAllocated", "object"]
+
+
+def test_publish_result_ring_buffer_and_failure_stats() -> None:
+    def broken(_ev: StockAllocated) -> None:
+        raise RuntimeError("smtp down")
+
+    bus = MessageBus(max_errors=3)
+    bus.subscribe(StockAllocated, broken)
+    bus.subscribe(StockAllocated, lambda _ev: None)
+
+    results = [bus.publish(_evt(str(i))) for i in range(5)]
+
+    assert [r.ok for r in results] == [False] * 5
+    assert results[0].failed_handlers == (handler_name(broken),)
+    assert str(results[0].failures[0][1]) == "smtp down"
+    # 直近 max_errors 件だけ残る
+    assert [ev.location for ev, _ in bus.errors] == ["2", "3", "4"]
+    stats = bus.failure_stats[handler_name(broken)]
+    assert (stats.count, stats.last_error, stats.last_event_type) == (5, "RuntimeError: smtp down", "StockAllocated")
+    assert handler_name(broken).endswith("test_publish_result_ring_buffer_and_failure_stats.<locals>.broken")
+
+
+def test_publish_many_reports_batch_failures_per_event() -> None:
+    def project(evs: list[StockAllocated]) -> None:
+        if any(ev.location == "bad" for ev in evs):
+            raise RuntimeError("db down")
+
+    bus = MessageBus()
+    bus.subscribe_batch(StockAllocated, project, max_batch=2)
+    events = [_evt("ok"), _evt("ok"), _evt("bad")]
+
+    results = bus.publish_many(events)
+
+    assert [r.event for r in results] == events
+    assert [r.ok for r in results] == [True, True, False]
+    assert bus.failure_stats[handler_name(project)].count == 1
+
+
+def test_queued_publish_result_is_queued() -> None:
+    bus = QueuedMessageBus()
+    bus.subscribe(StockAllocated, lambda _ev: None)
+
+    result = bus.publish(_evt())
+
+    assert result.queued
+    assert result.ok
+    assert bus.close(timeout=5)
+
+
+def test_latency_stats_per_event_type_and_handler() -> None:
+    def fast(_ev: DomainEvent) -> None:
+        return None
+
+    def broken(_ev: DomainEvent) -> None:
+        raise RuntimeError("boom")
+
+    bus = MessageBus()
+    bus.subscribe(DomainEvent, fast)
+    bus.subscribe(StockAllocated, broken)
+    for _ in range(3):
+        bus.publish(_evt())
+    bus.publish(OrderPlaced(order_id=OrderId.new(), total=Money.from_major("1.00", "USD")))
+
+    rows = {(row.event_type, row.handler.rsplit(".", 1)[-1]): row for row in bus.latency_stats()}
+
+    # 失敗した呼び出しも計測する。基底クラスへの購読は具象型ごとに分かれる
+    assert {key: row.count for key, row in rows.items()} == {
+        ("StockAllocated", "fast"): 3,
+        ("StockAllocated", "broken"): 3,
+        ("OrderPlaced", "fast"): 1,
+    }
+    for row in rows.values():
+        assert 0 < row.p50_ns <= row.p99_ns <= row.max_ns <= row.total_ns
+
+    bus.reset_latency()
+    assert bus.latency_stats() == []
+
+
+def test_latency_stats_cover_batch_and_queued_handlers() -> None:
+    batches: list[int] = []
+    bus = MessageBus()
+    bus.subscribe_batch(StockAllocated, lambda evs: batches.append(len(evs)), max_batch=2)
+    bus.publish_many([_evt(), _evt(), _evt()])
+
+    queued = QueuedMessageBus()
+    queued.subscribe(StockAllocated, lambda _ev: None)
+    queued.publish(_evt())
+    queued.publish(_evt())
+    assert queued.close(timeout=5)
+
+    # バッチハンドラは1回の呼び出しで1件
+    assert batches == [2, 1]
+    assert [row.count for row in bus.latency_stats()] == [2]
+    assert [row.count for row in queued.latency_stats()] == [2]
+
+
+def test_publish_many_with_key_skips_events_behind_a_failure() -> None:
+    seen: list[str] = []
+
+    def handler(ev: StockAllocated) -> None:
+        if ev.location == "A1":
+            raise RuntimeError("boom")
+        seen.append(ev.location)
+
+    bus = MessageBus()
+    bus.subscribe(StockAllocated, handler)
+    events = [_evt("A1"), _evt("B1"), _evt("A2")]
+    keys = {id(events[0]): "A", id(events[1]): "B", id(events[2]): "A"}
+
+    results = bus.publish_many(events, key=lambda ev: keys[id(ev)])
+
+    assert seen == ["B1"]
+    assert [(r.ok, r.skipped) for r in results] == [(False, False), (True, False), (False, True)]
+
+
+def test_commit_succeeds_when_queued_bus_is_full_or_closed() -> None:
+    started = threading.Event()
+    gate = threading.Event()
+
+    def slow(_ev: StockAllocated) -> None:
+        started.set()
+        gate.wait()
+
+    bus = QueuedMessageBus(maxsize=1, backpressure="raise")
+    bus.subscribe(StockAllocated, slow)
+    bus.publish(_evt("busy"))
+    assert started.wait(timeout=5)  # ワーカーは "busy" で止まり、キューは空(容量 1)
+
+    uow = InMemoryUnitOfWork()
+    uow.message_bus = bus
+    with uow:
+        uow.events.publish(_evt("A"))
+        uow.events.publish(_evt("B"))
+        uow.commit()
+
+    # データは確定済みなので commit は失敗させない。積めなかった B はハンドラの失敗として記録される
+    assert uow.committed
+    assert [ev.location for ev in uow.event_sink.events] == ["A", "B"]
+    assert [(type(exc), ev.location) for ev, exc in bus.errors] == [(MessageBusOverloadedError, "B")]
+    assert bus.failure_stats[handler_name(slow)].count == 1
+
+    gate.set()
+    assert bus.close(timeout=5)
+    with uow:
+        uow.events.publish(_evt("C"))
+        uow.commit()
+    assert uow.committed
+    assert type(bus.errors[-1][1]) is MessageBusClosedError
@@ -80,3 +80,27 @@ def test_place_order_rejects_item_quantity_zero() -> None:
 
     with pytest.raises(ValidationError):
         uc.execute(cmd)
+
+
+def test_place_order_loads_products_in_one_batch() -> None:
+    uow = InMemoryUnitOfWork()
+    uow.products.add(Product(sku=Sku("ABC-1"), name="Widget", unit_price=Money.from_major(1, "USD")))
+    uow.products.add(Product(sku=Sku("ABC-2"), name="Gadget", unit_price=Money.from_major(2, "USD")))
+    calls: list[set[Sku]] = []
+    get_many = uow.products.get_many_by_sku
+
+    def spy(skus):  # type: ignore[no-untyped-def]
+        calls.append(set(skus))
+        return get_many(calls[-1])
+
+    def fail(sku):  # type: ignore[no-untyped-def]
+        raise AssertionError("per-item lookup must not be used")
+
+    uow.products.get_many_by_sku = spy
+    uow.products.get_by_sku = fail
+
+    items = [NewOrderItem(Sku("ABC-1"), 1), NewOrderItem(Sku("ABC-2"), 2), NewOrderItem(Sku("ABC-1"), 3)]
+    res = PlaceOrderUseCase(uow=uow, id_gen=InMemoryIdGenerator()).execute(PlaceOrderCommand(items=items))
+
+    assert calls == [{Sku("ABC-1"), Sku("ABC-2")}]
+    assert str(res.total) == "USD 8.00"
@@ -116,3 +116,85 @@ def test_inventory_allocate_invalid_out_of_stock() -> None:
     inv = make_inventory({Sku("SKU0"): 10})
     with pytest.raises(OutOfStockError, match="requested 15 of SKU0 exceeds availability 10"):
         inv.allocate(Sku("SKU0"), 15)
+
+
+def test_inventory_allocate_many_merges_duplicate_skus() -> None:
+    inv = make_inventory({Sku("SKU0"): 10, Sku("SKU1"): 3})
+    inv.allocate_many([(Sku("SKU0"), 4), (Sku("SKU1"), 3), (Sku("SKU0"), 6)])
+    assert inv.available(Sku("SKU0")) == 0
+    assert inv.available(Sku("SKU1")) == 0
+
+
+def test_inventory_allocate_many_reports_all_shortfalls_and_changes_nothing() -> None:
+    inv = make_inventory({Sku("SKU0"): 10, Sku("SKU1"): 3, Sku("SKU2"): 5})
+    with pytest.raises(OutOfStockError, match="insufficient stock for SKU0") as excinfo:
+        inv.allocate_many([(Sku("SKU0"), 6), (Sku("SKU2"), 1), (Sku("SKU0"), 6), (Sku("SKU1"), 4), (Sku("SKU9"), 1)])
+    assert [(s.sku, s.requested, s.available) for s in excinfo.value.shortfalls] == [
+        (Sku("SKU0"), 12, 10),
+        (Sku("SKU1"), 4, 3),
+        (Sku("SKU9"), 1, 0),
+    ]
+    assert inv.available(Sku("SKU0")) == 10
+    assert inv.available(Sku("SKU2")) == 5
+    assert inv.version == 0
+
+
+def test_inventory_allocate_many_rejects_non_positive_quantity() -> None:
+    inv = make_inventory({Sku("SKU0"): 10})
+    with pytest.raises(NegativeQuantityError, match="requested quantity must be positive"):
+        inv.allocate_many([(Sku("SKU0"), 1), (Sku("SKU0"), 0)])
+    assert inv.available(Sku("SKU0")) == 10
+
+
+def test_inventory_rollback_changes_restores_touched_skus() -> None:
+    inv = make_inventory({Sku("SKU0"): 10, Sku("SKU1"): 3})
+    inv.begin_changes()
+    inv.allocate(Sku("SKU0"), 4)
+    inv.allocate(Sku("SKU0"), 1)
+    inv.add(Sku("SKU2"), 7)
+    assert inv.version == 3
+
+    inv.rollback_changes()
+
+    assert inv.available(Sku("SKU0")) == 10
+    assert inv.available(Sku("SKU1")) == 3
+    assert Sku("SKU2") not in inv._on_hand
+    assert inv.version == 0
+
+
+def test_inventory_discard_changes_keeps_quantities() -> None:
+    inv = make_inventory({Sku("SKU0"): 10})
+    inv.begin_changes()
+    inv.remove(Sku("SKU0"), 4)
+    inv.discard_changes()
+    inv.rollback_changes()  # 記録が無ければ何もしない
+
+    assert inv.available(Sku("SKU0")) == 6
+
+
+def test_inventory_dirty_skus_track_changes_since_mark_clean() -> None:
+    inv = make_inventory({Sku("SKU0"): 10, Sku("SKU1"): 3})
+    before = inv.dirty_skus
+    assert before is None  # 永続化の基準がまだない
+
+    inv.mark_clean()
+    clean = inv.dirty_skus
+    assert clean == frozenset()
+    inv.allocate(Sku("SKU0"), 1)
+    inv.add(Sku("SKU2"), 5)
+    inv.discard(Sku("SKU1"))
+    inv.discard(Sku("SKU9"))  # 未登録は何もしない
+    assert inv.dirty_skus == frozenset({Sku("SKU0"), Sku("SKU1"), Sku("SKU2")})
+    assert inv.skus() == {Sku("SKU0"), Sku("SKU2")}
+
+    inv.mark_clean()
+    assert inv.dirty_skus == frozenset()
+
+
+def test_inventory_rollback_changes_restores_discarded_sku() -> None:
+    inv = make_inventory({Sku("SKU0"): 10})
+    inv.begin_changes()
+    inv.discard(Sku("SKU0"))
+    assert Sku("SKU0") not in inv.skus()
+    inv.rollback_changes()
+    assert inv.available(Sku("SKU0")) == 10
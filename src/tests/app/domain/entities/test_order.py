@@ -4,6 +4,7 @@ from hex_commerce_service.app.domain.entities import Order, OrderLine
 from hex_commerce_service.app.domain.errors import (
     CurrencyMismatchError,
     NegativeQuantityError,
+    OrderStateError,
     ValidationError,
 )
 from hex_commerce_service.app.domain.value_objects import Money
@@ -126,6 +127,37 @@ def test_order_total() -> None:
     assert order.total == Money.from_major(5000, "JPY")
 
 
+def test_order_total_is_maintained_across_add_and_remove() -> None:
+    order = make_order(lines=[make_orderline(quantity=1, unit_price=1000)])
+    order.add_line(make_orderline(sku="SKU124", quantity=2, unit_price=2000))
+    order.add_item(sku="SKU123", quantity=4, unit_price=Money.from_major(500, "JPY"))
+    assert order.total == Money.from_major(7000, "JPY")
+    assert order.quantity_of("SKU123") == 5
+    assert dict(order.quantities()) == {"SKU123": 5, "SKU124": 2}
+
+    order.remove_line_at(1)
+    assert order.total == Money.from_major(3000, "JPY")
+    assert order.quantity_of("SKU124") == 0
+    assert dict(order.quantities()) == {"SKU123": 5}
+
+    order.remove_line_at(0)
+    order.remove_line_at(0)
+    assert order.total == Money.from_major(0, "JPY")
+    assert dict(order.quantities()) == {}
+
+
+def test_order_rejects_initial_lines_in_other_currency() -> None:
+    with pytest.raises(CurrencyMismatchError, match="line currency must match order currency"):
+        make_order(lines=[make_orderline(currency="USD")])
+
+
+def test_order_consistency_check_detects_direct_line_mutation() -> None:
+    order = make_order(lines=[make_orderline()])
+    order.lines.append(make_orderline(quantity=2))
+    with pytest.raises(OrderStateError, match="aggregates out of sync"):
+        _ = order.total
+
+
 def test_order_iterate_skus() -> None:
     line1 = make_orderline(quantity=1, unit_price=1000)
     line2 = make_orderline(sku="SKU124", quantity=2, unit_price=2000)
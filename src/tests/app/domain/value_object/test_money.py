@@ -220,14 +220,6 @@ def test_coerce_decimal_invalid() -> None:
     assert "invalid decimal value" in str(excinfo.value)
 
 
-def test_new_method() -> None:
-    m = Money.from_major(1, "JPY")
-    m2 = m._new(Decimal("2.00"))
-    assert isinstance(m2, Money)
-    assert m2.amount == Decimal("2.00")
-    assert m2.currency == m.currency
-
-
 def test_ensure_same_currency_ok() -> None:
     m1 = Money.from_major(1, "JPY")
     m2 = Money.from_major(2, "JPY")
@@ -241,3 +233,43 @@ def test_ensure_same_currency_ng() -> None:
     with pytest.raises(ValueError) as excinfo:
         m1._ensure_same_currency(m2)
     assert "currency mismatch" in str(excinfo.value)
+
+
+def test_sum_uses_minor_units() -> None:
+    items = [Money.from_major("0.10", "USD"), Money.from_major("0.20", "USD"), Money.from_minor(5, "USD")]
+    result = Money.sum(items, "USD")
+    assert result == Money.from_major("0.35", "USD")
+    assert result.to_minor() == 35
+
+
+def test_sum_empty_is_zero() -> None:
+    assert Money.sum([], "JPY") == Money.from_major(0, "JPY")
+
+
+def test_sum_currency_mismatch() -> None:
+    with pytest.raises(ValueError, match="currency mismatch"):
+        Money.sum([Money.from_major(1, "USD"), Money.from_major(1, "EUR")], "USD")
+
+
+def test_currency_code_is_interned() -> None:
+    a = Money.from_major(1, "USD")
+    b = Money.from_major(2, "".join(["U", "S", "D"]))
+    assert a.currency is b.currency
+
+
+@pytest.mark.parametrize(
+    "money, factor, expected",
+    [
+        (Money.from_major("0.05", "USD"), Decimal("0.5"), Money.from_major("0.02", "USD")),  # 2.5 -> 2 (half even)
+        (Money.from_major("0.07", "USD"), Decimal("0.5"), Money.from_major("0.04", "USD")),  # 3.5 -> 4 (half even)
+    ],
+)
+def test_mul_decimal_rounds_half_even(money: Money, factor: Decimal, expected: Money) -> None:
+    assert money * factor == expected
+
+
+def test_amount_and_repr_keep_decimal_boundary() -> None:
+    m = Money.from_minor(1234, "USD")
+    assert m.amount == Decimal("12.34")
+    assert str(m.amount) == "12.34"
+    assert repr(m) == "Money(amount=Decimal('12.34'), currency='USD')"
@@ -1,6 +1,7 @@
 import pytest
 
 from hex_commerce_service.app.domain.value_objects import Sku
+from hex_commerce_service.app.domain.value_objects import sku as sku_module
 
 
 @pytest.mark.parametrize(
@@ -43,3 +44,31 @@ def test_invalid_sku(value: str) -> None:
     assert "invalid sku (use A-Z, 0-9, -, _, length 1..64; must start with alnum)" in str(
         excinfo.value
     )
+
+
+def test_of_returns_canonical_instance_for_equivalent_inputs() -> None:
+    a = Sku.of("intern-1")
+    assert a.value == "INTERN-1"
+    assert Sku.of("intern-1") is a
+    assert Sku.of("  INTERN-1 ") is a
+    assert Sku.of("INTERN-1") is a
+    assert a == Sku("intern-1")
+    assert hash(a) == hash(Sku("INTERN-1"))
+
+
+def test_of_validates_like_constructor() -> None:
+    with pytest.raises(ValueError, match="invalid sku"):
+        Sku.of("-bad")
+
+
+def test_of_intern_table_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sku_module, "_INTERNED", {})
+    monkeypatch.setattr(sku_module, "_INTERN_MAX", 4)
+    first = Sku.of("B-0")
+    for i in range(1, 10):
+        Sku.of(f"B-{i}")
+    assert len(sku_module._INTERNED) <= 4  # noqa: SLF001
+    # 追い出された値は新しいインスタンスになるが、同値として扱われる
+    again = Sku.of("B-0")
+    assert again == first
+    assert {first: 1}[again] == 1
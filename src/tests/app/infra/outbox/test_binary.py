@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import pytest
+
+from hex_commerce_service.app.infra.outbox.binary import packb, unpackb
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        False,
+        0,
+        127,
+        128,
+        -1,
+        -32,
+        -33,
+        -129,
+        2**16,
+        2**40,
+        -(2**40),
+        2**64 - 1,
+        -(2**63),
+        1.5,
+        "",
+        "注文",
+        "x" * 40,
+        "x" * 300,
+        "x" * 70_000,
+        b"\x00\x01",
+        b"b" * 300,
+        [1, "a", None, [2, {"k": 3}]],
+        list(range(20)),
+        {str(i): i for i in range(20)},
+    ],
+)
+def test_round_trip(value: object) -> None:
+    assert unpackb(packb(value)) == value
+
+
+def test_matches_msgpack_spec_encoding() -> None:
+    # {"a": 1, "b": [true, null]} の msgpack 表現
+    assert packb({"a": 1, "b": [True, None]}) == bytes.fromhex("82a16101a16292c3c0")
+
+
+def test_tuple_packs_as_array() -> None:
+    assert unpackb(packb((1, 2))) == [1, 2]
+
+
+def test_rejects_unsupported_type_and_trailing_bytes() -> None:
+    with pytest.raises(TypeError, match="cannot pack"):
+        packb(object())
+    with pytest.raises(ValueError, match="trailing data"):
+        unpackb(packb(1) + b"\x00")
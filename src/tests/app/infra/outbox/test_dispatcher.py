@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from hex_commerce_service.app.application.message_bus import MessageBus
+from hex_commerce_service.app.application.messages.events import StockAllocated
+from hex_commerce_service.app.domain.value_objects import OrderId
+from hex_commerce_service.app.infra.outbox.dispatcher import OutboxDispatcher, lane_for
+from hex_commerce_service.app.infra.outbox.serializer import serialize_event
+from hex_commerce_service.app.infra.outbox.wakeup import LocalWakeup
+
+
+def _messages(order_ids: list[OrderId], per_order: int) -> list[Any]:
+    # claim_batch と同じく id 昇順。各注文のイベントが交互に並ぶ
+    msgs: list[Any] = []
+    for seq in range(per_order):
+        for oid in order_ids:
+            evt = StockAllocated(order_id=oid, location=f"L{seq}")
+            msgs.append(SimpleNamespace(id=len(msgs) + 1, aggregate_id=str(oid), payload=serialize_event(evt), body=None))
+    return msgs
+
+
+def test_lane_for_is_stable_per_aggregate() -> None:
+    assert lane_for("order-1", 1, 8) == lane_for("order-1", 99, 8)
+    assert {lane_for(None, i, 4) for i in range(8)} == {0, 1, 2, 3}
+
+
+def test_lanes_keep_per_aggregate_order_and_deliver_in_parallel() -> None:
+    order_ids = [OrderId.new() for _ in range(8)]
+    seen: dict[str, list[str]] = {}
+
+    async def deliver(evt: object) -> None:
+        assert isinstance(evt, StockAllocated)
+        await asyncio.sleep(0.01)  # I/O 待ちを模擬
+        seen.setdefault(str(evt.order_id), []).append(evt.location)
+
+    dispatcher = OutboxDispatcher(sessionmaker=None, owner="t", bus=MessageBus(), lanes=8, deliver=deliver)
+    msgs = _messages(order_ids, per_order=3)
+
+    t0 = time.perf_counter()
+    sent, failed, held = asyncio.run(dispatcher._deliver_batch(msgs))  # noqa: SLF001
+    elapsed = time.perf_counter() - t0
+
+    assert sorted(sent) == [m.id for m in msgs]
+    assert failed == []
+    assert held == []
+    assert all(locs == ["L0", "L1", "L2"] for locs in seen.values())
+    # 24 件 x 10ms を直列なら 240ms。レーンが並行に動いていれば大幅に短い
+    assert elapsed < 0.2
+
+
+@pytest.mark.parametrize("lanes", [1, 4])
+def test_failed_delivery_holds_back_later_messages_of_the_same_aggregate(lanes: int) -> None:
+    order_ids = [OrderId.new() for _ in range(2)]
+    poison = str(order_ids[0])
+    seen: list[str] = []
+
+    async def deliver(evt: object) -> None:
+        assert isinstance(evt, StockAllocated)
+        await asyncio.sleep(0)
+        if str(evt.order_id) == poison and evt.location == "L0":
+            raise RuntimeError("downstream unavailable")
+        seen.append(f"{evt.order_id}:{evt.location}")
+
+    dispatcher = OutboxDispatcher(sessionmaker=None, owner="t", bus=MessageBus(), lanes=lanes, deliver=deliver)
+    msgs = _messages(order_ids, per_order=3)
+    poisoned = [m.id for m in msgs if m.aggregate_id == poison]
+
+    sent, failed, held = asyncio.run(dispatcher._deliver_batch(msgs))  # noqa: SLF001
+
+    # L0 の失敗後、同じ注文の L1 / L2 は配送せずに保留(リース解放のみ)。他の注文は影響を受けない
+    assert sorted(sent) == [m.id for m in msgs if m.aggregate_id != poison]
+    assert failed == [(poisoned[0], "downstream unavailable")]
+    assert sorted(held) == poisoned[1:]
+    assert not any(s.startswith(poison) for s in seen)
+
+
+def test_bus_receives_claimed_batch_in_one_batch_call() -> None:
+    order_ids = [OrderId.new() for _ in range(3)]
+    poison = str(order_ids[0])
+    batches: list[int] = []
+
+    def project(evs: list[StockAllocated]) -> None:
+        batches.append(len(evs))
+
+    def notify(ev: StockAllocated) -> None:
+        if str(ev.order_id) == poison:
+            raise RuntimeError("mail down")
+
+    bus = MessageBus()
+    bus.subscribe_batch(StockAllocated, project)
+    bus.subscribe(StockAllocated, notify)
+    dispatcher = OutboxDispatcher(sessionmaker=None, owner="t", bus=bus, lanes=4)
+    msgs = _messages(order_ids, per_order=2)
+    poisoned = [m.id for m in msgs if m.aggregate_id == poison]
+
+    sent, failed, held = asyncio.run(dispatcher._deliver_batch(msgs))  # noqa: SLF001
+
+    # 失敗した注文の後続はどのハンドラにも渡さない
+    assert batches == [5]
+    assert sent == [m.id for m in msgs if m.aggregate_id != poison]
+    assert failed == [(poisoned[0], "mail down")]
+    assert held == poisoned[1:]
+
+
+def test_bus_holds_back_same_aggregate_after_failed_batch_chunk() -> None:
+    order_ids = [OrderId.new() for _ in range(2)]
+    poison = str(order_ids[0])
+    chunks: list[list[str]] = []
+
+    def project(evs: list[StockAllocated]) -> None:
+        chunks.append([ev.location for ev in evs])
+        if any(str(ev.order_id) == poison for ev in evs):
+            raise RuntimeError("db down")
+
+    bus = MessageBus()
+    bus.subscribe_batch(StockAllocated, project, max_batch=1)
+    dispatcher = OutboxDispatcher(sessionmaker=None, owner="t", bus=bus)
+    msgs = _messages(order_ids, per_order=2)
+
+    sent, failed, held = asyncio.run(dispatcher._deliver_batch(msgs))  # noqa: SLF001
+
+    # 1つ目のチャンク(poison の L0)が失敗したので、poison の L1 のチャンクは呼ばない
+    assert chunks == [["L0"], ["L0"], ["L1"]]
+    assert failed == [(1, "db down")]
+    assert sent == [2, 4]
+    assert held == [3]
+
+
+class _PipelineDispatcher(OutboxDispatcher):
+    # DB の代わりにリストからクレームし、確定した id を順に記録する
+    def __init__(self, pending: list[Any], **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.pending = pending
+        self.acked: list[tuple[str, int]] = []
+        self.drained = asyncio.Event()
+
+    async def _claim(self, limit: int) -> list[Any]:
+        taken, self.pending[:] = self.pending[:limit], self.pending[limit:]
+        if not self.pending:
+            self.drained.set()
+        return taken
+
+    async def _commit_acks(self, sent: list[int], failed: list[tuple[int, str]], held: list[int]) -> None:
+        self.acked.extend(("sent", i) for i in sent)
+        self.acked.extend(("failed", i) for i, _ in failed)
+        self.acked.extend(("held", i) for i in held)
+
+
+def _run_pipeline(dispatcher: _PipelineDispatcher) -> None:
+    async def scenario() -> None:
+        stop = asyncio.Event()
+        task = asyncio.create_task(dispatcher.run_forever(stop_event=stop))
+        await dispatcher.drained.wait()
+        stop.set()
+        # 停止要求の後も、流し込んだ分を配送・確定してから戻る
+        await asyncio.wait_for(task, timeout=2)
+
+    asyncio.run(scenario())
+
+
+def test_slow_lane_does_not_stall_other_lanes() -> None:
+    slow = OrderId.new()
+    evt = StockAllocated(order_id=slow, location="L0")
+    msgs: list[Any] = [SimpleNamespace(id=1, aggregate_id=str(slow), payload=serialize_event(evt), body=None)]
+    slow_lane = lane_for(str(slow), 1, 4)
+    while len(msgs) < 40:
+        oid = OrderId.new()
+        if lane_for(str(oid), 0, 4) != slow_lane:
+            evt = StockAllocated(order_id=oid, location="L0")
+            msgs.append(SimpleNamespace(id=len(msgs) + 1, aggregate_id=str(oid), payload=serialize_event(evt), body=None))
+
+    async def deliver(evt: object) -> None:
+        assert isinstance(evt, StockAllocated)
+        await asyncio.sleep(0.3 if evt.order_id == slow else 0.001)
+
+    dispatcher = _PipelineDispatcher(
+        msgs.copy(), sessionmaker=None, owner="t", bus=MessageBus(), lanes=4, batch_size=8, deliver=deliver, wakeup=LocalWakeup()
+    )
+    _run_pipeline(dispatcher)
+
+    # バッチごとに全レーンを待つ方式なら、遅いメッセージより先に確定できるのは最初のバッチの 7 件まで
+    assert sorted(i for _, i in dispatcher.acked) == [m.id for m in msgs]
+    assert dispatcher.acked[-1] == ("sent", 1)
+
+
+def test_pipeline_holds_back_later_messages_of_a_failed_aggregate() -> None:
+    order_ids = [OrderId.new() for _ in range(2)]
+    poison = str(order_ids[0])
+
+    async def deliver(evt: object) -> None:
+        assert isinstance(evt, StockAllocated)
+        await asyncio.sleep(0)
+        if str(evt.order_id) == poison and evt.location == "L0":
+            raise RuntimeError("downstream unavailable")
+
+    msgs = _messages(order_ids, per_order=3)
+    poisoned = [m.id for m in msgs if m.aggregate_id == poison]
+    dispatcher = _PipelineDispatcher(msgs.copy(), sessionmaker=None, owner="t", bus=MessageBus(), lanes=4, deliver=deliver)
+    _run_pipeline(dispatcher)
+
+    assert sorted(i for kind, i in dispatcher.acked if kind == "sent") == [m.id for m in msgs if m.aggregate_id != poison]
+    assert [i for kind, i in dispatcher.acked if kind == "failed"] == poisoned[:1]
+    assert sorted(i for kind, i in dispatcher.acked if kind == "held") == poisoned[1:]
+
+
+class _ListDispatcher(OutboxDispatcher):
+    # DB の代わりにリストからクレームし、enqueue からの遅延を記録する
+    def __init__(self, pending: list[float], latencies: list[float], **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.pending = pending
+        self.latencies = latencies
+
+    async def run_once(self) -> int:
+        n = len(self.pending)
+        now = time.perf_counter()
+        self.latencies.extend(now - t for t in self.pending)
+        self.pending.clear()
+        return n
+
+
+def test_wakeup_delivers_without_waiting_for_fallback_poll() -> None:
+    async def scenario() -> list[float]:
+        wakeup = LocalWakeup()
+        pending: list[float] = []
+        latencies: list[float] = []
+        dispatcher = _ListDispatcher(
+            pending, latencies, sessionmaker=None, owner="t", bus=MessageBus(), wakeup=wakeup, idle_poll_seconds=30
+        )
+        stop = asyncio.Event()
+        task = asyncio.create_task(dispatcher.run_forever(stop_event=stop))
+        for _ in range(5):
+            await asyncio.sleep(0.02)  # Dispatcher は空振りして待機中
+            pending.append(time.perf_counter())
+            wakeup.notify()
+        await asyncio.sleep(0.02)
+        stop.set()
+        # 停止要求でフォールバック待機(30s)からも抜ける
+        await asyncio.wait_for(task, timeout=1)
+        return latencies
+
+    latencies = asyncio.run(scenario())
+
+    assert len(latencies) == 5
+    assert max(latencies) < 0.05
+
+
+def test_local_wakeup_keeps_notification_sent_before_wait() -> None:
+    async def scenario() -> None:
+        wakeup = LocalWakeup()
+        wakeup.notify()
+        await asyncio.wait_for(wakeup.wait(), timeout=0.1)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(wakeup.wait(), timeout=0.01)
+
+    asyncio.run(scenario())
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from hex_commerce_service.app.application.messages.events import OrderPlaced, StockAllocated
+from hex_commerce_service.app.domain.value_objects import Money, OrderId
+from hex_commerce_service.app.infra.outbox.serializer import deserialize_event, serialize_event
+
+
+def test_round_trip_keeps_payload_and_occurred_at() -> None:
+    placed = OrderPlaced(order_id=OrderId.new(), total=Money.from_major("12.50", "USD"))
+    allocated = StockAllocated(order_id=placed.order_id, location="WH-1")
+
+    for evt in (placed, allocated):
+        got = deserialize_event(serialize_event(evt))
+        assert got == evt
+        assert got.occurred_at == evt.occurred_at
+
+
+def test_deserialize_restores_original_timestamp() -> None:
+    env = serialize_event(StockAllocated(order_id=OrderId.new(), location="WH-1"))
+    env["occurred_at"] = "2024-01-02T03:04:05+00:00"
+
+    got = deserialize_event(env)
+
+    assert got.occurred_at == datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
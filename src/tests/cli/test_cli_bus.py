@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import TYPE_CHECKING, ClassVar
+
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from hex_commerce_service.app.adapters.inbound.cli import bus as bus_cmd
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+runner = CliRunner()
+
+_ROW = {
+    "event_type": "OrderPlaced",
+    "handler": "app.notify",
+    "count": 3,
+    "p50_ns": 1_500,
+    "p99_ns": 9_000,
+    "max_ns": 12_000,
+    "total_ns": 20_000,
+}
+
+
+class _StatsHandler(BaseHTTPRequestHandler):
+    # 起動中の API の GET /bus/stats の代わり
+    requests: ClassVar[list[tuple[str, str | None]]] = []
+
+    def do_GET(self) -> None:
+        self.requests.append((self.path, self.headers.get("Authorization")))
+        body = json.dumps([_ROW]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002, PLR6301
+        # テスト出力にアクセスログを出さない
+        del format, args
+
+
+@pytest.fixture
+def api_url() -> Iterator[str]:
+    server = HTTPServer(("127.0.0.1", 0), _StatsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _cli(*, json_output: bool) -> typer.Typer:
+    app = typer.Typer()
+    app.add_typer(bus_cmd.app, name="bus")
+
+    @app.callback()
+    def main(ctx: typer.Context) -> None:
+        ctx.obj = {"json": json_output}
+
+    return app
+
+
+def test_bus_stats_reads_running_api(api_url: str) -> None:
+    r = runner.invoke(_cli(json_output=True), ["bus", "stats", "--url", api_url, "--token", "t0k", "--limit", "5"])
+
+    assert r.exit_code == 0, r.output
+    assert json.loads(r.output) == [_ROW]
+    assert _StatsHandler.requests[-1] == ("/bus/stats?limit=5", "Bearer t0k")
+
+    r = runner.invoke(_cli(json_output=False), ["bus", "stats", "--url", api_url, "--token", "t0k"])
+    assert r.exit_code == 0, r.output
+    assert "app.notify" in r.output
+    assert "9.0" in r.output
+
+
+def test_bus_stats_reports_unreachable_api() -> None:
+    r = runner.invoke(_cli(json_output=False), ["bus", "stats", "--url", "http://127.0.0.1:9", "--token", "t"])
+
+    assert r.exit_code == 1
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from hex_commerce_service.app.adapters.inbound.cli import outbox as outbox_cmd
+from hex_commerce_service.app.infra.outbox.retention import RetentionReport
+
+runner = CliRunner()
+
+
+def _cli(*, json_output: bool) -> typer.Typer:
+    app = typer.Typer()
+    app.add_typer(outbox_cmd.app, name="outbox")
+
+    @app.callback()
+    def main(ctx: typer.Context) -> None:
+        ctx.obj = {"json": json_output}
+
+    return app
+
+
+@pytest.mark.parametrize(
+    ("args", "keep_archive_days"),
+    [([], 90.0), (["--keep-archive-days", "30"], 30.0), (["--no-prune"], None)],
+)
+def test_retention_passes_archive_window(monkeypatch: pytest.MonkeyPatch, args: list[str], keep_archive_days: float | None) -> None:
+    # DB の代わりに保持処理の引数だけを記録する
+    calls: list[tuple[float, float | None, int]] = []
+
+    async def fake(keep_sent_days: float, keep_archive: float | None, chunk_size: int) -> RetentionReport:  # noqa: RUF029
+        calls.append((keep_sent_days, keep_archive, chunk_size))
+        return RetentionReport(archived_rows=2)
+
+    monkeypatch.setattr(outbox_cmd, "_retention", fake)
+
+    r = runner.invoke(_cli(json_output=True), ["outbox", "retention", *args])
+
+    assert r.exit_code == 0, r.output
+    assert calls == [(7.0, keep_archive_days, 5_000)]
+    assert json.loads(r.output)["archived_rows"] == 2
@@ -0,0 +1,6 @@
+from hex_commerce_service.app.domain.entities import Order
+
+
+def pytest_configure() -> None:
+    # テスト中は Order の集計キャッシュを毎回全件再計算と突き合わせる
+    Order.consistency_checks = True
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from hex_commerce_service.app.adapters.inmemory.system import InMemoryIdGenerator
+from hex_commerce_service.app.adapters.outbound.sqlalchemy_repositories import SqlAlchemyProductRepository
+from hex_commerce_service.app.adapters.outbound.sqlalchemy_uow import AsyncSqlAlchemyUnitOfWork
+from hex_commerce_service.app.application.messages.events import OrderPlaced
+from hex_commerce_service.app.application.use_cases import (
+    AllocateStockCommand,
+    AsyncAllocateStockUseCase,
+    AsyncPlaceOrderUseCase,
+    NewOrderItem,
+    PlaceOrderCommand,
+)
+from hex_commerce_service.app.domain.entities import Order, OrderLine, Product
+from hex_commerce_service.app.domain.errors import ValidationError
+from hex_commerce_service.app.domain.value_objects import Money, OrderId, Sku
+from hex_commerce_service.app.infra.db.models import OrderModel
+from hex_commerce_service.app.infra.db.outbox_models import OutboxMessageModel
+from hex_commerce_service.app.infra.outbox.repository import OutboxStore
+
+if os.getenv("GITHUB_ACTIONS") == "true":
+    pytest.skip("Skip DB migration test on GitHub Actions CI", allow_module_level=True)
+
+pytestmark = pytest.mark.asyncio
+
+DB_URL = os.getenv("DATABASE_URL")
+
+
+@pytest.fixture(scope="module")
+def require_db() -> None:
+    if not DB_URL:
+        pytest.skip("DATABASE_URL not set; skip DB integration tests")
+
+
+@pytest_asyncio.fixture()
+async def sm(require_db: None) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    assert DB_URL is not None, "DATABASE_URL must be set"
+    engine = create_async_engine(DB_URL)
+    maker: async_sessionmaker[AsyncSession] = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with maker() as s:
+        await s.execute(
+            text(
+                "TRUNCATE TABLE outbox_messages, order_lines, orders, inventory_items, inventory_locations, products RESTART IDENTITY CASCADE"
+            )
+        )
+        await SqlAlchemyProductRepository(s).add(Product(sku=Sku("ABC-1"), name="W", unit_price=Money.from_major(10, "USD")))
+        await s.commit()
+    yield maker
+    await engine.dispose()
+
+
+async def _count(maker: async_sessionmaker[AsyncSession], model: type[object]) -> int:
+    async with maker() as s:
+        return int((await s.execute(select(func.count()).select_from(model))).scalar_one())
+
+
+async def test_place_order_commits_order_and_outbox_together(sm: async_sessionmaker[AsyncSession]) -> None:
+    uc = AsyncPlaceOrderUseCase(uow=AsyncSqlAlchemyUnitOfWork(sessionmaker=sm), id_gen=InMemoryIdGenerator())
+    res = await uc.execute(PlaceOrderCommand(items=[NewOrderItem(sku=Sku("ABC-1"), quantity=2)]))
+
+    async with sm() as s:
+        assert await s.get(OrderModel, res.order_id) is not None
+        msgs = (await s.execute(select(OutboxMessageModel))).scalars().all()
+    assert [(m.event_type, m.aggregate_id, m.state) for m in msgs] == [("OrderPlaced", res.order_id, "pending")]
+
+
+async def test_exception_inside_uow_persists_nothing(sm: async_sessionmaker[AsyncSession]) -> None:
+    uow = AsyncSqlAlchemyUnitOfWork(sessionmaker=sm)
+    order = Order(id=OrderId.new(), currency="USD")
+    order.add_line(OrderLine(sku=Sku("ABC-1"), quantity=1, unit_price=Money.from_major(10, "USD")))
+
+    with pytest.raises(RuntimeError, match="boom"):
+        async with uow:
+            await uow.orders.add(order)
+            uow.events.publish(OrderPlaced(order_id=order.id, total=order.total))
+            raise RuntimeError("boom")
+
+    assert not uow.committed
+    assert await _count(sm, OrderModel) == 0
+    assert await _count(sm, OutboxMessageModel) == 0
+
+
+async def test_enqueue_many_skips_duplicates_without_aborting_transaction(sm: async_sessionmaker[AsyncSession]) -> None:
+    order = Order(id=OrderId.new(), currency="USD")
+    order.add_line(OrderLine(sku=Sku("ABC-1"), quantity=1, unit_price=Money.from_major(10, "USD")))
+    placed = OrderPlaced(order_id=order.id, total=order.total)
+    other = OrderPlaced(order_id=OrderId.new(), total=order.total)
+
+    async with sm() as s:
+        store = OutboxStore(s)
+        assert await store.enqueue_many([placed, placed]) == [placed]
+        # 既存と重複する行は捨てられ、同じトランザクションの他の書き込みは残る
+        assert await store.enqueue_many([placed, other]) == [other]
+        assert await store.enqueue(placed) is False
+        await s.commit()
+
+    uow = AsyncSqlAlchemyUnitOfWork(sessionmaker=sm)
+    async with uow:
+        await uow.orders.add(order)
+        uow.events.publish(placed)
+        await uow.commit()
+
+    assert await _count(sm, OrderModel) == 1
+    assert await _count(sm, OutboxMessageModel) == 2
+
+
+async def test_allocate_stock_rejects_unknown_location(sm: async_sessionmaker[AsyncSession]) -> None:
+    placed = await AsyncPlaceOrderUseCase(uow=AsyncSqlAlchemyUnitOfWork(sessionmaker=sm), id_gen=InMemoryIdGenerator()).execute(
+        PlaceOrderCommand(items=[NewOrderItem(sku=Sku("ABC-1"), quantity=1)])
+    )
+
+    # 同期版と同じく、不足ではなく ValidationError として扱う
+    uc = AsyncAllocateStockUseCase(uow=AsyncSqlAlchemyUnitOfWork(sessionmaker=sm))
+    with pytest.raises(ValidationError, match="inventory not found: nowhere"):
+        await uc.execute(AllocateStockCommand(order_id=OrderId.parse(placed.order_id), location="nowhere"))
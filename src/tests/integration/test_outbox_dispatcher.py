@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from hex_commerce_service.app.application.message_bus import MessageBus
+from hex_commerce_service.app.application.messages.events import OrderPlaced
+from hex_commerce_service.app.domain.value_objects import Money, OrderId
+from hex_commerce_service.app.infra.db.outbox_models import OutboxMessageModel
+from hex_commerce_service.app.infra.outbox.dispatcher import OutboxDispatcher
+from hex_commerce_service.app.infra.outbox.repository import OutboxStore
+from hex_commerce_service.app.infra.outbox.wakeup import PgListenWakeup
+
+if os.getenv("GITHUB_ACTIONS") == "true":
+    pytest.skip("Skip DB migration test on GitHub Actions CI", allow_module_level=True)
+
+pytestmark = pytest.mark.asyncio
+
+DB_URL = os.getenv("DATABASE_URL")
+
+
+@pytest.fixture(scope="module")
+def require_db() -> None:
+    if not DB_URL:
+        pytest.skip("DATABASE_URL not set; skip DB integration tests")
+
+
+@pytest_asyncio.fixture()
+async def sm(require_db: None) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    assert DB_URL is not None, "DATABASE_URL must be set"
+    engine = create_async_engine(DB_URL)
+    maker: async_sessionmaker[AsyncSession] = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with maker() as s:
+        await s.execute(text("TRUNCATE TABLE outbox_messages RESTART IDENTITY"))
+        await s.commit()
+    yield maker
+    await engine.dispose()
+
+
+async def test_run_once_acknowledges_sent_and_failed_in_bulk(sm: async_sessionmaker[AsyncSession]) -> None:
+    events = [OrderPlaced(order_id=OrderId.new(), total=Money.from_major(1, "USD")) for _ in range(4)]
+    poison = events[1].order_id
+    async with sm() as s:
+        await OutboxStore(s).enqueue_many(events)
+        await s.commit()
+
+    def handler(evt: OrderPlaced) -> None:
+        if evt.order_id == poison:
+            raise RuntimeError("downstream unavailable")
+
+    bus = MessageBus()
+    bus.subscribe(OrderPlaced, handler)
+    dispatcher = OutboxDispatcher(sessionmaker=sm, owner="w1", bus=bus)
+
+    assert await dispatcher.run_once() == 4
+    assert len(dispatcher.delivered) == 3
+
+    async with sm() as s:
+        rows = {m.aggregate_id: m for m in (await s.execute(select(OutboxMessageModel))).scalars()}
+        now = (await s.execute(text("SELECT now()"))).scalar_one()
+    failed = rows.pop(str(poison))
+    assert (failed.state, failed.attempt_count, failed.last_error, failed.lock_owner) == ("pending", 1, "downstream unavailable", None)
+    assert failed.available_at > now
+    assert {(m.state, m.lock_owner) for m in rows.values()} == {("sent", None)}
+    assert all(m.dispatched_at is not None for m in rows.values())
+
+
+async def test_message_moves_to_dead_after_max_attempts_and_can_be_requeued(sm: async_sessionmaker[AsyncSession]) -> None:
+    evt = OrderPlaced(order_id=OrderId.new(), total=Money.from_major(1, "USD"))
+    async with sm() as s:
+        await OutboxStore(s).enqueue_many([evt])
+        await s.commit()
+
+    def handler(_evt: OrderPlaced) -> None:
+        raise RuntimeError("boom")
+
+    bus = MessageBus()
+    bus.subscribe(OrderPlaced, handler)
+    dispatcher = OutboxDispatcher(sessionmaker=sm, owner="w1", bus=bus, max_attempts=2)
+
+    assert await dispatcher.run_once() == 1
+    async with sm() as s:
+        await s.execute(text("UPDATE outbox_messages SET available_at = now()"))
+        await s.commit()
+    assert await dispatcher.run_once() == 1
+    # dead になったメッセージはもうクレームされない
+    async with sm() as s:
+        await s.execute(text("UPDATE outbox_messages SET available_at = now()"))
+        await s.commit()
+    assert await dispatcher.run_once() == 0
+
+    async with sm() as s:
+        store = OutboxStore(s)
+        dead = await store.list_dead()
+        assert [(m.state, m.attempt_count, m.last_error) for m in dead] == [("dead", 2, "boom")]
+        assert await store.requeue_dead(ids=[dead[0].id]) == 1
+        await s.commit()
+
+    async with sm() as s:
+        row = (await s.execute(select(OutboxMessageModel))).scalar_one()
+        assert (row.state, row.attempt_count) == ("pending", 0)
+
+
+async def test_purge_dead_deletes_only_dead_letters(sm: async_sessionmaker[AsyncSession]) -> None:
+    events = [OrderPlaced(order_id=OrderId.new(), total=Money.from_major(1, "USD")) for _ in range(3)]
+    async with sm() as s:
+        await OutboxStore(s).enqueue_many(events)
+        await s.execute(text("UPDATE outbox_messages SET state = 'dead' WHERE id <= 2"))
+        await s.commit()
+
+    async with sm() as s:
+        assert await OutboxStore(s).purge_dead(event_type="OrderPlaced") == 2
+        await s.commit()
+        remaining = (await s.execute(select(OutboxMessageModel))).scalars().all()
+    assert [m.state for m in remaining] == ["pending"]
+
+
+async def test_binary_body_is_stored_instead_of_payload_and_delivered(sm: async_sessionmaker[AsyncSession]) -> None:
+    evt = OrderPlaced(order_id=OrderId.new(), total=Money.from_major("12.50", "USD"))
+    async with sm() as s:
+        await OutboxStore(s, binary_payloads=True).enqueue_many([evt])
+        await s.commit()
+        row = (await s.execute(select(OutboxMessageModel))).scalar_one()
+        # JSON の 'null' ではなく SQL NULL
+        assert (await s.execute(text("SELECT payload IS NULL FROM outbox_messages"))).scalar_one() is True
+    assert row.payload is None
+    assert row.body is not None
+
+    dispatcher = OutboxDispatcher(sessionmaker=sm, owner="w1", bus=MessageBus())
+    assert await dispatcher.run_once() == 1
+    assert dispatcher.delivered == [evt]
+
+
+async def test_same_order_waits_behind_failed_message(sm: async_sessionmaker[AsyncSession]) -> None:
+    oid = OrderId.new()
+    events = [OrderPlaced(order_id=oid, total=Money.from_major(n, "USD")) for n in (1, 2)]
+    async with sm() as s:
+        await OutboxStore(s).enqueue_many(events)
+        await s.commit()
+
+    fail = True
+
+    def handler(_evt: OrderPlaced) -> None:
+        if fail:
+            raise RuntimeError("downstream unavailable")
+
+    bus = MessageBus()
+    bus.subscribe(OrderPlaced, handler)
+    dispatcher = OutboxDispatcher(sessionmaker=sm, owner="w1", bus=bus)
+
+    assert await dispatcher.run_once() == 2
+    async with sm() as s:
+        rows = (await s.execute(select(OutboxMessageModel).order_by(OutboxMessageModel.id))).scalars().all()
+    # 後続は配送されず、attempt_count も増えずにリースだけ解放される
+    assert [(m.state, m.attempt_count, m.lock_owner) for m in rows] == [("pending", 1, None), ("pending", 0, None)]
+    # 先行メッセージがバックオフ中の間は後続もクレームされない
+    assert await dispatcher.run_once() == 0
+
+    fail = False
+    async with sm() as s:
+        await s.execute(text("UPDATE outbox_messages SET available_at = now()"))
+        await s.commit()
+    assert await dispatcher.run_once() == 2
+    assert dispatcher.delivered == events
+
+
+@pytest.mark.usefixtures("require_db")
+async def test_listen_connection_is_not_returned_to_the_pool() -> None:
+    assert DB_URL is not None, "DATABASE_URL must be set"
+    # プールが1接続なら、LISTEN した接続が返却されていれば次の connect で再利用される
+    engine = create_async_engine(DB_URL, pool_size=1, max_overflow=0)
+    try:
+        async with PgListenWakeup(engine) as wakeup, engine.connect() as conn:
+            await conn.execute(text("SELECT pg_notify('outbox_messages', '')"))
+            await conn.commit()
+            await asyncio.wait_for(wakeup.wait(), timeout=5)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT pg_notify('outbox_messages', '')"))
+            await conn.commit()
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(wakeup.wait(), timeout=0.5)
+    finally:
+        await engine.dispose()
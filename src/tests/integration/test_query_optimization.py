@@ -91,3 +91,68 @@ async def test_order_list_uses_selectinload_to_avoid_n_plus_one(session: AsyncSe
         orders = list(await repo.list())
     assert len(orders) == 50
     assert cq["n"] <= 3, f"too many queries: {cq['n']} (selectinload not applied?)"
+
+
+async def test_product_get_many_by_sku_uses_single_query(session: AsyncSession) -> None:
+    repo = SqlAlchemyProductRepository(session)
+    pf = ProductFactory()
+    products = [pf.build() for _ in range(40)]
+    for p in products:
+        await repo.add(p)
+    await session.commit()
+
+    wanted = [p.sku for p in products] + [Sku("MISSING-1")]
+    async with count_queries(session) as cq:
+        found = await repo.get_many_by_sku(wanted)
+    assert cq["n"] == 1, f"expected a single IN query, got {cq['n']}"
+    assert set(found) == {p.sku for p in products}
+    assert await repo.get_many_by_sku([]) == {}
+
+
+async def test_order_iter_orders_streams_keyset_pages(session: AsyncSession) -> None:
+    await _prepare_orders(session, num_orders=50, lines_per_order=3)
+    repo = SqlAlchemyOrderRepository(session)
+    expected = {o.id for o in await repo.list()}
+
+    async with count_queries(session) as cq:
+        pages = [page async for page in repo.iter_order_pages(page_size=7)]
+    # 8 ページ x (orders + order_lines)
+    assert len(pages) == 8
+    assert cq["n"] <= 2 * len(pages)
+    streamed = [o.id for p in pages for o in p.orders]
+    assert len(streamed) == 50
+    assert set(streamed) == expected
+    assert all(len(o.lines) == 3 for p in pages for o in p.orders)
+    assert pages[-1].next_cursor is None
+
+    # 途中のカーソルから再開できる
+    resumed = [o.id async for o in repo.iter_orders(after=pages[2].next_cursor, page_size=20)]
+    assert resumed == streamed[21:]
+
+
+async def test_core_read_path_matches_orm_read_path(session: AsyncSession) -> None:
+    await _prepare_orders(session, num_orders=20, lines_per_order=4)
+    orm_orders = SqlAlchemyOrderRepository(session)
+    core_orders = SqlAlchemyOrderRepository(session, core_reads=True)
+
+    expected = {o.id: o for o in await orm_orders.list()}
+    got = list(await core_orders.list())
+    assert {o.id for o in got} == set(expected)
+    for o in got:
+        assert [(ln.sku, ln.quantity, ln.unit_price) for ln in o.lines] == [
+            (ln.sku, ln.quantity, ln.unit_price) for ln in expected[o.id].lines
+        ]
+        assert o.total == expected[o.id].total
+
+    one = await core_orders.get(got[0].id)
+    assert one is not None
+    assert one.total == got[0].total
+    assert [o.id async for o in core_orders.iter_orders(page_size=6)] == [o.id async for o in orm_orders.iter_orders(page_size=6)]
+
+    orm_products = SqlAlchemyProductRepository(session)
+    core_products = SqlAlchemyProductRepository(session, core_reads=True)
+    assert [(p.sku, p.name, p.unit_price) for p in await core_products.list()] == [
+        (p.sku, p.name, p.unit_price) for p in await orm_products.list()
+    ]
+    skus = [ln.sku for ln in got[0].lines]
+    assert await core_products.get_many_by_sku(skus) == await orm_products.get_many_by_sku(skus)
@@ -6,7 +6,7 @@ from decimal import Decimal
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from hex_commerce_service.app.adapters.outbound.sqlalchemy_repositories import (
@@ -15,6 +15,7 @@ from hex_commerce_service.app.adapters.outbound.sqlalchemy_repositories import (
     SqlAlchemyProductRepository,
 )
 from hex_commerce_service.app.domain.entities import Inventory, Order, OrderLine, Product
+from hex_commerce_service.app.domain.errors import OutOfStockError
 from hex_commerce_service.app.domain.value_objects import Money, OrderId, Sku
 
 if os.getenv("GITHUB_ACTIONS") == "true":
@@ -113,8 +114,8 @@ async def test_inventory_repository_upsert_and_get(session: AsyncSession) -> Non
     # update (replace contents)
     inv.set_on_hand(Sku("ABC-1"), 7)
     inv.set_on_hand(Sku("ABC-3"), 9)
-    # remove ABC-2 by not setting it (upsert replaces)
-    del inv._on_hand[Sku("ABC-2")]  # noqa: SLF001
+    # remove ABC-2 (only changed/removed SKUs are written after the first upsert)
+    inv.discard(Sku("ABC-2"))
     await repo.upsert(inv)
     await session.commit()
 
@@ -123,3 +124,84 @@ async def test_inventory_repository_upsert_and_get(session: AsyncSession) -> Non
     assert got2.available(Sku("ABC-1")) == 7
     assert got2.available(Sku("ABC-2")) == 0
     assert got2.available(Sku("ABC-3")) == 9
+
+
+async def test_inventory_repository_allocate_decrements_in_sql(session: AsyncSession) -> None:
+    prod_repo = SqlAlchemyProductRepository(session)
+    for code in ("ABC-1", "ABC-2", "ABC-3"):
+        await prod_repo.add(Product(sku=Sku(code), name=code, unit_price=Money.from_major(1, "USD")))
+    await session.commit()
+
+    repo = SqlAlchemyInventoryRepository(session)
+    inv = Inventory(location="osaka")
+    inv.set_on_hand(Sku("ABC-1"), 5)
+    inv.set_on_hand(Sku("ABC-2"), 3)
+    inv.set_on_hand(Sku("ABC-3"), 1)
+    await repo.upsert(inv)
+    await session.commit()
+
+    assert await repo.exists("osaka")
+    assert not await repo.exists("nowhere")
+
+    remaining = await repo.allocate("osaka", [(Sku("ABC-1"), 2), (Sku("ABC-2"), 3), (Sku("ABC-1"), 1)])
+    assert remaining == {Sku("ABC-1"): 2, Sku("ABC-2"): 0}
+
+    # 1行でも不足すればバッチ全体が戻り、不足分がすべて報告される
+    with pytest.raises(OutOfStockError) as excinfo:
+        await repo.allocate("osaka", [(Sku("ABC-1"), 1), (Sku("ABC-2"), 1), (Sku("ABC-3"), 2)])
+    assert {(s.sku, s.requested, s.available) for s in excinfo.value.shortfalls} == {
+        (Sku("ABC-2"), 1, 0),
+        (Sku("ABC-3"), 2, 1),
+    }
+    await session.commit()
+
+    got = await repo.get("osaka")
+    assert got is not None
+    assert got.available(Sku("ABC-1")) == 2
+    assert got.available(Sku("ABC-2")) == 0
+    assert got.available(Sku("ABC-3")) == 1
+
+
+async def test_inventory_repository_upsert_writes_only_changed_skus(session: AsyncSession) -> None:
+    prod_repo = SqlAlchemyProductRepository(session)
+    codes = [f"D-{i}" for i in range(50)]
+    for code in codes:
+        await prod_repo.add(Product(sku=Sku(code), name=code, unit_price=Money.from_major(1, "USD")))
+    await session.commit()
+
+    repo = SqlAlchemyInventoryRepository(session)
+    inv = Inventory(location="nagoya")
+    for code in codes:
+        inv.set_on_hand(Sku(code), 10)
+    await repo.upsert(inv)
+    await session.commit()
+
+    loaded = await repo.get("nagoya")
+    assert loaded is not None
+    assert loaded.dirty_skus == frozenset()
+    loaded.allocate(Sku("D-1"), 4)
+    loaded.discard(Sku("D-2"))
+    assert loaded.dirty_skus == {Sku("D-1"), Sku("D-2")}
+
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
+        statements.append(statement)
+
+    engine = session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        await repo.upsert(loaded)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    await session.commit()
+
+    # ロケーション upsert + 変更行の INSERT ... ON CONFLICT + 削除行の DELETE のみ
+    assert len(statements) == 3
+    assert not any("DELETE FROM inventory_items WHERE inventory_items.location = " in st and "IN" not in st for st in statements)
+
+    got = await repo.get("nagoya")
+    assert got is not None
+    assert got.available(Sku("D-1")) == 6
+    assert Sku("D-2") not in got.skus()
+    assert len(got.skus()) == 49